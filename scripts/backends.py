@@ -0,0 +1,392 @@
+"""
+Execution Backends
+File: scripts/backends.py
+
+The sales transforms that the OLAP scripts (pandas) and the Spark pipeline
+(step2_transform) both need are written here once, against a small Backend
+interface:
+
+    calculate_sales_count            sales count per product
+    cube_sales_by_date               total sales by Year, Month, DayOfWeek
+    cube_sales_by_date_and_store     ... and StoreID
+    create_product_performance_cube  total, average and count per weekday and product
+
+Each backend implements a few primitives (select, join, divide, date parts,
+drop nulls, grouped aggregation, sort) for one engine:
+
+    pandas  one thread, no start-up cost; the default for small data
+    polars  multi-threaded and columnar; used for larger data that fits in memory
+    spark   for data that does not fit on one node (see runtime_profile)
+
+A transform runs on the backend of the frames it is given, or on a named
+backend, in which case the frames are converted to it first. choose_backend
+picks one from the input size: step0_pipeline uses it to choose between Spark
+and pandas_engine's pandas or Polars transforms, and product_performance_by_day
+uses it for frames already in memory. benchmark.py --groups backend times every
+transform on every installed backend.
+
+polars and pyspark are optional. A backend whose package is not installed is
+left out of available_backends().
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from scripts.grouping_sets import DATE_PART_COLUMNS
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; pandas and Spark remain
+    pl = None
+
+try:
+    from pyspark.sql import SparkSession
+    from pyspark.sql import functions as F
+except ImportError:  # pyspark is optional; pandas and Polars remain
+    SparkSession = None
+    F = None
+
+# Constants
+PANDAS: str = "pandas"
+POLARS: str = "polars"
+SPARK: str = "spark"
+# Below this input size pandas beats the other engines' start-up and planning cost
+POLARS_MIN_INPUT_BYTES: int = 64 * 1024 * 1024
+
+# Formats of text dates the Polars backend parses (pandas infers them per column)
+TEXT_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y")
+
+Keys = Union[str, Sequence[str]]
+
+
+@dataclass(frozen=True)
+class Agg:
+    """One aggregate column: output name, function ("sum", "mean" or "count") and input column."""
+    output: str
+    func: str
+    column: str
+
+
+class Backend(ABC):
+    """Primitives the transforms are written in. Frames are the engine's own DataFrame type.
+
+    Every primitive is abstract, so a backend that misses one fails when it is created.
+    """
+
+    name: str = ""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def owns(self, df: Any) -> bool:
+        """Return True if df is this engine's DataFrame type."""
+
+    @abstractmethod
+    def from_pandas(self, df: pd.DataFrame) -> Any:
+        ...
+
+    @abstractmethod
+    def to_pandas(self, df: Any) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def select(self, df: Any, columns: Sequence[str]) -> Any:
+        ...
+
+    @abstractmethod
+    def join(self, left: Any, right: Any, on: Keys) -> Any:
+        """Inner join; right is the (smaller) dimension side."""
+
+    @abstractmethod
+    def divide(self, df: Any, output: str, numerator: str, denominator: str) -> Any:
+        ...
+
+    @abstractmethod
+    def add_date_parts(self, df: Any) -> Any:
+        """Add Year, Month and DayOfWeek (1 = Sunday, as Spark numbers them) from SaleDate.
+
+        SaleDate may be a date, a timestamp or text; text that is not a date gives nulls.
+        """
+
+    @abstractmethod
+    def add_weekday_name(self, df: Any, column: str, output: str) -> Any:
+        """Add the English weekday name (e.g. Monday) of a date column; null where the date is."""
+
+    @abstractmethod
+    def drop_nulls(self, df: Any, columns: Sequence[str]) -> Any:
+        ...
+
+    @abstractmethod
+    def aggregate(self, df: Any, keys: Sequence[str], aggs: Sequence[Agg]) -> Any:
+        """Group by keys (null keys form their own group) and compute aggs."""
+
+    @abstractmethod
+    def sort(self, df: Any, columns: Sequence[str]) -> Any:
+        ...
+
+
+class PandasBackend(Backend):
+    name = PANDAS
+
+    def owns(self, df: Any) -> bool:
+        return isinstance(df, pd.DataFrame)
+
+    def from_pandas(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+    def to_pandas(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+    def select(self, df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        return df[list(columns)]
+
+    def join(self, left: pd.DataFrame, right: pd.DataFrame, on: Keys) -> pd.DataFrame:
+        return left.merge(right, on=on, how="inner")
+
+    def divide(self, df: pd.DataFrame, output: str, numerator: str, denominator: str) -> pd.DataFrame:
+        return df.assign(**{output: df[numerator] / df[denominator]})
+
+    def add_date_parts(self, df: pd.DataFrame) -> pd.DataFrame:
+        dates = pd.to_datetime(df["SaleDate"], errors="coerce").dt
+        return df.assign(
+            Year=dates.year.astype("Int64"),
+            Month=dates.month.astype("Int64"),
+            DayOfWeek=((dates.dayofweek + 1) % 7 + 1).astype("Int64"),
+        )
+
+    def add_weekday_name(self, df: pd.DataFrame, column: str, output: str) -> pd.DataFrame:
+        return df.assign(**{output: pd.to_datetime(df[column], errors="coerce").dt.day_name()})
+
+    def drop_nulls(self, df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        return df.dropna(subset=list(columns))
+
+    def aggregate(self, df: pd.DataFrame, keys: Sequence[str], aggs: Sequence[Agg]) -> pd.DataFrame:
+        grouped = df.groupby(list(keys), sort=False, observed=True, dropna=False)
+        return grouped.agg(**{agg.output: (agg.column, agg.func) for agg in aggs}).reset_index()
+
+    def sort(self, df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+        return df.sort_values(list(columns), ignore_index=True)
+
+
+class PolarsBackend(Backend):
+    name = POLARS
+
+    def available(self) -> bool:
+        return pl is not None
+
+    def owns(self, df: Any) -> bool:
+        return pl is not None and isinstance(df, (pl.DataFrame, pl.LazyFrame))
+
+    def from_pandas(self, df: pd.DataFrame) -> "pl.DataFrame":
+        return pl.from_pandas(df)
+
+    def to_pandas(self, df: Any) -> pd.DataFrame:
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect()
+        return df.to_pandas()
+
+    def select(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.select(list(columns))
+
+    def join(self, left: Any, right: Any, on: Keys) -> Any:
+        return left.join(right, on=on, how="inner")
+
+    def divide(self, df: Any, output: str, numerator: str, denominator: str) -> Any:
+        return df.with_columns((pl.col(numerator) / pl.col(denominator)).alias(output))
+
+    @staticmethod
+    def _date(df: Any, column: str) -> "pl.Expr":
+        """The column as dates, parsing text in any of the prepared files' formats like the pandas backend."""
+        schema = df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+        if schema[column] != pl.String:
+            return pl.col(column)
+        return pl.coalesce([
+            pl.col(column).str.to_date(date_format, strict=False) for date_format in TEXT_DATE_FORMATS
+        ])
+
+    def add_date_parts(self, df: Any) -> Any:
+        dates = self._date(df, "SaleDate")
+        return df.with_columns(
+            dates.dt.year().alias("Year"),
+            dates.dt.month().alias("Month"),
+            # Polars numbers weekdays from 1 = Monday to 7 = Sunday
+            (dates.dt.weekday() % 7 + 1).alias("DayOfWeek"),
+        )
+
+    def add_weekday_name(self, df: Any, column: str, output: str) -> Any:
+        return df.with_columns(self._date(df, column).dt.strftime("%A").alias(output))
+
+    def drop_nulls(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.drop_nulls(subset=list(columns))
+
+    def aggregate(self, df: Any, keys: Sequence[str], aggs: Sequence[Agg]) -> Any:
+        expressions = {
+            "sum": lambda column: pl.col(column).sum(),
+            "mean": lambda column: pl.col(column).mean(),
+            "count": lambda column: pl.col(column).count(),
+        }
+        return df.group_by(list(keys)).agg([expressions[agg.func](agg.column).alias(agg.output) for agg in aggs])
+
+    def sort(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.sort(list(columns))
+
+
+class SparkBackend(Backend):
+    name = SPARK
+
+    def available(self) -> bool:
+        return F is not None
+
+    def owns(self, df: Any) -> bool:
+        return F is not None and type(df).__module__.startswith("pyspark.sql")
+
+    def from_pandas(self, df: pd.DataFrame) -> Any:
+        return SparkSession.builder.getOrCreate().createDataFrame(df)
+
+    def to_pandas(self, df: Any) -> pd.DataFrame:
+        return df.toPandas()
+
+    def select(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.select(*columns)
+
+    def join(self, left: Any, right: Any, on: Keys) -> Any:
+        # Broadcasts the dimension when it is small, so the fact side is not shuffled
+        from scripts.step2_transform import join_dimension
+        return join_dimension(left, right, on=on)
+
+    def divide(self, df: Any, output: str, numerator: str, denominator: str) -> Any:
+        return df.withColumn(output, F.col(numerator) / F.col(denominator))
+
+    def add_date_parts(self, df: Any) -> Any:
+        dates = F.col("SaleDate")
+        return df.withColumn("Year", F.year(dates)) \
+                 .withColumn("Month", F.month(dates)) \
+                 .withColumn("DayOfWeek", F.dayofweek(dates))
+
+    def add_weekday_name(self, df: Any, column: str, output: str) -> Any:
+        return df.withColumn(output, F.date_format(F.col(column), "EEEE"))
+
+    def drop_nulls(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.dropna(subset=list(columns))
+
+    def aggregate(self, df: Any, keys: Sequence[str], aggs: Sequence[Agg]) -> Any:
+        functions = {"sum": F.sum, "mean": F.avg, "count": F.count}
+        return df.groupBy(*keys).agg(*[functions[agg.func](agg.column).alias(agg.output) for agg in aggs])
+
+    def sort(self, df: Any, columns: Sequence[str]) -> Any:
+        return df.orderBy(*columns)
+
+
+BACKENDS: Dict[str, Backend] = {backend.name: backend for backend in (PandasBackend(), PolarsBackend(), SparkBackend())}
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose engine is installed."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def get_backend(name: str) -> Backend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; expected one of {list(BACKENDS)}.")
+    backend = BACKENDS[name]
+    if not backend.available():
+        raise ImportError(f"The {name} backend is not installed.")
+    return backend
+
+
+def backend_for(df: Any) -> Backend:
+    """Return the backend whose DataFrame type df is."""
+    for backend in BACKENDS.values():
+        if backend.owns(df):
+            return backend
+    raise TypeError(f"No backend for {type(df).__name__}.")
+
+
+def choose_backend(input_bytes: int, cores: Optional[int] = None, memory_bytes: Optional[int] = None,
+                   local_only: bool = False) -> str:
+    """
+    Pick the backend for an input of input_bytes.
+
+    Spark is used when runtime_profile finds the data does not fit on this node,
+    unless local_only is set (for data that is already in memory here).
+    Otherwise Polars is used at POLARS_MIN_INPUT_BYTES and above, if installed,
+    and pandas below that.
+    """
+    from scripts.runtime_profile import choose_profile
+
+    if not local_only and choose_profile(input_bytes, cores=cores, memory_bytes=memory_bytes).engine == SPARK:
+        return SPARK
+    if input_bytes >= POLARS_MIN_INPUT_BYTES and BACKENDS[POLARS].available():
+        return POLARS
+    return PANDAS
+
+
+def _resolve(frames: Sequence[Any], backend: Optional[str]) -> List[Any]:
+    """Return the backend and the frames converted to it (via pandas when they come from another engine)."""
+    target = backend_for(frames[0]) if backend is None else get_backend(backend)
+    converted = []
+    for df in frames:
+        if not target.owns(df):
+            df = target.from_pandas(backend_for(df).to_pandas(df))
+        converted.append(df)
+    return [target, *converted]
+
+
+def calculate_sales_count(products_df: Any, sales_df: Any, backend: Optional[str] = None) -> Any:
+    """Sales count per product (SaleAmount / UnitPrice summed), in a column named sum(Count)."""
+    engine, products_df, sales_df = _resolve([products_df, sales_df], backend)
+    sales_with_count = engine.join(
+        engine.select(sales_df, ["ProductID", "SaleAmount"]),
+        engine.select(products_df, ["ProductID", "UnitPrice"]),
+        on="ProductID",
+    )
+    sales_with_count = engine.divide(sales_with_count, "Count", "SaleAmount", "UnitPrice")
+    return engine.aggregate(sales_with_count, ["ProductID"], [Agg("sum(Count)", "sum", "Count")])
+
+
+def with_date_parts(sales_df: Any, backend: Optional[str] = None) -> Any:
+    """Add Year, Month and DayOfWeek from SaleDate, unless the frame already has them."""
+    engine, sales_df = _resolve([sales_df], backend)
+    if all(column in sales_df.columns for column in DATE_PART_COLUMNS):
+        return sales_df
+    return engine.add_date_parts(sales_df)
+
+
+def total_sales(sales_df: Any, columns: Sequence[str], backend: Optional[str] = None) -> Any:
+    """Sum SaleAmount into TotalSales grouped by columns (date parts are added when missing)."""
+    engine, sales_df = _resolve([sales_df], backend)
+    return engine.aggregate(with_date_parts(sales_df, engine.name), columns, [Agg("TotalSales", "sum", "SaleAmount")])
+
+
+def cube_sales_by_date(sales_df: Any, backend: Optional[str] = None) -> Any:
+    """Total sales by Year, Month and DayOfWeek."""
+    return total_sales(sales_df, ["Year", "Month", "DayOfWeek"], backend)
+
+
+def cube_sales_by_date_and_store(sales_df: Any, backend: Optional[str] = None) -> Any:
+    """Total sales by Year, Month, DayOfWeek and StoreID."""
+    return total_sales(sales_df, ["Year", "Month", "DayOfWeek", "StoreID"], backend)
+
+
+def create_product_performance_cube(sales_df: Any, backend: Optional[str] = None) -> Any:
+    """
+    TotalSales, AvgSales and SalesCount of SaleAmount per weekday name and ProductID.
+
+    Rows without a valid SaleDate or ProductID are left out. SalesCount counts
+    every remaining row, including those without a SaleAmount, which the sum and
+    average skip. The result is ordered by DayOfWeek and ProductID.
+    """
+    engine, sales_df = _resolve([sales_df], backend)
+    sales_df = engine.add_weekday_name(engine.select(sales_df, ["SaleDate", "ProductID", "SaleAmount"]),
+                                       "SaleDate", "DayOfWeek")
+    sales_df = engine.drop_nulls(sales_df, ["DayOfWeek", "ProductID"])
+    cube = engine.aggregate(sales_df, ["DayOfWeek", "ProductID"], [
+        Agg("TotalSales", "sum", "SaleAmount"),
+        Agg("AvgSales", "mean", "SaleAmount"),
+        Agg("SalesCount", "count", "ProductID"),
+    ])
+    return engine.sort(cube, ["DayOfWeek", "ProductID"])
@@ -0,0 +1,542 @@
+"""
+Pipeline Benchmarks
+File: scripts/benchmark.py
+
+Times and memory-profiles each pipeline stage on synthetic data
+(scripts/synthetic_data.py) at one or more scales:
+
+    prepare     prepare_*_data, in memory and streaming
+    scrubber    individual DataScrubber operations and a lazy plan on the raw sales
+    etl         create_dw and a full load_data_to_db
+    cube        create_olap_cube, the drill-through index, the in-memory cube engine,
+                the parallel cube build and the product performance cube
+    spark       the step0 pipeline steps (skipped when pyspark is not installed)
+    backend     each shared transform in scripts/backends.py on each backend
+                (pandas, polars, spark), to pick the fastest engine per job
+
+Each scale runs in its own workspace directory (a temporary one by default)
+holding data/raw, data/prepared and data/dw, so the project's own data is not
+touched. The stage cache is switched off and the query cache cleared before each
+cube stage, so every run does the full work.
+
+Every stage runs --repeat times for timing, then once more under tracemalloc
+for its peak traced allocation. tracemalloc sees Python, NumPy and pandas
+allocations, but not SQLite's page cache or the Spark JVM. The process's maximum
+resident set size after the stage is recorded too. Stages that only work in
+memory are skipped above --max-in-memory-rows.
+
+Results are written as JSON to data/benchmarks/, named by commit and time, with
+the commit, machine and package versions. --compare prints the change of each
+stage's best time against an earlier results file.
+
+Usage:
+    python3 scripts/benchmark.py --rows 1e4 1e5 1e6 [--repeat 3] [--groups prepare etl cube]
+    python3 scripts/benchmark.py --rows 1e5 --compare data/benchmarks/benchmark-<commit>-<time>.json
+    python3 scripts/benchmark.py --compare OLD.json NEW.json   # compare two earlier runs
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts import etl_to_dw, prepare_customers_data, prepare_products_data, prepare_sales_data  # noqa: E402
+from scripts.create_dw import create_dw  # noqa: E402
+from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.data_streaming import read_csv_in_chunks  # noqa: E402
+from scripts.dw_access import close_pools, read_connection  # noqa: E402
+from scripts.fact_snapshot import FactTableReader  # noqa: E402
+from scripts.olap import olap_cubing  # noqa: E402
+from scripts.olap.cube_engine import OlapCube  # noqa: E402
+from scripts.olap.drill_through import DrillThroughIndex  # noqa: E402
+from scripts.olap.parallel_cube import build_cube_parallel  # noqa: E402
+from scripts.olap.product_performance_by_day import (  # noqa: E402
+    create_product_performance_cube_from_chunks,
+    create_product_performance_cube_from_snapshot,
+    ingest_sales_chunks_from_dw,
+)
+from scripts import backends, pandas_engine  # noqa: E402
+from scripts.query_cache import default_cache  # noqa: E402
+from scripts.stage_cache import DISABLE_ENV  # noqa: E402
+from scripts.synthetic_data import write_synthetic_dataset  # noqa: E402
+
+# Constants
+BENCHMARK_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data", "benchmarks")
+GROUPS = ("prepare", "scrubber", "etl", "cube", "spark", "backend")
+DEFAULT_ROWS: Sequence[int] = (10_000,)
+DEFAULT_MAX_IN_MEMORY_ROWS: int = 10_000_000
+REGRESSION_THRESHOLD: float = 0.10  # flag stages more than 10% slower than the baseline
+MAX_SALE_AMOUNT: float = 10000
+
+OK = "ok"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class BenchmarkStage:
+    """One measured step. setup runs before each repetition, untimed; its result is passed to run."""
+    group: str
+    name: str
+    run: Callable[[Any], Any]
+    setup: Optional[Callable[[], Any]] = None
+    check: Optional[Callable[[], None]] = None  # raises if the run did not do its work
+    in_memory: bool = False  # loads the whole table into memory
+    skip_reason: Optional[str] = None
+
+
+def git_commit() -> str:
+    """Return the current commit, with '-dirty' if the tree has uncommitted changes, or 'unknown'."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=PROJECT_ROOT).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment_info() -> Dict[str, Any]:
+    """Machine and package versions, so results from different hosts are not compared blindly."""
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                "sqlite": sqlite3.sqlite_version}
+    for package in ("pyarrow", "pyspark"):
+        try:
+            versions[package] = __import__(package).__version__
+        except ImportError:
+            versions[package] = None
+    return {"platform": platform.platform(), "cpu_count": os.cpu_count(), "versions": versions}
+
+
+def max_rss_bytes() -> int:
+    """Maximum resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+@contextmanager
+def redirected(module: Any, **paths: pathlib.Path) -> Iterator[None]:
+    """Point module-level path constants (e.g. RAW_FILE) at the workspace for the duration of the block."""
+    saved = {name: getattr(module, name) for name in paths}
+    for name, path in paths.items():
+        setattr(module, name, path)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def measure(stage: BenchmarkStage, rows: int, repeat: int, memory: bool) -> Dict[str, Any]:
+    """Run one stage repeat times (plus once under tracemalloc) and return its result record."""
+    result = {"group": stage.group, "stage": stage.name, "rows": rows, "status": OK}
+    if stage.skip_reason:
+        logger.info(f"Skipping {stage.group}.{stage.name}: {stage.skip_reason}")
+        return {**result, "status": SKIPPED, "reason": stage.skip_reason}
+    try:
+        seconds = []
+        for _ in range(repeat):
+            prepared = stage.setup() if stage.setup else None
+            started = time.perf_counter()
+            stage.run(prepared)
+            seconds.append(time.perf_counter() - started)
+            if stage.check:
+                stage.check()
+        result.update({
+            "seconds": seconds,
+            "best_seconds": min(seconds),
+            "median_seconds": statistics.median(seconds),
+            "rows_per_second": rows / min(seconds) if min(seconds) > 0 else None,
+        })
+        if memory:
+            prepared = stage.setup() if stage.setup else None
+            tracemalloc.start()
+            try:
+                stage.run(prepared)
+                result["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        result["max_rss_bytes"] = max_rss_bytes()
+        logger.info(f"{stage.group}.{stage.name} at {rows} rows: best {min(seconds):.3f}s.")
+    except Exception as e:
+        logger.error(f"Benchmark stage {stage.group}.{stage.name} failed: {e}")
+        result.update({"status": FAILED, "error": str(e)})
+    return result
+
+
+def _sales_count() -> int:
+    with read_connection(etl_to_dw.DB_PATH) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0]
+
+
+def _tables() -> List[str]:
+    with read_connection(etl_to_dw.DB_PATH) as conn:
+        return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")]
+
+
+def _require(condition: bool, message: str) -> None:
+    if not condition:
+        raise RuntimeError(message)
+
+
+def prepare_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    stages = []
+    for module, table in ((prepare_customers_data, "customers"), (prepare_products_data, "products"),
+                          (prepare_sales_data, "sales")):
+        paths = {
+            "RAW_FILE": workspace.joinpath("data", "raw", f"{table}_data.csv"),
+            "PREPARED_FILE": workspace.joinpath("data", "prepared", f"{table}_data_prepared.csv"),
+        }
+        prepare = getattr(module, f"prepare_{table}_data")
+        prepare_streaming = getattr(module, f"prepare_{table}_data_streaming")
+
+        def run(_, prepare=prepare, module=module, paths=paths):
+            with redirected(module, **paths):
+                prepare()
+
+        def run_streaming(_, prepare=prepare_streaming, module=module, paths=paths):
+            with redirected(module, **paths):
+                prepare()
+
+        check = (lambda path=paths["PREPARED_FILE"]: _require(path.exists(), f"{path} was not written"))
+        stages.append(BenchmarkStage("prepare", f"prepare_{table}", run, check=check, in_memory=True))
+        # The streaming variant runs last, so later groups find prepared files at any scale
+        stages.append(BenchmarkStage("prepare", f"prepare_{table}_streaming", run_streaming, check=check))
+    return stages
+
+
+def scrubber_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    raw_file = workspace.joinpath("data", "raw", "sales_data.csv")
+    raw_sales: Dict[str, pd.DataFrame] = {}
+
+    def scrubber(lazy: bool = False) -> Callable[[], DataScrubber]:
+        def setup() -> DataScrubber:
+            if "sales" not in raw_sales:
+                raw_sales["sales"] = pd.read_csv(raw_file)
+            return DataScrubber(raw_sales["sales"].copy(), lazy=lazy)
+        return setup
+
+    def lazy_plan(s: DataScrubber) -> pd.DataFrame:
+        s.remove_duplicate_records()
+        s.filter_column_outliers("SaleAmount", 0, MAX_SALE_AMOUNT)
+        s.drop_columns(["CampaignID"])
+        return s.execute()
+
+    operations = {
+        "remove_duplicate_records": lambda s: s.remove_duplicate_records(),
+        "handle_missing_data": lambda s: s.handle_missing_data(fill_value=0),
+        "filter_column_outliers": lambda s: s.filter_column_outliers("SaleAmount", 0, MAX_SALE_AMOUNT),
+        "format_column_strings_to_lower_and_trim": lambda s: s.format_column_strings_to_lower_and_trim("PaymentType"),
+        "parse_dates_to_add_standard_datetime": lambda s: s.parse_dates_to_add_standard_datetime("SaleDate"),
+        "optimize_dtypes": lambda s: s.optimize_dtypes(),
+    }
+    stages = [
+        BenchmarkStage("scrubber", name, operation, setup=scrubber(), in_memory=True)
+        for name, operation in operations.items()
+    ]
+    stages.append(BenchmarkStage("scrubber", "lazy_plan", lazy_plan, setup=scrubber(lazy=True), in_memory=True))
+    stages.append(BenchmarkStage(
+        "scrubber",
+        "sketch_column_quantiles",
+        lambda _: DataScrubber.sketch_column_quantiles(read_csv_in_chunks(raw_file), "SaleAmount"),
+    ))
+    return stages
+
+
+def etl_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    return [
+        BenchmarkStage(
+            "etl",
+            "create_dw",
+            lambda _: create_dw(rebuild=True),
+            check=lambda: _require("sales" in _tables(), "the warehouse tables were not created"),
+        ),
+        BenchmarkStage(
+            "etl",
+            "load_data_to_db",
+            lambda _: etl_to_dw.load_data_to_db(),
+            setup=lambda: create_dw(rebuild=True),
+            check=lambda: _require(_sales_count() > 0, "the sales table is empty after the load"),
+        ),
+    ]
+
+
+def cube_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    def fresh_cube_output() -> None:
+        default_cache().clear()
+        olap_cubing.OUTPUT_FILE.unlink(missing_ok=True)
+
+    def with_connection(build: Callable[[sqlite3.Connection], Any]) -> Callable[[Any], Any]:
+        def run(_):
+            with read_connection(etl_to_dw.DB_PATH) as conn:
+                return build(conn)
+        return run
+
+    return [
+        BenchmarkStage(
+            "cube",
+            "create_olap_cube",
+            lambda _: olap_cubing.create_olap_cube(),
+            setup=fresh_cube_output,
+            check=lambda: _require(olap_cubing.OUTPUT_FILE.exists(), "the OLAP cube was not written"),
+        ),
+        BenchmarkStage("cube", "drill_through_index", with_connection(DrillThroughIndex.from_warehouse)),
+        BenchmarkStage("cube", "cube_engine_from_warehouse", with_connection(OlapCube.from_warehouse)),
+        BenchmarkStage("cube", "parallel_cube", lambda _: build_cube_parallel(etl_to_dw.DB_PATH)),
+        BenchmarkStage(
+            "cube",
+            "product_performance_from_snapshot",
+            lambda _: create_product_performance_cube_from_snapshot(FactTableReader(etl_to_dw.SNAPSHOT_DIR)),
+        ),
+        BenchmarkStage(
+            "cube",
+            "product_performance_from_chunks",
+            lambda _: create_product_performance_cube_from_chunks(ingest_sales_chunks_from_dw()),
+        ),
+    ]
+
+
+def spark_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    names = ("read_prepared", "calculate_sales_count", "cube_sales_by_date_and_store", "cube_sales_grouping_sets",
+             "save_to_csv_and_parquet")
+    try:
+        from pyspark.sql import SparkSession
+        from scripts.step1_extract import PRODUCTS_SCHEMA, SALES_SCHEMA, read_prepared
+        from scripts.step2_transform import (
+            calculate_sales_count,
+            cube_sales_by_date_and_store,
+            cube_sales_grouping_sets,
+        )
+        from scripts.step3_load import save_to_csv_and_parquet
+    except ImportError as e:
+        return [BenchmarkStage("spark", name, lambda _: None, skip_reason=f"pyspark unavailable ({e})") for name in names]
+
+    prepared_dir = workspace.joinpath("data", "prepared")
+    output_dir = workspace.joinpath("data", "output")
+    session: Dict[str, Any] = {}
+
+    def spark() -> "SparkSession":
+        if "spark" not in session:
+            session["spark"] = SparkSession.builder.appName("Smart Store Benchmark").getOrCreate()
+        return session["spark"]
+
+    def frames():
+        products = read_prepared(spark(), prepared_dir.joinpath("products_data_prepared.csv"), PRODUCTS_SCHEMA)
+        sales = read_prepared(spark(), prepared_dir.joinpath("sales_data_prepared.csv"), SALES_SCHEMA)
+        return products, sales
+
+    # Spark evaluates lazily, so each step ends with an action that forces the work
+    return [
+        BenchmarkStage("spark", "read_prepared", lambda _: frames()[1].count()),
+        BenchmarkStage("spark", "calculate_sales_count", lambda f: calculate_sales_count(*f).count(), setup=frames),
+        BenchmarkStage("spark", "cube_sales_by_date_and_store",
+                       lambda f: cube_sales_by_date_and_store(f[1]).count(), setup=frames),
+        BenchmarkStage("spark", "cube_sales_grouping_sets",
+                       lambda f: cube_sales_grouping_sets(f[1]).count(), setup=frames),
+        BenchmarkStage(
+            "spark",
+            "save_to_csv_and_parquet",
+            lambda f: save_to_csv_and_parquet(calculate_sales_count(*f), output_dir, "sales_count"),
+            setup=frames,
+        ),
+    ]
+
+
+def backend_stages(workspace: pathlib.Path) -> List[BenchmarkStage]:
+    prepared_dir = workspace.joinpath("data", "prepared")
+    tables: Dict[str, pd.DataFrame] = {}
+
+    def frames(backend: str) -> Callable[[], Any]:
+        def setup():
+            if not tables:
+                tables["products"] = pandas_engine.read_prepared(
+                    None, prepared_dir.joinpath("products_data_prepared.csv"), pandas_engine.PRODUCTS_SCHEMA)
+                tables["sales"] = pandas_engine.read_prepared(
+                    None, prepared_dir.joinpath("sales_data_prepared.csv"), pandas_engine.SALES_SCHEMA)
+            engine = backends.get_backend(backend)
+            return engine.from_pandas(tables["products"]), engine.from_pandas(tables["sales"])
+        return setup
+
+    def run(transform: Callable[..., Any], backend: str) -> Callable[[Any], Any]:
+        def call(f):
+            result = transform(*f)
+            # Spark evaluates lazily, so the result is counted to force the work
+            return result.count() if backend == backends.SPARK else result
+        return call
+
+    transforms = {
+        "calculate_sales_count": backends.calculate_sales_count,
+        "cube_sales_by_date": lambda products, sales: backends.cube_sales_by_date(sales),
+        "cube_sales_by_date_and_store": lambda products, sales: backends.cube_sales_by_date_and_store(sales),
+        "create_product_performance_cube": lambda products, sales: backends.create_product_performance_cube(sales),
+    }
+    installed = backends.available_backends()
+    stages = []
+    for backend in backends.BACKENDS:
+        for name, transform in transforms.items():
+            stage = BenchmarkStage("backend", f"{name}[{backend}]", run(transform, backend),
+                                   setup=frames(backend), in_memory=True)
+            if backend not in installed:
+                stage.skip_reason = f"{backend} is not installed"
+            stages.append(stage)
+    return stages
+
+
+STAGE_BUILDERS: Dict[str, Callable[[pathlib.Path], List[BenchmarkStage]]] = {
+    "prepare": prepare_stages,
+    "scrubber": scrubber_stages,
+    "etl": etl_stages,
+    "cube": cube_stages,
+    "spark": spark_stages,
+    "backend": backend_stages,
+}
+
+
+def run_scale(
+    rows: int,
+    workspace: pathlib.Path,
+    groups: Sequence[str] = GROUPS,
+    repeat: int = 1,
+    memory: bool = True,
+    seed: int = 0,
+    max_in_memory_rows: int = DEFAULT_MAX_IN_MEMORY_ROWS,
+) -> List[Dict[str, Any]]:
+    """Generate a dataset of rows sales in the workspace and benchmark the stages of the groups on it."""
+    started = time.perf_counter()
+    write_synthetic_dataset(workspace.joinpath("data", "raw"), rows, seed=seed)
+    workspace.joinpath("data", "dw").mkdir(parents=True, exist_ok=True)
+    generation = {"group": "data", "stage": "write_synthetic_dataset", "rows": rows, "status": OK,
+                  "best_seconds": time.perf_counter() - started}
+
+    previous_dir = os.getcwd()
+    os.chdir(workspace)  # the ETL and OLAP scripts use paths relative to the project directory
+    try:
+        results = [generation]
+        for group in GROUPS:
+            if group not in groups:
+                continue
+            for stage in STAGE_BUILDERS[group](workspace):
+                if stage.in_memory and rows > max_in_memory_rows and not stage.skip_reason:
+                    stage.skip_reason = f"loads all {rows} rows into memory (above --max-in-memory-rows)"
+                results.append(measure(stage, rows, repeat, memory))
+        return results
+    finally:
+        close_pools()
+        os.chdir(previous_dir)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Change of each stage's best time between two results files; 'regression' if slower by more than threshold."""
+    before = {(r["group"], r["stage"], r["rows"]): r for r in baseline["results"] if r.get("best_seconds")}
+    changes = []
+    for result in current["results"]:
+        key = (result["group"], result["stage"], result["rows"])
+        if key not in before or not result.get("best_seconds"):
+            continue
+        ratio = result["best_seconds"] / before[key]["best_seconds"]
+        changes.append({
+            "group": key[0], "stage": key[1], "rows": key[2],
+            "baseline_seconds": before[key]["best_seconds"],
+            "current_seconds": result["best_seconds"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return changes
+
+
+def print_comparison(changes: List[Dict[str, Any]], baseline_commit: str, current_commit: str) -> None:
+    print(f"Best times, {baseline_commit[:12]} -> {current_commit[:12]}:")
+    for change in changes:
+        flag = "  REGRESSION" if change["regression"] else ""
+        name = f"{change['group']}.{change['stage']}"
+        print(
+            f"  {name:<50} {change['rows']:>11,} rows  "
+            f"{change['baseline_seconds']:9.3f}s -> {change['current_seconds']:9.3f}s  x{change['ratio']:.2f}{flag}"
+        )
+
+
+def write_results(results: List[Dict[str, Any]], output: Optional[pathlib.Path] = None) -> pathlib.Path:
+    """Write a results file with the commit and environment, and return its path."""
+    commit = git_commit()
+    document = {
+        "commit": commit,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment_info(),
+        "results": results,
+    }
+    if output is None:
+        BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+        output = BENCHMARK_DIR.joinpath(f"benchmark-{commit[:12]}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.write_text(json.dumps(document, indent=2))
+    logger.info(f"Benchmark results written to {output}.")
+    return output
+
+
+def main() -> None:
+    """Benchmark the pipeline stages at each requested scale."""
+    parser = argparse.ArgumentParser(description="Time and memory-profile the pipeline stages on synthetic data.")
+    parser.add_argument("--rows", type=float, nargs="+", default=list(DEFAULT_ROWS), help="Sales rows per scale, e.g. 1e4 1e6.")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS), help="Stage groups to run.")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs of each stage.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each stage.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+    parser.add_argument("--max-in-memory-rows", type=float, default=DEFAULT_MAX_IN_MEMORY_ROWS,
+                        help="Skip whole-table in-memory stages above this many rows.")
+    parser.add_argument("--workspace", type=pathlib.Path, default=None,
+                        help="Directory for the generated data (default: a temporary directory, removed afterwards).")
+    parser.add_argument("--output", type=pathlib.Path, default=None, help="Results file (default: data/benchmarks/).")
+    parser.add_argument("--compare", type=pathlib.Path, nargs="+", metavar="RESULTS",
+                        help="Baseline results file; with two files, compare them without running.")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        baseline, current = (json.loads(path.read_text()) for path in args.compare)
+        print_comparison(compare_results(baseline, current), baseline["commit"], current["commit"])
+        return
+
+    os.environ[DISABLE_ENV] = "0"  # measure the work itself, not stage cache hits
+    results = []
+    for rows in (int(rows) for rows in args.rows):
+        workspace = args.workspace.joinpath(f"rows-{rows}") if args.workspace else pathlib.Path(
+            tempfile.mkdtemp(prefix=f"smart-store-benchmark-{rows}-")
+        )
+        workspace.mkdir(parents=True, exist_ok=True)
+        try:
+            results += run_scale(rows, workspace, args.groups, args.repeat, not args.no_memory, args.seed,
+                                 int(args.max_in_memory_rows))
+        finally:
+            if args.workspace is None:
+                shutil.rmtree(workspace, ignore_errors=True)
+    output = write_results(results, args.output)
+
+    if args.compare:
+        baseline = json.loads(args.compare[0].read_text())
+        print_comparison(compare_results(baseline, json.loads(output.read_text())), baseline["commit"], git_commit())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
+import argparse
 import sqlite3
 import sys
 import pathlib
+from typing import List, Tuple
 
 # For local imports, temporarily add project root to Python sys.path
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
@@ -9,6 +11,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Now we can import local modules
 from utils.logger import logger  # noqa: E402
+from scripts.dw_access import write_connection  # noqa: E402
 
 # Constants
 DW_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw")
@@ -17,67 +20,172 @@ DB_PATH: pathlib.Path = DW_DIR.joinpath("smart_sales.db")
 # Ensure the 'data/dw' directory exists
 DW_DIR.mkdir(parents=True, exist_ok=True)
 
-def create_dw() -> None:
-    """Create the data warehouse by creating customer, product, and sale tables."""
-    try:
-        # Connect to the SQLite database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Define table creation commands
-        create_customer_table = """
+# Table definitions, in load order (dimensions before the fact table)
+TABLE_DEFINITIONS = {
+    "customers": """
         CREATE TABLE IF NOT EXISTS customers (
-            customer_id INTEGER PRIMARY KEY,
-            customer_name TEXT NOT NULL,
-            loyalty_status TEXT DEFAULT 'Standard'
+            CustomerID INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL,
+            Region TEXT,
+            JoinDate TEXT,
+            LoyaltyPoints INTEGER,
+            CustomerSegment TEXT
         );
-        """
-
-        create_product_table = """
+    """,
+    "products": """
         CREATE TABLE IF NOT EXISTS products (
-            product_id INTEGER PRIMARY KEY,
-            product_name TEXT NOT NULL,
-            brand TEXT
+            ProductID INTEGER PRIMARY KEY,
+            ProductName TEXT NOT NULL,
+            Category TEXT,
+            UnitPrice REAL,
+            StockQuantity INTEGER,
+            StoreSection TEXT
         );
-        """
-
-        create_sales_table = """
+    """,
+    "sales": """
         CREATE TABLE IF NOT EXISTS sales (
-            sale_id INTEGER PRIMARY KEY,
-            customer_id INTEGER NOT NULL,
-            product_id INTEGER NOT NULL,
-            sale_date TEXT NOT NULL,
-            payment_method TEXT NOT NULL,
-            FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
-            FOREIGN KEY (product_id) REFERENCES products(product_id)
+            TransactionID INTEGER PRIMARY KEY,
+            SaleDate TEXT NOT NULL,
+            CustomerID INTEGER NOT NULL,
+            ProductID INTEGER NOT NULL,
+            StoreID INTEGER NOT NULL,
+            CampaignID INTEGER,
+            SaleAmount REAL NOT NULL,
+            DiscountPercent INTEGER,
+            PaymentType TEXT,
+            FOREIGN KEY (CustomerID) REFERENCES customers(CustomerID),
+            FOREIGN KEY (ProductID) REFERENCES products(ProductID)
         );
-        """
+    """,
+}
+
+# Primary key of each table, used by incremental loads to match rows
+PRIMARY_KEYS = {"customers": "CustomerID", "products": "ProductID", "sales": "TransactionID"}
+
+# Secondary indexes; bulk loads drop these first and rebuild them after the data is in
+INDEX_DEFINITIONS = {
+    "idx_sales_sale_date": "CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales (SaleDate);",
+    "idx_sales_customer_id": "CREATE INDEX IF NOT EXISTS idx_sales_customer_id ON sales (CustomerID);",
+    "idx_sales_product_id": "CREATE INDEX IF NOT EXISTS idx_sales_product_id ON sales (ProductID);",
+}
+
+
+def table_signature(conn: sqlite3.Connection, table: str) -> Tuple[tuple, tuple]:
+    """Return a table's columns (name, type, NOT NULL, primary key position) and foreign keys."""
+    columns = tuple(
+        (name, declared.upper(), bool(not_null), primary_key)
+        for _, name, declared, not_null, _, primary_key in conn.execute(f"PRAGMA table_info({table});")
+    )
+    foreign_keys = tuple(sorted(
+        (row[2], row[3], row[4]) for row in conn.execute(f"PRAGMA foreign_key_list({table});")
+    ))
+    return columns, foreign_keys
+
+
+def _expected_signature(table: str) -> Tuple[tuple, tuple]:
+    scratch = sqlite3.connect(":memory:")
+    try:
+        scratch.execute(TABLE_DEFINITIONS[table])
+        return table_signature(scratch, table)
+    finally:
+        scratch.close()
+
+
+def outdated_tables(conn: sqlite3.Connection) -> List[str]:
+    """Return the existing warehouse tables whose definition differs from TABLE_DEFINITIONS."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    return [
+        table for table in TABLE_DEFINITIONS
+        if table in existing and table_signature(conn, table) != _expected_signature(table)
+    ]
 
-        # Begin transaction
-        cursor.execute("BEGIN TRANSACTION;")
 
-        # Execute the SQL commands
-        cursor.execute(create_customer_table)
-        cursor.execute(create_product_table)
-        cursor.execute(create_sales_table)
+def migrate_table(conn: sqlite3.Connection, table: str) -> None:
+    """Recreate a table with its TABLE_DEFINITIONS schema, keeping the rows of the columns both share.
+
+    Tables left by an older DataFrame.to_sql load have no keys or constraints.
+    The rows are copied into the new definition under a savepoint, so if they
+    break a constraint (duplicate keys, NULL in a NOT NULL column) the table is
+    left as it was and an IntegrityError says so.
+    """
+    legacy = f"{table}_legacy"
+    old_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table});")]
+    new_columns = [column for column, *_ in _expected_signature(table)[0]]
+    shared = ", ".join(column for column in new_columns if column in old_columns)
+    dropped = [column for column in old_columns if column not in new_columns]
+    legacy_alter = conn.execute("PRAGMA legacy_alter_table;").fetchone()[0]
+    # Keep other tables' foreign keys pointing at the table name, not at the renamed legacy copy
+    conn.execute("PRAGMA legacy_alter_table=ON;")
+    conn.execute(f"SAVEPOINT migrate_{table};")
+    try:
+        conn.execute(f"ALTER TABLE {table} RENAME TO {legacy};")
+        conn.execute(TABLE_DEFINITIONS[table])
+        conn.execute(f"INSERT INTO {table} ({shared}) SELECT {shared} FROM {legacy};")
+        conn.execute(f"DROP TABLE {legacy};")
+        conn.execute(f"RELEASE migrate_{table};")
+    except sqlite3.Error as e:
+        conn.execute(f"ROLLBACK TO migrate_{table};")
+        conn.execute(f"RELEASE migrate_{table};")
+        raise sqlite3.IntegrityError(
+            f"Cannot migrate table {table} to the warehouse schema ({e}); "
+            "run create_dw.py --rebuild and a full load instead."
+        ) from e
+    finally:
+        conn.execute(f"PRAGMA legacy_alter_table={legacy_alter};")
+    logger.warning(f"Migrated table {table} to the warehouse schema" + (f", dropping columns {dropped}." if dropped else "."))
+
+
+def create_tables(conn: sqlite3.Connection, rebuild: bool = False) -> None:
+    """Create the warehouse tables and indexes on an open connection.
+
+    Existing tables with another definition (e.g. created by an older
+    DataFrame.to_sql load without keys or constraints) are migrated to
+    TABLE_DEFINITIONS, keeping their rows. With rebuild=True, existing tables
+    are dropped first instead.
+    """
+    cursor = conn.cursor()
+    if rebuild:
+        for table in reversed(list(TABLE_DEFINITIONS)):
+            cursor.execute(f"DROP TABLE IF EXISTS {table};")
+    for table in outdated_tables(conn):
+        migrate_table(conn, table)
+    for ddl in TABLE_DEFINITIONS.values():
+        cursor.execute(ddl)
+    for ddl in INDEX_DEFINITIONS.values():
+        cursor.execute(ddl)
+
+
+def create_dw(rebuild: bool = False) -> None:
+    """Create the data warehouse by creating customer, product, and sale tables."""
+    try:
+        # Open the database for writing; commits on success and rolls back on failure
+        with write_connection(DB_PATH) as conn:
+            conn.execute("BEGIN TRANSACTION;")
+
+            # Execute the SQL commands
+            create_tables(conn, rebuild=rebuild)
 
-        # Commit changes
-        conn.commit()
         logger.info("Data warehouse tables created successfully.")
 
     except sqlite3.Error as e:
         logger.error(f"Error connecting to the database: {e}")
-        conn.rollback()  # Rollback on failure
+        raise
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
-    finally:
-        if conn:
-            conn.close()
+        raise
 
 def main() -> None:
     """Main function to create the data warehouse."""
+    parser = argparse.ArgumentParser(description="Create the smart sales data warehouse.")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate existing tables.")
+    args = parser.parse_args()
+
     logger.info("Starting data warehouse creation...")
-    create_dw()
+    try:
+        create_dw(rebuild=args.rebuild)
+    except Exception:
+        logger.error("Data warehouse creation failed.")
+        sys.exit(1)
     logger.info("Data warehouse creation complete.")
 
 if __name__ == "__main__":
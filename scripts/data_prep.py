@@ -14,17 +14,23 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Now we can import local modules
 from utils.logger import logger
+from scripts.dtype_schema import apply_dtype_schema, infer_dtype_schema
 
 # Constants
 DATA_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data")
 RAW_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("raw")
 
 def read_raw_data(file_name: str) -> pd.DataFrame:
-    """Read raw data from CSV."""
+    """Read raw data from CSV with compact dtypes inferred from the whole file.
+
+    Raw files keep growing, so the schema is inferred on every read rather than
+    saved beside them, where it would go stale as new rows arrive.
+    """
     file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
     try:
         logger.info(f"Reading raw data from {file_path}.")
-        return pd.read_csv(file_path)
+        df = pd.read_csv(file_path)
+        return apply_dtype_schema(df, infer_dtype_schema(df))
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return pd.DataFrame()  # Return an empty DataFrame if the file is not found
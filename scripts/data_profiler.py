@@ -0,0 +1,206 @@
+"""
+Data Quality Profiler
+File: scripts/data_profiler.py
+
+Profiles a DataFrame (or a CSV streamed in chunks) in a single vectorized pass per
+column. Each column is hashed once; the hashes feed a HyperLogLog distinct-count
+estimate and are combined into a row hash used to count duplicate rows. Null
+counts, min/max/mean/std and memory use are collected in the same pass, and the
+result is returned as a DataProfile instead of DataFrame.info() text.
+"""
+
+import math
+import pathlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from scripts.data_streaming import DEFAULT_CHUNK_SIZE, RowFingerprintSet, normalize_for_hashing, read_csv_in_chunks
+
+# Constants
+DEFAULT_HLL_PRECISION: int = 14  # 2**14 registers, about 0.8% standard error
+ROW_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+MEMORY_SAMPLE_SIZE: int = 1_000
+
+
+def _estimate_memory_bytes(series: pd.Series) -> int:
+    """Return the memory used by a column, sampling values of object-like columns.
+
+    memory_usage(deep=True) sizes every Python string, which costs more than the
+    rest of the profile; a fixed-size sample gives a close estimate.
+    """
+    shallow = int(series.memory_usage(index=False, deep=False))
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series) or len(series) == 0:
+        return shallow
+    sample = series.sample(n=min(len(series), MEMORY_SAMPLE_SIZE), random_state=0)
+    per_value = sample.memory_usage(index=False, deep=True) / len(sample)
+    return int(round(per_value * len(series)))
+
+
+class HyperLogLog:
+    """Approximate distinct counter over 64-bit hashes (Flajolet et al., 2007)."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add a batch of uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Rank is the position of the first 1-bit after the index bits. frexp gives
+        # the bit length of the remainder, which is 64 minus its leading zeros.
+        _, bit_length = np.frexp((hashes << np.uint64(self.precision)).astype(np.float64))
+        rank = np.minimum(65 - bit_length, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another counter with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters with different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Return the estimated number of distinct hashes added."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            estimate = m * math.log(m / empty)  # Linear counting for small cardinalities
+        return int(round(estimate))
+
+
+@dataclass
+class ColumnProfile:
+    """Statistics for one column.
+
+    min and max are set for numeric and datetime columns, mean and std for numeric ones.
+    """
+
+    name: str
+    dtype: str
+    count: int = 0
+    null_count: int = 0
+    memory_bytes: int = 0
+    min: Optional[Any] = None
+    max: Optional[Any] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    _m2: float = field(default=0.0, repr=False)
+    _hll: HyperLogLog = field(default_factory=HyperLogLog, repr=False)
+
+    @property
+    def distinct_count(self) -> int:
+        """Approximate number of distinct non-null values."""
+        return self._hll.count()
+
+    def update(self, series: pd.Series, hashes: np.ndarray) -> None:
+        """Fold one chunk of the column into the profile."""
+        missing = series.isna().to_numpy()
+        self.null_count += int(missing.sum())
+        self.memory_bytes += _estimate_memory_bytes(series)
+        self._hll.add_hashes(hashes[~missing])
+
+        present = series[~missing]
+        if present.empty:
+            return
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = present.to_numpy(dtype=np.float64)
+            n, mean = values.size, float(values.mean())
+            m2 = float(np.square(values - mean).sum())
+            self._merge_moments(n, mean, m2)
+            low, high = float(values.min()), float(values.max())
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            self.count += len(present)
+            low, high = present.min(), present.max()
+        else:
+            # Like describe(), strings get counts and distinct counts but no range
+            self.count += len(present)
+            return
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def _merge_moments(self, n: int, mean: float, m2: float) -> None:
+        # Chan et al. parallel update of count, mean and sum of squared deviations
+        total = self.count + n
+        delta = mean - (self.mean or 0.0)
+        self.mean = (self.mean or 0.0) + delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.std = math.sqrt(self._m2 / (total - 1)) if total > 1 else math.nan
+
+
+@dataclass
+class DataProfile:
+    """Single-pass profile of a DataFrame or CSV file."""
+
+    row_count: int = 0
+    duplicate_count: int = 0
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+
+    @property
+    def null_counts(self) -> pd.Series:
+        return pd.Series({name: column.null_count for name, column in self.columns.items()}, dtype="int64")
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(column.memory_bytes for column in self.columns.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return one row of statistics per column."""
+        return pd.DataFrame.from_records(
+            [
+                {
+                    "column": c.name, "dtype": c.dtype, "count": c.count, "null_count": c.null_count,
+                    "distinct_count": c.distinct_count, "min": c.min, "max": c.max, "mean": c.mean,
+                    "std": c.std, "memory_bytes": c.memory_bytes,
+                }
+                for c in self.columns.values()
+            ]
+        ).set_index("column")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "duplicate_count": self.duplicate_count,
+            "memory_bytes": self.memory_bytes,
+            "columns": self.to_frame().reset_index().to_dict(orient="records"),
+        }
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], fingerprints: Optional[RowFingerprintSet] = None) -> DataProfile:
+    """Profile a stream of DataFrame chunks with the same columns.
+
+    Duplicate rows are counted across chunks with a bounded RowFingerprintSet.
+    """
+    if fingerprints is None:
+        fingerprints = RowFingerprintSet()
+    profile = DataProfile()
+    for chunk in chunks:
+        row_hashes = np.zeros(len(chunk), dtype=np.uint64)
+        for name in chunk.columns:
+            series = chunk[name]
+            column = profile.columns.setdefault(name, ColumnProfile(name, str(series.dtype)))
+            hashes = pd.util.hash_array(normalize_for_hashing(series).to_numpy())
+            column.update(series, hashes)
+            row_hashes = row_hashes * ROW_HASH_MULTIPLIER ^ hashes
+        profile.row_count += len(chunk)
+        profile.duplicate_count += int(len(chunk) - fingerprints.first_seen(row_hashes).sum())
+    return profile
+
+
+def profile_dataframe(df: pd.DataFrame) -> DataProfile:
+    """Profile an in-memory DataFrame."""
+    return profile_chunks([df], RowFingerprintSet(max_fingerprints=max(len(df), 1)))
+
+
+def profile_csv(file_path: pathlib.Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DataProfile:
+    """Profile a CSV file in chunks without loading it into memory."""
+    return profile_chunks(read_csv_in_chunks(file_path, chunk_size))
@@ -1,44 +1,116 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Union, List
+from typing import Any, Dict, Iterable, Tuple, Union, List
 import io
 
+from scripts.data_profiler import DataProfile, profile_dataframe
+from scripts.dtype_schema import DEFAULT_CATEGORY_THRESHOLD, DtypeSchema, apply_dtype_schema, infer_dtype_schema
+from scripts.quantile_sketch import DEFAULT_EPSILON, KLLSketch
+
 class DataScrubber:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, lazy: bool = False):
+        """With lazy=True, drop_columns, filter_column_outliers, rename_columns,
+        reorder_columns and remove_duplicate_records only record a plan step and
+        return the current frame; execute() runs the optimized plan in one pass.
+        Any other method executes the pending plan first."""
         self.df = df
+        self.lazy = lazy
+        self.plan: List[Tuple[str, Any]] = []
+        self.dtype_schema: Union[DtypeSchema, None] = None
+
+    def _record(self, op: str, arg: Any) -> pd.DataFrame:
+        self.plan.append((op, arg))
+        return self.df
+
+    def execute(self) -> pd.DataFrame:
+        if self.plan:
+            plan, self.plan = self.plan, []
+            self.df = self._run_plan(self.df, plan)
+        return self.df
+
+    @staticmethod
+    def _run_plan(df: pd.DataFrame, plan: List[Tuple[str, Any]]) -> pd.DataFrame:
+        # Track columns by name only: projections and renames never touch data,
+        # filters and de-duplication narrow one row mask over the original frame,
+        # and the surviving rows and columns are taken once at the end.
+        source = {column: column for column in df.columns}
+        columns = list(df.columns)
+        mask = np.ones(len(df), dtype=bool)
+        for op, arg in plan:
+            if op == 'drop_columns':
+                missing = [column for column in arg if column not in source]
+                if missing:
+                    raise KeyError(f"{missing} not found in axis")
+                columns = [column for column in columns if column not in arg]
+                source = {column: source[column] for column in columns}
+            elif op == 'rename_columns':
+                columns = [arg.get(column, column) for column in columns]
+                source = {arg.get(column, column): original for column, original in source.items()}
+            elif op == 'reorder_columns':
+                missing = [column for column in arg if column not in source]
+                if missing:
+                    raise KeyError(f"{missing} not in index")
+                columns = list(arg)
+                source = {column: source[column] for column in columns}
+            elif op == 'filter_column_outliers':
+                column, lower_bound, upper_bound = arg
+                values = df[source[column]]
+                mask &= ((values >= lower_bound) & (values <= upper_bound)).to_numpy(dtype=bool, na_value=False)
+            elif op == 'remove_duplicate_records':
+                rows = np.flatnonzero(mask)
+                duplicated = df[[source[column] for column in columns]].take(rows).duplicated().to_numpy()
+                mask[rows[duplicated]] = False
+            else:
+                raise ValueError(f"Unknown plan step: {op}")
+        result = df.loc[mask, [source[column] for column in columns]]
+        result.columns = columns
+        return result
 
-    def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
-        return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
+    def check_data_consistency_before_cleaning(self) -> Dict[str, Union[pd.Series, int, DataProfile]]:
+        profile = self.profile_data()
+        return {'null_counts': profile.null_counts, 'duplicate_count': profile.duplicate_count, 'profile': profile}
 
-    def check_data_consistency_after_cleaning(self) -> Dict[str, Union[pd.Series, int]]:
-        null_counts = self.df.isnull().sum()
-        duplicate_count = self.df.duplicated().sum()
+    def check_data_consistency_after_cleaning(self) -> Dict[str, Union[pd.Series, int, DataProfile]]:
+        profile = self.profile_data()
+        null_counts = profile.null_counts
+        duplicate_count = profile.duplicate_count
         assert null_counts.sum() == 0, "Data still contains null values after cleaning."
         assert duplicate_count == 0, "Data still contains duplicate records after cleaning."
-        return {'null_counts': null_counts, 'duplicate_count': duplicate_count}
+        return {'null_counts': null_counts, 'duplicate_count': duplicate_count, 'profile': profile}
 
     def convert_column_to_new_data_type(self, column: str, new_type: type) -> pd.DataFrame:
+        self.execute()
         self.df[column] = self.df[column].astype(new_type)
         return self.df
 
     def drop_columns(self, columns: List[str]) -> pd.DataFrame:
+        if self.lazy:
+            return self._record('drop_columns', list(columns))
         self.df = self.df.drop(columns=columns)
         return self.df
 
     def filter_column_outliers(self, column: str, lower_bound: Union[float, int], upper_bound: Union[float, int]) -> pd.DataFrame:
+        if self.lazy:
+            return self._record('filter_column_outliers', (column, lower_bound, upper_bound))
         self.df = self.df[(self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)]
         return self.df
 
+    def filter_column_outliers_iqr(self, column: str, q1: float, q3: float, multiplier: float = 1.5) -> pd.DataFrame:
+        iqr = q3 - q1
+        return self.filter_column_outliers(column, q1 - multiplier * iqr, q3 + multiplier * iqr)
+
     def format_column_strings_to_lower_and_trim(self, column: str) -> pd.DataFrame:
+        self.execute()
         self.df[column] = self.df[column].str.lower().str.strip()
         return self.df
 
     def format_column_strings_to_upper_and_trim(self, column: str) -> pd.DataFrame:
+        self.execute()
         self.df[column] = self.df[column].str.upper().str.strip()
         return self.df
 
     def handle_missing_data(self, drop: bool = False, fill_value: Union[None, float, int, str] = None) -> pd.DataFrame:
+        self.execute()
         if drop:
             self.df = self.df.dropna()
         elif fill_value is not None:
@@ -46,24 +118,72 @@ class DataScrubber:
         return self.df
 
     def inspect_data(self) -> Tuple[str, str]:
+        self.execute()
         buffer = io.StringIO()
         self.df.info(buf=buffer)  # Capture DataFrame.info() output
         info_str = buffer.getvalue()  # Retrieve the info output as a string
         describe_str = self.df.describe().to_string()  # Convert describe output to string
         return info_str, describe_str
 
+    def profile_data(self) -> DataProfile:
+        """Null counts, duplicate rows, min/max/mean/std, approximate distinct counts and
+        memory per column, computed in one pass per column."""
+        self.execute()
+        return profile_dataframe(self.df)
+
+    def optimize_dtypes(self, category_threshold: float = DEFAULT_CATEGORY_THRESHOLD) -> pd.DataFrame:
+        """Apply compact dtypes (categoricals, downcast numbers, parsed dates) and keep
+        the schema in self.dtype_schema for write_csv_with_schema."""
+        self.execute()
+        self.dtype_schema = infer_dtype_schema(self.df, category_threshold)
+        self.df = apply_dtype_schema(self.df, self.dtype_schema)
+        return self.df
+
     def parse_dates_to_add_standard_datetime(self, column: str) -> pd.DataFrame:
+        self.execute()
         self.df['StandardDateTime'] = pd.to_datetime(self.df[column])
         return self.df
 
     def remove_duplicate_records(self) -> pd.DataFrame:
+        if self.lazy:
+            return self._record('remove_duplicate_records', None)
         self.df = self.df.drop_duplicates()
         return self.df
 
     def rename_columns(self, column_mapping: Dict[str, str]) -> pd.DataFrame:
+        if self.lazy:
+            return self._record('rename_columns', dict(column_mapping))
         self.df = self.df.rename(columns=column_mapping)
         return self.df
 
     def reorder_columns(self, columns: List[str]) -> pd.DataFrame:
+        if self.lazy:
+            return self._record('reorder_columns', list(columns))
         self.df = self.df[columns]
         return self.df
+
+    @staticmethod
+    def sketch_column_quantiles(chunks: Iterable[pd.DataFrame], column: str, epsilon: float = DEFAULT_EPSILON,
+                                fill_missing_with_median: bool = False) -> Dict[str, float]:
+        """Estimate Q1, median and Q3 of a column in one pass over chunks, with rank error epsilon.
+
+        With fill_missing_with_median, Q1 and Q3 are computed as if missing values had
+        first been filled with the median, as handle_missing_data would do.
+        """
+        sketch = KLLSketch(epsilon)
+        null_count = 0
+        for chunk in chunks:
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+            null_count += int(missing.sum())
+            sketch.update_many(values[~missing])
+        median = sketch.quantile(0.5)
+        if fill_missing_with_median and null_count and len(sketch):
+            sketch.update(median, weight=null_count)
+        return {
+            'q1': sketch.quantile(0.25),
+            'median': median,
+            'q3': sketch.quantile(0.75),
+            'count': len(sketch),
+            'null_count': null_count,
+        }
@@ -0,0 +1,217 @@
+"""
+Chunked CSV Streaming Helpers
+File: scripts/data_streaming.py
+
+Helpers used by the prepare_*_data.py scripts to clean raw CSV files that are too
+large to load at once. Raw files are read in fixed-size chunks, duplicate rows are
+dropped across chunks with a bounded set of hashed row fingerprints, and prepared
+output is written incrementally, so peak memory depends on the chunk size rather
+than on the size of the file.
+"""
+
+import pathlib
+import sys
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Now we can import local modules
+from utils.logger import logger  # noqa: E402
+from scripts.dtype_schema import DtypeSchema, infer_dtype_schema, merge_dtype_schemas, save_dtype_schema, written_schema  # noqa: E402
+
+# Constants
+DEFAULT_CHUNK_SIZE: int = 100_000
+DEFAULT_MAX_FINGERPRINTS: int = 50_000_000  # 8 bytes each, about 400 MB at the cap
+
+
+def normalize_for_hashing(series: pd.Series) -> pd.Series:
+    """Return series as strings that hash the same way in every chunk.
+
+    read_csv infers dtypes per chunk, so the same value can arrive as int64 in one
+    chunk and float64 in the next, and a text column that is empty in a chunk
+    arrives as all-NaN float64. Every column is therefore hashed as strings:
+    integers in their own digits (not via float64, which cannot tell IDs above
+    2**53 apart), whole floats as the same digits (so 10, 10.0 and "10" agree),
+    other floats as written, and missing values as <NA> whatever the column's dtype.
+    """
+    if pd.api.types.is_float_dtype(series):
+        whole = series.notna() & (series % 1 == 0) & (series.abs() < 2 ** 63)
+        digits = series.where(whole, 0).astype("int64").astype("string")
+        return digits.where(whole, series.astype("string"))
+    return series.astype("string")
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """Return one 64-bit hash per row, stable across chunks of the same file."""
+    frame = pd.DataFrame({column: normalize_for_hashing(df[column]) for column in df.columns}, index=df.index)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+class RowFingerprintSet:
+    """Bounded set of row fingerprints used to drop duplicates across chunks.
+
+    Fingerprints are stored in sorted NumPy arrays, one generation per chunk, so
+    each distinct row costs 8 bytes. When more than ``max_fingerprints`` are held
+    the oldest generation is evicted: memory stays bounded, and only duplicates
+    that are further apart than the retained window can slip through.
+    """
+
+    def __init__(self, max_fingerprints: int = DEFAULT_MAX_FINGERPRINTS, max_generations: int = 32):
+        if max_fingerprints <= 0:
+            raise ValueError("max_fingerprints must be positive.")
+        self.max_fingerprints = max_fingerprints
+        self.max_generations = max(max_generations, 2)
+        self._generations: Deque[np.ndarray] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return bool(self._seen(np.array([fingerprint], dtype=np.uint64))[0])
+
+    def _seen(self, sorted_fingerprints: np.ndarray) -> np.ndarray:
+        seen = np.zeros(sorted_fingerprints.size, dtype=bool)
+        for generation in self._generations:
+            positions = np.searchsorted(generation, sorted_fingerprints)
+            positions = np.minimum(positions, generation.size - 1)
+            seen |= generation[positions] == sorted_fingerprints
+        return seen
+
+    def _add(self, sorted_fingerprints: np.ndarray) -> None:
+        if sorted_fingerprints.size == 0:
+            return
+        self._generations.append(sorted_fingerprints)
+        self._size += sorted_fingerprints.size
+
+        # Evict the oldest generations once over the cap
+        while self._size > self.max_fingerprints and len(self._generations) > 1:
+            self._size -= self._generations.popleft().size
+
+        # Keep lookups cheap by merging the smallest pair of neighbouring generations
+        while len(self._generations) > self.max_generations:
+            sizes = [a.size + b.size for a, b in zip(self._generations, list(self._generations)[1:])]
+            i = int(np.argmin(sizes))
+            generations = list(self._generations)
+            merged = np.union1d(generations[i], generations[i + 1])
+            self._generations = deque(generations[:i] + [merged] + generations[i + 2:])
+
+    def first_seen(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Return a mask that is True for fingerprints not seen before, and remember them.
+
+        Within the batch only the first occurrence of a fingerprint is marked True,
+        matching DataFrame.drop_duplicates(keep="first").
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        mask = np.zeros(fingerprints.size, dtype=bool)
+        if fingerprints.size == 0:
+            return mask
+        unique, first_index = np.unique(fingerprints, return_index=True)
+        new = ~self._seen(unique)
+        mask[first_index[new]] = True
+        self._add(unique[new])
+        return mask
+
+
+def read_csv_in_chunks(file_path: pathlib.Path, chunk_size: int = DEFAULT_CHUNK_SIZE, **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Yield a CSV file as DataFrames of at most chunk_size rows."""
+    logger.info(f"Streaming {file_path} in chunks of {chunk_size} rows.")
+    with pd.read_csv(file_path, chunksize=chunk_size, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def drop_duplicate_chunks(chunks: Iterator[pd.DataFrame], fingerprints: Optional[RowFingerprintSet] = None) -> Iterator[pd.DataFrame]:
+    """Drop rows already seen in this or any earlier chunk."""
+    if fingerprints is None:
+        fingerprints = RowFingerprintSet()
+    for chunk in chunks:
+        yield chunk[fingerprints.first_seen(row_fingerprints(chunk))]
+
+
+def rewrite_dates_as_iso(source_path: pathlib.Path, target_path: pathlib.Path, dates: Dict[str, str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Copy a CSV chunk by chunk, rewriting the given date columns in ISO format.
+
+    Other columns are read and written as text, so they are copied unchanged. The
+    ISO formats are the ones to_csv uses for parsed dates (see written_schema).
+    """
+    iso_formats = written_schema({"dates": dates})["dates"]
+    header = True
+    for chunk in read_csv_in_chunks(source_path, chunk_size, dtype=str, keep_default_na=False):
+        converted = {
+            column: pd.to_datetime(chunk[column].mask(chunk[column] == ""), format=date_format).dt.strftime(iso_formats[column])
+            for column, date_format in dates.items()
+        }
+        chunk.assign(**converted).to_csv(target_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+
+def stream_clean_csv(
+    raw_path: pathlib.Path,
+    prepared_path: pathlib.Path,
+    clean_chunk: Callable[[pd.DataFrame], pd.DataFrame],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fingerprints: Optional[RowFingerprintSet] = None,
+    optimize_dtypes: bool = False,
+) -> Dict[str, int]:
+    """Clean a raw CSV chunk by chunk and write the prepared CSV incrementally.
+
+    Duplicates are removed across chunks before clean_chunk runs, so clean_chunk
+    only needs the row-local steps (filling missing values, filtering, standardizing).
+    Output goes to a temporary file that replaces prepared_path once complete.
+    With optimize_dtypes, the chunks are written as cleaned and a schema is merged
+    from every chunk's compact dtypes, so a date column that parses in one chunk
+    but not in another stays text throughout instead of mixing formats. The date
+    columns that parse everywhere are then rewritten in ISO format, so the file
+    matches the one write_csv_with_schema produces when cleaning in memory, and
+    that file's schema is saved beside prepared_path.
+
+    Returns:
+        Dict[str, int]: Number of rows read, dropped as duplicates and written.
+    """
+    prepared_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = prepared_path.with_name(prepared_path.name + ".tmp")
+    dated_path = prepared_path.with_name(prepared_path.name + ".dated.tmp")
+    if fingerprints is None:
+        fingerprints = RowFingerprintSet()
+    stats = {"rows_read": 0, "duplicates_dropped": 0, "rows_written": 0}
+    schema: Optional[DtypeSchema] = None
+    try:
+        header = True
+        for chunk in read_csv_in_chunks(raw_path, chunk_size):
+            stats["rows_read"] += len(chunk)
+            unique_rows = chunk[fingerprints.first_seen(row_fingerprints(chunk))]
+            stats["duplicates_dropped"] += len(chunk) - len(unique_rows)
+            cleaned = clean_chunk(unique_rows)
+            if optimize_dtypes:
+                chunk_schema = infer_dtype_schema(cleaned)
+                schema = chunk_schema if schema is None else merge_dtype_schemas(schema, chunk_schema)
+            cleaned.to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            stats["rows_written"] += len(cleaned)
+        if header:
+            # Empty input: still write the header so downstream readers find the file
+            pd.read_csv(raw_path, nrows=0).to_csv(tmp_path, index=False)
+        if schema is not None and schema["dates"]:
+            rewrite_dates_as_iso(tmp_path, dated_path, schema["dates"], chunk_size)
+            dated_path.replace(tmp_path)
+        tmp_path.replace(prepared_path)
+        if optimize_dtypes and schema is not None:
+            save_dtype_schema(written_schema(schema), prepared_path)
+    except Exception as e:
+        logger.error(f"Error streaming {raw_path} to {prepared_path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        dated_path.unlink(missing_ok=True)
+        raise
+    logger.info(
+        f"Streamed {stats['rows_read']} rows from {raw_path}: "
+        f"{stats['duplicates_dropped']} duplicates dropped, {stats['rows_written']} rows written to {prepared_path}."
+    )
+    return stats
@@ -0,0 +1,194 @@
+"""
+Compact Dtype Schemas
+File: scripts/dtype_schema.py
+
+pd.read_csv returns int64, float64 and string columns by default, which wastes
+memory on low-cardinality text (Region, Category, PaymentType, ...) and on small
+numbers (Quantity, Discount, ...). This module infers compact dtypes for a DataFrame,
+applies them, and saves them as a JSON schema beside the CSV file
+(e.g. sales_data_prepared.schema.json) so every later reader gets the same
+dtypes, with dates parsed once, without re-inferring anything.
+
+Schema format:
+    {"dtypes": {"StoreID": "int16", "Region": "category", ...},
+     "dates": {"SaleDate": "%Y-%m-%d", ...}}
+"""
+
+import json
+import pathlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Constants
+DEFAULT_CATEGORY_THRESHOLD: float = 0.5  # Max ratio of distinct values to rows for a categorical
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %H:%M")
+ISO_DATE_FORMAT: str = "%Y-%m-%d"
+ISO_DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+INTEGER_TYPES = ("int8", "int16", "int32", "int64")
+KEY_COLUMN_SUFFIX: str = "ID"  # TransactionID, CustomerID, ...: keys grow with the data, so never downcast
+
+DtypeSchema = Dict[str, Dict[str, str]]
+
+
+def _smallest_integer_type(series: pd.Series) -> str:
+    low, high = series.min(), series.max()
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "int64"
+
+
+def _detect_date_format(series: pd.Series) -> Optional[str]:
+    """Return the first known format that parses every non-null value, if any."""
+    present = series.dropna()
+    if present.empty:
+        return None
+    sample = present.iloc[:1000]
+    for date_format in DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=date_format, errors="coerce")
+        if parsed.notna().all() and pd.to_datetime(present, format=date_format, errors="coerce").notna().all():
+            return date_format
+    return None
+
+
+def infer_dtype_schema(df: pd.DataFrame, category_threshold: float = DEFAULT_CATEGORY_THRESHOLD) -> DtypeSchema:
+    """Infer the most compact lossless dtype for each column.
+
+    - text columns where every value matches a known date format become dates
+    - other text columns with few distinct values become categoricals
+    - integer columns are downcast to the smallest integer type that fits, except
+      ID/key columns, which stay int64 because later rows can outgrow this data
+    - float columns become float32 only if every value survives the round trip
+    """
+    schema: DtypeSchema = {"dtypes": {}, "dates": {}}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            has_time = (series.dropna() != series.dropna().dt.normalize()).any()
+            schema["dates"][column] = ISO_DATETIME_FORMAT if has_time else ISO_DATE_FORMAT
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            schema["dtypes"][column] = "category"
+        elif pd.api.types.is_bool_dtype(series):
+            schema["dtypes"][column] = "bool"
+        elif pd.api.types.is_integer_dtype(series):
+            if str(column).endswith(KEY_COLUMN_SUFFIX):
+                schema["dtypes"][column] = "int64"
+            else:
+                schema["dtypes"][column] = _smallest_integer_type(series) if len(series) else str(series.dtype)
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            lossless = np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+            schema["dtypes"][column] = "float32" if lossless else "float64"
+        else:
+            date_format = _detect_date_format(series)
+            if date_format is not None:
+                schema["dates"][column] = date_format
+            elif len(series) and series.nunique(dropna=True) <= category_threshold * len(series):
+                schema["dtypes"][column] = "category"
+    return schema
+
+
+def apply_dtype_schema(df: pd.DataFrame, schema: DtypeSchema) -> pd.DataFrame:
+    """Return df with the schema's dtypes applied and its date columns parsed."""
+    converted = {}
+    for column, dtype in schema.get("dtypes", {}).items():
+        if column in df.columns and str(df[column].dtype) != dtype:
+            converted[column] = df[column].astype(dtype)
+    for column, date_format in schema.get("dates", {}).items():
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            converted[column] = pd.to_datetime(df[column], format=date_format)
+    return df.assign(**converted) if converted else df
+
+
+def written_schema(schema: DtypeSchema) -> DtypeSchema:
+    """Return the schema of a frame after to_csv, which writes dates in ISO format."""
+    return {
+        "dtypes": dict(schema.get("dtypes", {})),
+        "dates": {
+            column: ISO_DATETIME_FORMAT if "%H" in date_format else ISO_DATE_FORMAT
+            for column, date_format in schema.get("dates", {}).items()
+        },
+    }
+
+
+def merge_dtype_schemas(first: DtypeSchema, second: DtypeSchema) -> DtypeSchema:
+    """Combine schemas inferred from two chunks of one file into one that fits both."""
+    dtypes: Dict[str, str] = {}
+    for column in set(first.get("dtypes", {})) | set(second.get("dtypes", {})):
+        a, b = first.get("dtypes", {}).get(column), second.get("dtypes", {}).get(column)
+        if "category" in (a, b) and {a, b} <= {"category", None}:
+            dtypes[column] = "category"  # A small chunk with more distinct text does not undo a categorical
+        elif a is None or b is None:
+            continue
+        elif a == b:
+            dtypes[column] = a
+        elif a in INTEGER_TYPES and b in INTEGER_TYPES:
+            dtypes[column] = max(a, b, key=INTEGER_TYPES.index)
+        elif {a, b} <= set(INTEGER_TYPES) | {"float32", "float64"}:
+            dtypes[column] = "float64"
+    dates = {
+        column: date_format
+        for column, date_format in first.get("dates", {}).items()
+        if second.get("dates", {}).get(column) == date_format
+    }
+    return {"dtypes": dtypes, "dates": dates}
+
+
+def schema_path_for(csv_path: pathlib.Path) -> pathlib.Path:
+    """Return the schema file that sits beside a CSV file."""
+    return csv_path.with_name(f"{csv_path.stem}.schema.json")
+
+
+def save_dtype_schema(schema: DtypeSchema, csv_path: pathlib.Path) -> pathlib.Path:
+    """Write the schema beside csv_path and return its path."""
+    path = schema_path_for(csv_path)
+    path.write_text(json.dumps(schema, indent=2, sort_keys=True))
+    return path
+
+
+def load_dtype_schema(csv_path: pathlib.Path) -> Optional[DtypeSchema]:
+    """Return the schema saved beside csv_path, or None if there is none."""
+    path = schema_path_for(csv_path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def read_csv_with_schema(csv_path: pathlib.Path, **read_csv_kwargs: Any) -> pd.DataFrame:
+    """Read a CSV file using the schema saved beside it, if any.
+
+    Integer columns are read as int64 and only narrowed to the schema's type when
+    every value fits, so a file that outgrew its schema is not silently wrapped.
+    """
+    schema = load_dtype_schema(csv_path)
+    if schema is None:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+    dtypes, dates = schema.get("dtypes", {}), schema.get("dates", {})
+    usecols = read_csv_kwargs.get("usecols")
+    if usecols is not None and not callable(usecols):
+        dtypes = {column: dtype for column, dtype in dtypes.items() if column in usecols}
+        dates = {column: date_format for column, date_format in dates.items() if column in usecols}
+    narrow = {column: dtype for column, dtype in dtypes.items() if dtype in INTEGER_TYPES and dtype != "int64"}
+    df = pd.read_csv(
+        csv_path,
+        dtype={**dtypes, **{column: "int64" for column in narrow}},
+        parse_dates=list(dates) or None,
+        date_format=dates or None,
+        **read_csv_kwargs,
+    )
+    fitting = {
+        column: df[column].astype(dtype)
+        for column, dtype in narrow.items()
+        if column in df.columns and _smallest_integer_type(df[column]) in INTEGER_TYPES[:INTEGER_TYPES.index(dtype) + 1]
+    }
+    return df.assign(**fitting) if fitting else df
+
+
+def write_csv_with_schema(df: pd.DataFrame, csv_path: pathlib.Path, schema: Optional[DtypeSchema] = None) -> None:
+    """Write df to csv_path and save the schema readers should use for it."""
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(csv_path, index=False)
+    save_dtype_schema(written_schema(schema or infer_dtype_schema(df)), csv_path)
@@ -0,0 +1,191 @@
+"""
+Data Warehouse Connections
+File: scripts/dw_access.py
+
+Shared access to smart_sales.db, so scripts stop opening their own default
+connections:
+
+- connect() opens a tuned connection: WAL journal, memory-mapped reads, a larger
+  page cache, in-memory temp tables and a busy timeout, so a reader waits for a
+  writer instead of failing with "database is locked".
+- read_connection() lends a read-only connection (a mode=ro URI) from a
+  thread-safe pool per database, so analysis jobs reuse connections instead of
+  paying the setup cost every time, and can never take a write lock.
+- write_connection() serializes writers within the process with a lock per
+  database; writers in other processes queue on SQLite's own lock through the
+  busy timeout. The block commits on success and rolls back on error.
+
+Example:
+    with read_connection() as conn:
+        cube = pd.read_sql_query(OLAP_CUBE_QUERY, conn)
+
+    with write_connection() as conn:
+        bulk_load_tables(conn, frames)
+"""
+
+import pathlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+# Constants
+DB_PATH: pathlib.Path = pathlib.Path("data").joinpath("dw", "smart_sales.db")
+DEFAULT_POOL_SIZE: int = 4
+BUSY_TIMEOUT_MS: int = 30_000
+MMAP_SIZE_BYTES: int = 268_435_456  # 256 MiB
+CACHE_SIZE_KIB: int = 65_536  # 64 MiB
+CONNECTION_PRAGMAS: Tuple[str, ...] = (
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS};",
+    f"PRAGMA mmap_size={MMAP_SIZE_BYTES};",
+    f"PRAGMA cache_size=-{CACHE_SIZE_KIB};",
+    "PRAGMA temp_store=MEMORY;",
+)
+WRITER_PRAGMAS: Tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL;",  # stored in the database file; readers inherit it
+    "PRAGMA synchronous=NORMAL;",  # safe with WAL, and avoids an fsync per commit
+)
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_writer_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _database_key(db_path: pathlib.Path) -> str:
+    return str(pathlib.Path(db_path).resolve())
+
+
+def connect(db_path: pathlib.Path = DB_PATH, read_only: bool = False) -> sqlite3.Connection:
+    """Open a tuned connection; read-only connections use a mode=ro URI.
+
+    Connections may be used from any thread, one thread at a time (as the pool does).
+    """
+    if read_only:
+        uri = f"{pathlib.Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if not read_only:
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of tuned connections to one database.
+
+    Connections are opened on first demand, up to size; callers beyond that
+    wait for a connection to be returned.
+    """
+
+    def __init__(self, db_path: pathlib.Path = DB_PATH, size: int = DEFAULT_POOL_SIZE, read_only: bool = True):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Lend a connection for the duration of the block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                opening = True
+            else:
+                opening = False
+        if not opening:
+            return self._idle.get()
+        try:
+            return connect(self.db_path, read_only=self.read_only)
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()  # never hand out a connection with an open transaction
+        if self._closed:
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close the idle connections; connections still lent out are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+def get_pool(db_path: pathlib.Path = DB_PATH, size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """Return the shared read-only pool for a database, creating it on first use."""
+    key = _database_key(db_path)
+    with _registry_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = ConnectionPool(db_path, size=size, read_only=True)
+        return pool
+
+
+@contextmanager
+def read_connection(db_path: pathlib.Path = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Lend a pooled read-only connection to the database."""
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+@contextmanager
+def write_connection(db_path: pathlib.Path = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Open the database for writing, one writer at a time per database in this process.
+
+    Commits when the block succeeds, rolls back when it raises, and closes the
+    connection either way.
+    """
+    key = _database_key(db_path)
+    with _registry_lock:
+        lock = _writer_locks.setdefault(key, threading.Lock())
+    with lock:
+        conn = connect(db_path)
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def close_pools() -> None:
+    """Close every shared read-only pool."""
+    with _registry_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
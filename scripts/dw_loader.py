@@ -0,0 +1,423 @@
+"""
+Bulk Loader for the Data Warehouse
+File: scripts/dw_loader.py
+
+Loads DataFrames into the tables defined by create_dw.py without replacing them,
+so primary keys, foreign keys and NOT NULL constraints are kept. All tables are
+loaded in a single transaction with executemany on one prepared INSERT per table.
+During the load:
+
+- journal_mode=WAL, synchronous=OFF and a large page cache avoid an fsync per batch
+- secondary indexes are dropped and rebuilt once the rows are in, which is much
+  cheaper than updating every index on every insert
+- the sales summary triggers (dw_summary.py) are dropped too, and the summary is
+  rebuilt in one GROUP BY pass after the sales rows are in
+- foreign keys are checked once at the end with PRAGMA foreign_key_check
+
+Incremental loads (upsert_tables) compare a 64-bit content hash per row, keyed by
+the table's primary key, with the hashes recorded by the previous load, and write
+only new or changed rows with INSERT ... ON CONFLICT DO UPDATE; the summary
+triggers update just the affected summary groups. Each load records
+a high-water mark (max key, max date, row count) per table in etl_watermarks.
+
+Every load that changes rows also bumps the warehouse data version in dw_metadata,
+in the same transaction, so caches keyed on it (query_cache.py) see new data. The
+version restarts at 1 when the database is recreated, so each bump also records a
+random data identity; caches key on both, and a rebuilt warehouse never matches
+results cached from the one it replaced.
+"""
+
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice, repeat
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.create_dw import PRIMARY_KEYS, create_tables
+from scripts.data_streaming import row_fingerprints
+from scripts.dw_summary import SUMMARY_TABLE, create_summary_tables, rebuild_summaries
+from utils.logger import logger
+
+# Constants
+DEFAULT_BATCH_SIZE: int = 50_000
+BULK_LOAD_CACHE_KIB: int = 262_144  # 256 MiB page cache while loading
+BULK_LOAD_PRAGMAS: Tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=OFF;",
+    f"PRAGMA cache_size=-{BULK_LOAD_CACHE_KIB};",
+    "PRAGMA temp_store=MEMORY;",
+)
+RESTORED_PRAGMAS: Tuple[str, ...] = ("synchronous", "cache_size", "temp_store")
+WATERMARK_DATE_COLUMNS: Dict[str, str] = {"sales": "SaleDate"}
+DATA_VERSION_KEY: str = "data_version"
+DATA_IDENTITY_KEY: str = "data_identity"
+
+# Bookkeeping for incremental loads
+ETL_STATE_DEFINITIONS: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS etl_row_hashes (
+        TableName TEXT NOT NULL,
+        RowKey INTEGER NOT NULL,
+        RowHash INTEGER NOT NULL,
+        PRIMARY KEY (TableName, RowKey)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS etl_watermarks (
+        TableName TEXT PRIMARY KEY,
+        MaxKey INTEGER,
+        MaxDate TEXT,
+        RowCount INTEGER,
+        LoadedAt TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dw_metadata (
+        Key TEXT PRIMARY KEY,
+        Value TEXT NOT NULL
+    );
+    """,
+)
+
+
+@contextmanager
+def bulk_load_settings(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Apply the bulk-load PRAGMAs for the duration of the block.
+
+    WAL stays on afterwards (it is a property of the database file and suits the
+    read-heavy OLAP scripts); synchronous, the cache size and temp_store are
+    restored to the connection's previous values.
+    """
+    previous = {pragma: conn.execute(f"PRAGMA {pragma};").fetchone()[0] for pragma in RESTORED_PRAGMAS}
+    for pragma in BULK_LOAD_PRAGMAS:
+        conn.execute(pragma)
+    try:
+        yield conn
+    finally:
+        for pragma, value in previous.items():
+            conn.execute(f"PRAGMA {pragma}={value};")
+
+
+def create_etl_state_tables(conn: sqlite3.Connection) -> None:
+    """Create the row-hash, watermark and metadata tables used by incremental loads."""
+    for ddl in ETL_STATE_DEFINITIONS:
+        conn.execute(ddl)
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Return the column names of a table, in definition order."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table});")]
+
+
+def _schema_objects(conn: sqlite3.Connection, kind: str, tables: Sequence[str]) -> Dict[str, str]:
+    placeholders = ", ".join("?" for _ in tables)
+    rows = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = ? AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders});",
+        [kind, *tables],
+    )
+    return {name: sql for name, sql in rows}
+
+
+def table_indexes(conn: sqlite3.Connection, tables: Sequence[str]) -> Dict[str, str]:
+    """Return {index name: CREATE INDEX statement} for explicit indexes on the tables."""
+    return _schema_objects(conn, "index", tables)
+
+
+def table_triggers(conn: sqlite3.Connection, tables: Sequence[str]) -> Dict[str, str]:
+    """Return {trigger name: CREATE TRIGGER statement} for triggers on the tables."""
+    return _schema_objects(conn, "trigger", tables)
+
+
+def _format_dates(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """Return df[columns] with datetime columns as YYYY-MM-DD (or full ISO) text."""
+    dates = {}
+    for column in columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            has_time = (series.dropna() != series.dropna().dt.normalize()).any()
+            dates[column] = series.dt.strftime("%Y-%m-%d %H:%M:%S" if has_time else "%Y-%m-%d")
+    frame = df[list(columns)]
+    return frame.assign(**dates) if dates else frame
+
+
+def dataframe_rows(df: pd.DataFrame, columns: Sequence[str]) -> Iterator[Tuple[Any, ...]]:
+    """Yield rows as tuples of plain Python values that sqlite3 can bind.
+
+    Missing values become None, numpy scalars become int/float, and datetime
+    columns become YYYY-MM-DD (or full ISO) text.
+    """
+    frame = _format_dates(df, columns)
+    converted = []
+    for column in columns:
+        series = frame[column]
+        if pd.api.types.is_numeric_dtype(series) and not series.hasnans:
+            # tolist() on a numpy array returns Python ints and floats directly
+            converted.append(series.to_numpy().tolist())
+        else:
+            values = series.astype(object).where(series.notna(), None).tolist()
+            converted.append([value.item() if isinstance(value, np.generic) else value for value in values])
+    return zip(*converted)
+
+
+def row_hashes(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Return a signed 64-bit content hash per row, as the row would be stored."""
+    return row_fingerprints(_format_dates(df, columns)).view(np.int64)
+
+
+def _batches(rows: Iterator[Tuple[Any, ...]], batch_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _insert_rows(conn: sqlite3.Connection, sql: str, rows: Iterator[Tuple[Any, ...]], batch_size: int) -> None:
+    for batch in _batches(rows, batch_size):
+        conn.executemany(sql, batch)
+
+
+def has_unique_key(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Return True if column alone is the table's PRIMARY KEY or has a UNIQUE index, as ON CONFLICT needs."""
+    primary_key = [row[1] for row in sorted(conn.execute(f"PRAGMA table_info({table});"), key=lambda row: row[5]) if row[5]]
+    if primary_key == [column]:
+        return True
+    for _, name, unique, _, partial in conn.execute(f"PRAGMA index_list({table});"):
+        if unique and not partial and [row[2] for row in conn.execute(f"PRAGMA index_info({name});")] == [column]:
+            return True
+    return False
+
+
+def tables_without_unique_key(conn: sqlite3.Connection, tables: Sequence[str]) -> List[str]:
+    """Return the tables whose PRIMARY_KEYS column is not a primary key or unique, e.g. tables left by to_sql."""
+    return [table for table in tables if not has_unique_key(conn, table, PRIMARY_KEYS[table])]
+
+
+def _loaded_columns(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> List[str]:
+    columns = [column for column in table_columns(conn, table) if column in df.columns]
+    key = PRIMARY_KEYS[table]
+    if key not in columns:
+        raise KeyError(f"Column {key} is required to load {table}.")
+    return columns
+
+
+def _record_row_hashes(conn: sqlite3.Connection, table: str, keys: np.ndarray, hashes: np.ndarray,
+                       batch_size: int) -> None:
+    rows = zip(repeat(table), keys.tolist(), hashes.tolist())
+    _insert_rows(
+        conn,
+        "INSERT INTO etl_row_hashes (TableName, RowKey, RowHash) VALUES (?, ?, ?) "
+        "ON CONFLICT (TableName, RowKey) DO UPDATE SET RowHash = excluded.RowHash;",
+        rows,
+        batch_size,
+    )
+
+
+def _record_watermark(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    """Advance the table's high-water mark to cover the rows just loaded."""
+    key = PRIMARY_KEYS[table]
+    max_key = int(df[key].max()) if len(df) else None
+    max_date = None
+    date_column = WATERMARK_DATE_COLUMNS.get(table)
+    if date_column in df.columns and len(df):
+        max_date = _format_dates(df, [date_column])[date_column].max()
+    row_count = conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+    conn.execute(
+        "INSERT INTO etl_watermarks (TableName, MaxKey, MaxDate, RowCount, LoadedAt) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (TableName) DO UPDATE SET "
+        "MaxKey = max(coalesce(MaxKey, excluded.MaxKey), coalesce(excluded.MaxKey, MaxKey)), "
+        "MaxDate = max(coalesce(MaxDate, excluded.MaxDate), coalesce(excluded.MaxDate, MaxDate)), "
+        "RowCount = excluded.RowCount, LoadedAt = excluded.LoadedAt;",
+        (table, max_key, max_date, row_count, datetime.now().isoformat(timespec="seconds")),
+    )
+
+
+def read_watermark(conn: sqlite3.Connection, table: str) -> Optional[Dict[str, Any]]:
+    """Return the high-water mark recorded for a table, or None if it was never loaded."""
+    create_etl_state_tables(conn)
+    row = conn.execute(
+        "SELECT MaxKey, MaxDate, RowCount, LoadedAt FROM etl_watermarks WHERE TableName = ?;", (table,)
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("max_key", "max_date", "row_count", "loaded_at"), row))
+
+
+def read_data_version(conn: sqlite3.Connection) -> int:
+    """Return the warehouse data version, or 0 if nothing was loaded yet.
+
+    Does not create any table, so it also works on read-only connections.
+    """
+    try:
+        row = conn.execute("SELECT Value FROM dw_metadata WHERE Key = ?;", (DATA_VERSION_KEY,)).fetchone()
+    except sqlite3.OperationalError:  # no dw_metadata table yet
+        return 0
+    return int(row[0]) if row else 0
+
+
+def read_data_identity(conn: sqlite3.Connection) -> str:
+    """Return the random identity recorded with the current data version, or '' if nothing was loaded yet."""
+    try:
+        row = conn.execute("SELECT Value FROM dw_metadata WHERE Key = ?;", (DATA_IDENTITY_KEY,)).fetchone()
+    except sqlite3.OperationalError:  # no dw_metadata table yet
+        return ""
+    return row[0] if row else ""
+
+
+def read_data_stamp(conn: sqlite3.Connection) -> str:
+    """Return the data version and identity as one string, e.g. '3-9f1c...', for keying caches."""
+    return f"{read_data_version(conn)}-{read_data_identity(conn)}"
+
+
+def bump_data_version(conn: sqlite3.Connection) -> int:
+    """Increment the warehouse data version, with a new data identity, in the caller's transaction and return it."""
+    version = read_data_version(conn) + 1
+    conn.executemany(
+        "INSERT INTO dw_metadata (Key, Value) VALUES (?, ?) ON CONFLICT (Key) DO UPDATE SET Value = excluded.Value;",
+        [(DATA_VERSION_KEY, str(version)), (DATA_IDENTITY_KEY, uuid.uuid4().hex)],
+    )
+    return version
+
+
+def changed_row_mask(conn: sqlite3.Connection, table: str, keys: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    """Return True for rows whose key is new or whose hash differs from the last load."""
+    known = np.array(
+        conn.execute("SELECT RowKey, RowHash FROM etl_row_hashes WHERE TableName = ? ORDER BY RowKey;", (table,)).fetchall(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if len(known) == 0:
+        return np.ones(len(keys), dtype=bool)
+    known_keys, known_hashes = known[:, 0], known[:, 1]
+    position = np.searchsorted(known_keys, keys)
+    clipped = np.minimum(position, len(known_keys) - 1)
+    found = (position < len(known_keys)) & (known_keys[clipped] == keys)
+    return ~found | (known_hashes[clipped] != hashes)
+
+
+def bulk_load_tables(
+    conn: sqlite3.Connection,
+    frames: Dict[str, pd.DataFrame],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Replace the rows of each table with the rows of its DataFrame, keeping the schema.
+
+    Tables are loaded in the order given, so pass dimensions before facts. Only
+    DataFrame columns that exist in the table are loaded. Everything happens in
+    one transaction: on any error the warehouse is left as it was. Row hashes and
+    watermarks are recorded so a later incremental load only writes the delta.
+
+    Returns:
+        Dict[str, int]: Rows loaded per table.
+    """
+    create_tables(conn)
+    create_summary_tables(conn)
+    create_etl_state_tables(conn)
+    conn.commit()
+    tables = list(frames)
+    loaded: Dict[str, int] = {}
+    with bulk_load_settings(conn):
+        indexes = table_indexes(conn, tables + [SUMMARY_TABLE])
+        triggers = table_triggers(conn, tables)
+        try:
+            conn.execute("BEGIN;")
+            for name in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name};")
+            for name in indexes:
+                conn.execute(f"DROP INDEX IF EXISTS {name};")
+            for table in reversed(tables):
+                conn.execute(f"DELETE FROM {table};")
+            for table, df in frames.items():
+                columns = _loaded_columns(conn, table, df)
+                insert = (
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)});"
+                )
+                _insert_rows(conn, insert, dataframe_rows(df, columns), batch_size)
+                conn.execute("DELETE FROM etl_row_hashes WHERE TableName = ?;", (table,))
+                conn.execute("DELETE FROM etl_watermarks WHERE TableName = ?;", (table,))
+                keys = df[PRIMARY_KEYS[table]].to_numpy(dtype=np.int64)
+                _record_row_hashes(conn, table, keys, row_hashes(df, columns), batch_size)
+                _record_watermark(conn, table, df)
+                loaded[table] = len(df)
+                logger.info(f"Bulk loaded {len(df)} rows into {table}.")
+            if "sales" in frames:
+                groups = rebuild_summaries(conn)
+                logger.info(f"Rebuilt {SUMMARY_TABLE} with {groups} groups.")
+            for sql in indexes.values():
+                conn.execute(sql)
+            for sql in triggers.values():
+                conn.execute(sql)
+            bump_data_version(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+    if violations:
+        logger.warning(f"{len(violations)} rows violate foreign keys, e.g. {violations[:5]}.")
+    return loaded
+
+
+def upsert_tables(
+    conn: sqlite3.Connection,
+    frames: Dict[str, pd.DataFrame],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Apply only new or changed rows of each DataFrame, keyed on the table's primary key.
+
+    Rows are matched on the key in PRIMARY_KEYS and compared by content hash with
+    the previous load; unchanged rows are skipped. Rows missing from the DataFrame
+    are left in the warehouse. Everything happens in one transaction.
+
+    Raises:
+        ValueError: If a table's key is not a PRIMARY KEY or UNIQUE column (a table
+            created by an older to_sql load); nothing is written then.
+
+    Returns:
+        Dict[str, int]: Rows inserted or updated per table.
+    """
+    create_tables(conn)
+    create_summary_tables(conn)
+    create_etl_state_tables(conn)
+    conn.commit()
+    unkeyed = tables_without_unique_key(conn, list(frames))
+    if unkeyed:
+        raise ValueError(
+            f"Cannot upsert into {unkeyed}: their key columns are not PRIMARY KEY or UNIQUE. "
+            "Run a full load (or create_dw.py --rebuild) first."
+        )
+    applied: Dict[str, int] = {}
+    try:
+        conn.execute("BEGIN;")
+        for table, df in frames.items():
+            columns = _loaded_columns(conn, table, df)
+            key = PRIMARY_KEYS[table]
+            keys = df[key].to_numpy(dtype=np.int64)
+            hashes = row_hashes(df, columns)
+            changed = changed_row_mask(conn, table, keys, hashes)
+            updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key)
+            upsert = (
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT ({key}) DO UPDATE SET {updates};"
+            )
+            delta = df[changed]
+            _insert_rows(conn, upsert, dataframe_rows(delta, columns), batch_size)
+            _record_row_hashes(conn, table, keys[changed], hashes[changed], batch_size)
+            _record_watermark(conn, table, delta)
+            applied[table] = len(delta)
+            logger.info(f"Upserted {len(delta)} new or changed rows into {table}; skipped {len(df) - len(delta)} unchanged.")
+        if any(applied.values()):
+            bump_data_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+    if violations:
+        logger.warning(f"{len(violations)} rows violate foreign keys, e.g. {violations[:5]}.")
+    return applied
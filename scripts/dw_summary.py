@@ -0,0 +1,114 @@
+"""
+Pre-aggregated Sales Summary
+File: scripts/dw_summary.py
+
+Maintains sales_daily_summary inside the warehouse: one row per
+(SaleDate, ProductID, CustomerID, StoreID) with the sum, count and sum of squares
+of SaleAmount, plus the day of week (strftime('%w'), 0=Sunday). OLAP and dashboard
+queries group these rows instead of the sales fact table. Averages and variances
+are derived from the stored measures:
+
+    AvgSales = SUM(TotalSales) / SUM(SalesCount)
+    VarSales = (SUM(SumSquares) - SUM(TotalSales)^2 / SUM(SalesCount)) / (SUM(SalesCount) - 1)
+
+Triggers on sales keep the summary current as rows are inserted, updated (including
+upserts) or deleted, so incremental ETL runs only touch the affected groups. Bulk
+loads drop the triggers and rebuild the summary in one GROUP BY pass instead.
+"""
+
+import sqlite3
+from typing import Dict
+
+# Constants
+SUMMARY_TABLE: str = "sales_daily_summary"
+
+SUMMARY_TABLE_DEFINITION: str = """
+    CREATE TABLE IF NOT EXISTS sales_daily_summary (
+        SaleDate TEXT NOT NULL,
+        ProductID INTEGER NOT NULL,
+        CustomerID INTEGER NOT NULL,
+        StoreID INTEGER NOT NULL,
+        DayOfWeek TEXT NOT NULL,
+        TotalSales REAL NOT NULL,
+        SalesCount INTEGER NOT NULL,
+        SumSquares REAL NOT NULL,
+        PRIMARY KEY (SaleDate, ProductID, CustomerID, StoreID)
+    ) WITHOUT ROWID;
+"""
+
+SUMMARY_INDEX_DEFINITIONS: Dict[str, str] = {
+    "idx_summary_weekday_product_customer_store": (
+        "CREATE INDEX IF NOT EXISTS idx_summary_weekday_product_customer_store "
+        "ON sales_daily_summary (DayOfWeek, ProductID, CustomerID, StoreID, TotalSales, SalesCount, SumSquares);"
+    ),
+}
+
+# Add (sign = +1) or remove (sign = -1) one sales row from its summary group
+_APPLY_ROW = """
+    INSERT INTO sales_daily_summary
+        (SaleDate, ProductID, CustomerID, StoreID, DayOfWeek, TotalSales, SalesCount, SumSquares)
+    VALUES
+        ({row}.SaleDate, {row}.ProductID, {row}.CustomerID, {row}.StoreID, strftime('%w', {row}.SaleDate),
+         {sign} * {row}.SaleAmount, {sign}, {sign} * {row}.SaleAmount * {row}.SaleAmount)
+    ON CONFLICT (SaleDate, ProductID, CustomerID, StoreID) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        SalesCount = SalesCount + excluded.SalesCount,
+        SumSquares = SumSquares + excluded.SumSquares;
+"""
+
+_DROP_EMPTY_GROUP = """
+    DELETE FROM sales_daily_summary
+    WHERE SaleDate = OLD.SaleDate AND ProductID = OLD.ProductID
+      AND CustomerID = OLD.CustomerID AND StoreID = OLD.StoreID AND SalesCount = 0;
+"""
+
+SUMMARY_TRIGGER_DEFINITIONS: Dict[str, str] = {
+    "trg_sales_summary_insert": (
+        "CREATE TRIGGER IF NOT EXISTS trg_sales_summary_insert AFTER INSERT ON sales BEGIN"
+        + _APPLY_ROW.format(row="NEW", sign=1)
+        + "END;"
+    ),
+    "trg_sales_summary_update": (
+        "CREATE TRIGGER IF NOT EXISTS trg_sales_summary_update AFTER UPDATE ON sales BEGIN"
+        + _APPLY_ROW.format(row="OLD", sign=-1)
+        + _DROP_EMPTY_GROUP
+        + _APPLY_ROW.format(row="NEW", sign=1)
+        + "END;"
+    ),
+    "trg_sales_summary_delete": (
+        "CREATE TRIGGER IF NOT EXISTS trg_sales_summary_delete AFTER DELETE ON sales BEGIN"
+        + _APPLY_ROW.format(row="OLD", sign=-1)
+        + _DROP_EMPTY_GROUP
+        + "END;"
+    ),
+}
+
+REBUILD_SUMMARY_SQL: str = """
+    INSERT INTO sales_daily_summary
+        (SaleDate, ProductID, CustomerID, StoreID, DayOfWeek, TotalSales, SalesCount, SumSquares)
+    SELECT
+        SaleDate, ProductID, CustomerID, StoreID, strftime('%w', SaleDate),
+        SUM(SaleAmount), COUNT(*), SUM(SaleAmount * SaleAmount)
+    FROM sales
+    GROUP BY SaleDate, ProductID, CustomerID, StoreID;
+"""
+
+
+def create_summary_tables(conn: sqlite3.Connection) -> None:
+    """Create the summary table, its index and the triggers that maintain it."""
+    conn.execute(SUMMARY_TABLE_DEFINITION)
+    for ddl in SUMMARY_INDEX_DEFINITIONS.values():
+        conn.execute(ddl)
+    for ddl in SUMMARY_TRIGGER_DEFINITIONS.values():
+        conn.execute(ddl)
+
+
+def rebuild_summaries(conn: sqlite3.Connection) -> int:
+    """Recompute the summary from the sales table and return the number of groups.
+
+    Runs in the caller's transaction and replaces whatever the triggers have
+    accumulated, so bulk loads can drop the triggers while inserting.
+    """
+    conn.execute(f"DELETE FROM {SUMMARY_TABLE};")
+    conn.execute(REBUILD_SUMMARY_SQL)
+    return conn.execute(f"SELECT COUNT(*) FROM {SUMMARY_TABLE};").fetchone()[0]
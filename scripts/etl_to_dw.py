@@ -3,12 +3,22 @@ Module 5: ETL to Data Warehouse Script
 File: scripts/etl_to_dw.py
 This script handles the ETL (Extract, Transform, Load) process. It extracts prepared data
 from 'data/prepared/', transforms it (if needed), and loads it into the 'data/smart_sales.db' database.
+Tables are bulk loaded into the schema defined by create_dw.py (see dw_loader.py), so
+keys and constraints are kept.
+
+Usage:
+    python3 scripts/etl_to_dw.py [--incremental]
+
+--incremental applies only new or changed rows (matched on each table's primary key
+by content hash) instead of reloading every table.
 """
 
+import argparse
 import pandas as pd
 import sqlite3
 import sys
 import pathlib
+from typing import List, Tuple
 
 # For local imports, temporarily add project root to Python sys.path
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
@@ -18,11 +28,29 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Now we can import local modules
 from utils.logger import logger  # noqa: E402
+from scripts.dw_access import write_connection  # noqa: E402
+from scripts.dw_loader import bulk_load_tables, read_watermark, tables_without_unique_key, upsert_tables  # noqa: E402
+from scripts.fact_snapshot import write_table_snapshot  # noqa: E402
+from scripts.olap.olap_indexes import ensure_olap_indexes  # noqa: E402
+from scripts.prepared_io import prepared_files, read_prepared  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
 # Constants
 DW_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw")
 DB_PATH: pathlib.Path = DW_DIR.joinpath("smart_sales.db")
 PREPARED_DATA_DIR: pathlib.Path = pathlib.Path("data").joinpath("prepared")
+SNAPSHOT_DIR: pathlib.Path = DW_DIR.joinpath("sales_columns")
+PREPARED_FILES: List[pathlib.Path] = [
+    PREPARED_DATA_DIR.joinpath(f"{table}_data_prepared.csv") for table in ("customers", "products", "sales")
+]
+# Modules the load depends on besides this script (part of the stage cache key)
+LOAD_CODE: Tuple[str, ...] = (
+    "scripts.create_dw",
+    "scripts.dw_loader",
+    "scripts.fact_snapshot",
+    "scripts.olap.olap_indexes",
+    "scripts.prepared_io",
+)
 
 
 def transform_sales_data(sales: pd.DataFrame) -> pd.DataFrame:
@@ -36,51 +64,67 @@ def transform_sales_data(sales: pd.DataFrame) -> pd.DataFrame:
         raise
 
 
-def load_data_to_db() -> None:
-    """Load prepared data into the data warehouse using the correct table names."""
-    conn = None
+@cached_stage(
+    inputs=[path for csv_path in PREPARED_FILES for path in prepared_files(csv_path)],
+    outputs=[DB_PATH, SNAPSHOT_DIR],
+    code=LOAD_CODE,
+    bypass=lambda incremental: incremental,  # an incremental load depends on what is already loaded
+    store_outputs=False,  # the warehouse is too large to copy into the stage cache
+)
+def load_data_to_db(incremental: bool = False) -> None:
+    """Load prepared data into the data warehouse using the correct table names.
+
+    With incremental=True, only new or changed rows are written; a table without
+    a key to match rows on (left by an older to_sql load) gets a full load instead.
+    A full load is skipped when the prepared files and the loading code are
+    unchanged and the warehouse is still as the last load left it; otherwise it
+    runs again. Errors are logged and re-raised.
+    """
     try:
-        # Connect to the SQLite database
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        # Open the database for writing (one writer at a time; reads stay available under WAL)
+        with write_connection(DB_PATH) as conn:
+            logger.info("Connection to SQLite database established.")
 
-        logger.info("Connection to SQLite database established.")
+            # Load prepared data (Parquet when available, otherwise the CSV export and its schema)
+            customers, products, sales = (read_prepared(csv_path) for csv_path in PREPARED_FILES)
 
-        # Load prepared data
-        customers = pd.read_csv(PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv"))
-        products = pd.read_csv(PREPARED_DATA_DIR.joinpath("products_data_prepared.csv"))
-        sales = pd.read_csv(PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv"))
+            logger.info("Prepared data loaded into DataFrames.")
 
-        logger.info("Prepared data loaded into DataFrames.")
+            # Transform sales data
+            sales = transform_sales_data(sales)
 
-        # Transform sales data
-        sales = transform_sales_data(sales)
+            # Load dimensions before the fact table, in one transaction
+            frames = {"customers": customers, "products": products, "sales": sales}
+            unkeyed = tables_without_unique_key(conn, list(frames)) if incremental else []
+            if unkeyed:
+                logger.warning(f"Tables {unkeyed} have no primary key to upsert on; doing a full load instead.")
+            if incremental and not unkeyed:
+                upsert_tables(conn, frames)
+                watermark = read_watermark(conn, "sales")
+                logger.info(f"Sales high-water mark: TransactionID {watermark['max_key']}, SaleDate {watermark['max_date']}.")
+            else:
+                bulk_load_tables(conn, frames)
+            logger.info("Customers, products and sales tables loaded successfully.")
 
-        # Load customers
-        customers.to_sql("customers", conn, if_exists="replace", index=False)
-        logger.info("Customers table loaded successfully.")
+            # Create the indexes the OLAP queries rely on (kept up to date by later loads)
+            ensure_olap_indexes(conn)
 
-        # Load products
-        products.to_sql("products", conn, if_exists="replace", index=False)
-        logger.info("Products table loaded successfully.")
+            # Verify data load
+            verify_data_load(conn)
 
-        # Load sales
-        sales.to_sql("sales", conn, if_exists="replace", index=False)
-        logger.info("Sales table loaded successfully.")
-
-        # Verify data load
-        verify_data_load(conn)
+            # Write the memory-mapped columnar copy of sales used by the analytics scripts
+            write_table_snapshot(conn, "sales", SNAPSHOT_DIR)
+        logger.info("SQLite connection closed.")
 
     except sqlite3.Error as e:
         logger.error(f"Database error during ETL: {e}")
+        raise
     except FileNotFoundError as e:
         logger.error(f"File not found during ETL: {e}")
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during ETL: {e}")
-    finally:
-        if conn:
-            conn.close()
-            logger.info("SQLite connection closed.")
+        raise
 
 
 def verify_data_load(conn: sqlite3.Connection) -> None:
@@ -103,8 +147,16 @@ def verify_data_load(conn: sqlite3.Connection) -> None:
 
 def main() -> None:
     """Main function for running the ETL process."""
+    parser = argparse.ArgumentParser(description="Load prepared data into the data warehouse.")
+    parser.add_argument("--incremental", action="store_true", help="Apply only new or changed rows.")
+    args = parser.parse_args()
+
     logger.info("Starting etl_to_dw ...")
-    load_data_to_db()
+    try:
+        load_data_to_db(incremental=args.incremental)
+    except Exception:
+        logger.error("ETL process failed.")
+        sys.exit(1)
     logger.info("ETL process completed successfully.")
 
 
@@ -0,0 +1,211 @@
+"""
+Columnar Fact Table Snapshot
+File: scripts/fact_snapshot.py
+
+The ETL writes a columnar snapshot of the sales table next to smart_sales.db:
+
+    data/dw/sales_columns/manifest.json     row count, data version, column kinds, category levels
+    data/dw/sales_columns/SaleAmount.npy    one .npy file per column
+    ...
+
+FactTableReader opens the snapshot with np.load(mmap_mode="r"), so each column is
+a read-only NumPy array backed by the file: opening costs the same whatever the
+table size, pages are read only when touched, and slicing a column does not copy.
+Analytics read columns from the snapshot instead of pulling every row through
+pd.read_sql_query.
+
+Columns are stored by SQLite type:
+
+    INTEGER NOT NULL   int64
+    INTEGER (nullable) float64, NULL as NaN
+    REAL               float64
+    TEXT ...Date       datetime64[D], NULL as NaT
+    other TEXT         int32 codes into sorted levels (in the manifest), NULL as -1
+"""
+
+import json
+import os
+import pathlib
+import shutil
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.dw_loader import read_data_identity, read_data_version
+from utils.logger import logger
+
+# Constants
+SNAPSHOT_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw", "sales_columns")
+MANIFEST_FILE: str = "manifest.json"
+SNAPSHOT_CHUNK_SIZE: int = 250_000
+
+INT = "int"
+FLOAT = "float"
+DATE = "date"
+CATEGORY = "category"
+KIND_DTYPES: Dict[str, str] = {INT: "int64", FLOAT: "float64", DATE: "datetime64[D]", CATEGORY: "int32"}
+
+
+def column_kinds(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+    """Return the snapshot kind of each column of a table, from its declared SQLite types."""
+    kinds = {}
+    for _, name, declared, not_null, _, primary_key in conn.execute(f"PRAGMA table_info({table});"):
+        declared = (declared or "").upper()
+        if "INT" in declared:
+            kinds[name] = INT if not_null or primary_key else FLOAT
+        elif any(token in declared for token in ("REAL", "FLOA", "DOUB", "NUM")):
+            kinds[name] = FLOAT
+        elif name.endswith("Date"):
+            kinds[name] = DATE
+        else:
+            kinds[name] = CATEGORY
+    return kinds
+
+
+def _encode(values: pd.Series, kind: str, levels: Optional[np.ndarray]) -> np.ndarray:
+    """Convert one chunk of a column to its snapshot dtype."""
+    if kind == DATE:
+        return pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[D]")
+    if kind == CATEGORY:
+        codes = np.full(len(values), -1, dtype=np.int32)
+        present = values.notna().to_numpy()
+        codes[present] = np.searchsorted(levels, values[present].astype(str).to_numpy())
+        return codes
+    return values.to_numpy(dtype=KIND_DTYPES[kind])
+
+
+def write_table_snapshot(
+    conn: sqlite3.Connection,
+    table: str = "sales",
+    snapshot_dir: pathlib.Path = SNAPSHOT_DIR,
+    chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+) -> pathlib.Path:
+    """Write the table as one .npy file per column, replacing any previous snapshot.
+
+    Rows are streamed in chunks into preallocated memory-mapped files, in
+    primary key order. The new snapshot is written beside the old one and
+    swapped in when complete, so readers never see a partial snapshot. A
+    snapshot already at the warehouse's data version and identity is left as
+    it is, so a load that changed nothing costs nothing here.
+    """
+    if snapshot_is_current(conn, table, snapshot_dir):
+        logger.info(f"Columnar snapshot of {table} in {snapshot_dir} is at the current data version; not rewritten.")
+        return snapshot_dir
+
+    kinds = column_kinds(conn, table)
+    row_count = conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+    levels = {
+        column: np.array([row[0] for row in conn.execute(
+            f"SELECT DISTINCT CAST({column} AS TEXT) FROM {table} WHERE {column} IS NOT NULL ORDER BY 1;"
+        )], dtype=str)
+        for column, kind in kinds.items() if kind == CATEGORY
+    }
+
+    temp_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    temp_dir.mkdir(parents=True)
+    try:
+        arrays = {
+            column: np.lib.format.open_memmap(
+                temp_dir.joinpath(f"{column}.npy"), mode="w+", dtype=KIND_DTYPES[kind], shape=(row_count,)
+            )
+            for column, kind in kinds.items()
+        }
+        offset = 0
+        query = f"SELECT {', '.join(kinds)} FROM {table} ORDER BY rowid;"
+        for chunk in pd.read_sql_query(query, conn, chunksize=chunk_size):
+            end = offset + len(chunk)
+            for column, kind in kinds.items():
+                arrays[column][offset:end] = _encode(chunk[column], kind, levels.get(column))
+            offset = end
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        manifest = {
+            "table": table,
+            "row_count": row_count,
+            "data_version": read_data_version(conn),
+            "data_identity": read_data_identity(conn),
+            "columns": kinds,
+            "levels": {column: values.tolist() for column, values in levels.items()},
+        }
+        temp_dir.joinpath(MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        old_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.old-{os.getpid()}")
+        if snapshot_dir.exists():
+            snapshot_dir.rename(old_dir)
+        temp_dir.rename(snapshot_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    logger.info(f"Wrote columnar snapshot of {table} ({row_count} rows) to {snapshot_dir}.")
+    return snapshot_dir
+
+
+def snapshot_is_current(conn: sqlite3.Connection, table: str = "sales", snapshot_dir: pathlib.Path = SNAPSHOT_DIR) -> bool:
+    """Return True if snapshot_dir holds a snapshot of table at the warehouse's current data version."""
+    try:
+        reader = FactTableReader(snapshot_dir)
+    except (FileNotFoundError, ValueError, KeyError):
+        return False
+    # An empty identity means the warehouse is not versioned, so its changes cannot be told apart
+    return reader.table == table and bool(reader.data_identity) and reader.is_current(conn)
+
+
+class FactTableReader:
+    """Read-only, memory-mapped access to the columns of a table snapshot."""
+
+    def __init__(self, snapshot_dir: pathlib.Path = SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        manifest = json.loads(snapshot_dir.joinpath(MANIFEST_FILE).read_text())
+        self.table: str = manifest["table"]
+        self.row_count: int = manifest["row_count"]
+        self.data_version: int = manifest["data_version"]
+        self.data_identity: str = manifest.get("data_identity", "")
+        self.kinds: Dict[str, str] = manifest["columns"]
+        self.levels: Dict[str, np.ndarray] = {
+            column: np.array(values, dtype=str) for column, values in manifest["levels"].items()
+        }
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.kinds)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """Return a column as a read-only memory-mapped array (category columns as codes)."""
+        if column not in self.kinds:
+            raise KeyError(f"Column {column} is not in the {self.table} snapshot.")
+        if column not in self._columns:
+            self._columns[column] = np.load(self.snapshot_dir.joinpath(f"{column}.npy"), mmap_mode="r")
+        return self._columns[column]
+
+    def decode(self, column: str, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return category codes as their string values (NULL codes as None)."""
+        codes = self[column] if values is None else values
+        if self.kinds[column] != CATEGORY:
+            return codes
+        decoded = self.levels[column].astype(object)[np.maximum(codes, 0)]
+        decoded[codes < 0] = None
+        return decoded
+
+    def chunks(self, columns: List[str], chunk_size: int = SNAPSHOT_CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, ...]]:
+        """Yield zero-copy slices of the columns, chunk_size rows at a time."""
+        arrays = [self[column] for column in columns]
+        for start in range(0, self.row_count, chunk_size):
+            yield tuple(array[start:start + chunk_size] for array in arrays)
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Copy columns into a DataFrame, with category columns decoded."""
+        return pd.DataFrame({column: self.decode(column) for column in (columns or self.columns)})
+
+    def is_current(self, conn: sqlite3.Connection) -> bool:
+        """Return True if no load has changed the warehouse, or recreated it, since the snapshot was written."""
+        return (self.data_version, self.data_identity) == (read_data_version(conn), read_data_identity(conn))
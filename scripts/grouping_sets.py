@@ -0,0 +1,43 @@
+"""
+Grouping Sets
+File: scripts/grouping_sets.py
+
+The aggregate levels ("views") of the sales cube and the grouping_id that tags
+each level's rows when all of them are computed in one GROUPING SETS job. Both
+the Spark transforms (step2_transform/step3_load) and the pandas engine use
+these, so their outputs are split the same way.
+"""
+
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+# Columns derived from SaleDate before cubing
+DATE_PART_COLUMNS: Tuple[str, ...] = ("Year", "Month", "DayOfWeek")
+
+# Aggregate levels computed together by cube_sales_grouping_sets, keyed by the
+# output each one is saved to
+SALES_CUBE_VIEWS: Dict[str, Tuple[str, ...]] = {
+    "cubed_sales_by_date": ("Year", "Month", "DayOfWeek"),
+    "cubed_sales_by_date_and_store": ("Year", "Month", "DayOfWeek", "StoreID"),
+}
+GROUPING_ID_COLUMN: str = "grouping_id"
+
+
+def grouping_columns(views: Mapping[str, Sequence[str]]) -> List[str]:
+    """Return every column grouped by any view, in order of first appearance."""
+    columns: List[str] = []
+    for view_columns in views.values():
+        columns.extend(column for column in view_columns if column not in columns)
+    return columns
+
+
+def grouping_id_for(view_columns: Sequence[str], columns: Sequence[str]) -> int:
+    """
+    Return the grouping_id() Spark assigns to rows of the grouping set view_columns.
+
+    Each of columns is one bit, the first being the most significant, and a bit
+    is set when that column is aggregated away (not part of the grouping set).
+    """
+    gid = 0
+    for column in columns:
+        gid = (gid << 1) | (column not in view_columns)
+    return gid
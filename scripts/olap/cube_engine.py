@@ -0,0 +1,214 @@
+"""
+OLAP Cube Engine
+File: scripts/olap/cube_engine.py
+
+Builds the CUBE lattice (every subset of the dimensions) once, in memory, from the
+finest cuboid, and answers roll-up, drill-down, slice and dice queries from it
+instead of re-summing a CSV with pandas for every question.
+
+- Dimension values are encoded once as integer codes; each cuboid stores one
+  code array per dimension and one array per measure.
+- Cuboids are computed from their smallest already-materialized parent (the
+  smallest-parent plan), so coarse cuboids never re-scan the base.
+- Queries use the cheapest materialized cuboid that contains every dimension
+  they group or filter on.
+
+Measures must be additive. The defaults are the sales_daily_summary measures
+(TotalSales, SalesCount, SumSquares), from which AvgSales and VarSales are derived.
+
+Example:
+    cube = OlapCube.from_warehouse(conn)
+    cube.rollup(["DayOfWeek"])
+    cube.slice("StoreID", 404, ["ProductID"])
+    cube.dice({"DayOfWeek": ["0", "6"], "ProductID": [101, 102]}, ["CustomerID"])
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.olap.queries import CUBE_BASE_QUERY
+
+# Constants
+CUBE_DIMENSIONS: Tuple[str, ...] = ("DayOfWeek", "ProductID", "CustomerID", "StoreID")
+SUM_MEASURE: str = "TotalSales"
+COUNT_MEASURE: str = "SalesCount"
+SQUARES_MEASURE: str = "SumSquares"
+DEFAULT_MEASURES: Tuple[str, ...] = (SUM_MEASURE, COUNT_MEASURE, SQUARES_MEASURE)
+MAX_LATTICE_DIMENSIONS: int = 8  # 2**8 cuboids
+
+
+@dataclass
+class Cuboid:
+    """One group-by of the cube: a code array per dimension and an array per measure."""
+
+    dimensions: Tuple[str, ...]
+    codes: Dict[str, np.ndarray]
+    measures: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.measures.values())))
+
+
+class OlapCube:
+    """In-memory CUBE over a finest-grain DataFrame with additive measures."""
+
+    def __init__(
+        self,
+        base: pd.DataFrame,
+        dimensions: Sequence[str] = CUBE_DIMENSIONS,
+        measures: Sequence[str] = DEFAULT_MEASURES,
+        materialize: Optional[Iterable[Sequence[str]]] = None,
+    ):
+        """Encode the base rows and materialize the lattice.
+
+        Args:
+            base (DataFrame): Rows with the dimension and measure columns; duplicate
+                dimension combinations are summed.
+            dimensions (Sequence[str]): Dimensions of the cube.
+            measures (Sequence[str]): Additive measure columns.
+            materialize (Iterable[Sequence[str]]): Cuboids to keep; every subset by default.
+                Others are computed on demand from their cheapest materialized ancestor.
+        """
+        if len(dimensions) > MAX_LATTICE_DIMENSIONS and materialize is None:
+            raise ValueError(f"A full lattice over more than {MAX_LATTICE_DIMENSIONS} dimensions is too large.")
+        missing = [column for column in (*dimensions, *measures) if column not in base.columns]
+        if missing:
+            raise KeyError(f"Columns not found in the cube base: {missing}")
+        self.dimensions: Tuple[str, ...] = tuple(dimensions)
+        self.measure_names: Tuple[str, ...] = tuple(measures)
+        self.levels: Dict[str, np.ndarray] = {}
+        codes = {}
+        for dimension in self.dimensions:
+            codes[dimension], levels = pd.factorize(base[dimension], sort=True)
+            self.levels[dimension] = np.asarray(levels)
+            if (codes[dimension] < 0).any():
+                raise ValueError(f"Dimension {dimension} has missing values.")
+        values = {measure: base[measure].to_numpy(dtype=np.float64) for measure in self.measure_names}
+        self.cuboids: Dict[FrozenSet[str], Cuboid] = {}
+        finest = self._aggregate(Cuboid(self.dimensions, codes, values), self.dimensions)
+        self.cuboids[frozenset(self.dimensions)] = finest
+        self._materialize(materialize)
+
+    @classmethod
+    def from_facts(cls, sales: pd.DataFrame, dimensions: Sequence[str] = CUBE_DIMENSIONS,
+                   amount_column: str = "SaleAmount", **kwargs: Any) -> "OlapCube":
+        """Build a cube from fact rows, deriving the measures from one amount column."""
+        amount = sales[amount_column].astype(np.float64)
+        base = sales[list(dimensions)].assign(
+            **{SUM_MEASURE: amount, COUNT_MEASURE: 1.0, SQUARES_MEASURE: amount * amount}
+        )
+        return cls(base, dimensions, DEFAULT_MEASURES, **kwargs)
+
+    @classmethod
+    def from_warehouse(cls, conn: sqlite3.Connection, **kwargs: Any) -> "OlapCube":
+        """Build the sales cube from the finest cuboid of sales_daily_summary."""
+        return cls(pd.read_sql_query(CUBE_BASE_QUERY, conn), CUBE_DIMENSIONS, DEFAULT_MEASURES, **kwargs)
+
+    def _materialize(self, materialize: Optional[Iterable[Sequence[str]]]) -> None:
+        """Compute the requested cuboids, largest first, each from its smallest parent."""
+        if materialize is None:
+            targets = [
+                frozenset(subset)
+                for size in range(len(self.dimensions) - 1, -1, -1)
+                for subset in combinations(self.dimensions, size)
+            ]
+        else:
+            targets = sorted({frozenset(self._check(subset)) for subset in materialize}, key=len, reverse=True)
+        for target in targets:
+            if target not in self.cuboids:
+                self.cuboids[target] = self._aggregate(self._cheapest_source(target), self._ordered(target))
+
+    def _check(self, dimensions: Iterable[str]) -> List[str]:
+        dimensions = list(dimensions)
+        unknown = [dimension for dimension in dimensions if dimension not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Unknown cube dimensions: {unknown}")
+        return dimensions
+
+    def _ordered(self, dimensions: Iterable[str]) -> Tuple[str, ...]:
+        wanted = set(dimensions)
+        return tuple(dimension for dimension in self.dimensions if dimension in wanted)
+
+    def _cheapest_source(self, dimensions: Iterable[str]) -> Cuboid:
+        """Return the smallest materialized cuboid that contains all the dimensions."""
+        needed = frozenset(dimensions)
+        candidates = [cuboid for key, cuboid in self.cuboids.items() if needed <= key]
+        return min(candidates, key=len)
+
+    def _aggregate(self, source: Cuboid, dimensions: Sequence[str], mask: Optional[np.ndarray] = None) -> Cuboid:
+        """Group a cuboid's rows by a subset of its dimensions, summing the measures."""
+        codes = {dimension: source.codes[dimension] for dimension in dimensions}
+        measures = source.measures
+        if mask is not None:
+            codes = {dimension: values[mask] for dimension, values in codes.items()}
+            measures = {name: values[mask] for name, values in measures.items()}
+        n_rows = len(next(iter(measures.values())))
+        if not dimensions:
+            return Cuboid((), {}, {name: np.array([values.sum()]) for name, values in measures.items()})
+        radices = [len(self.levels[dimension]) for dimension in dimensions]
+        if np.prod(radices, dtype=np.float64) < 2 ** 62:
+            # Mixed-radix key over the dimension codes; the level counts bound every code
+            key = np.zeros(n_rows, dtype=np.int64)
+            for dimension, radix in zip(dimensions, radices):
+                key = key * radix + codes[dimension]
+            unique_keys, inverse = np.unique(key, return_inverse=True)
+            grouped_codes = {}
+            remaining = unique_keys
+            for dimension, radix in zip(reversed(dimensions), reversed(radices)):
+                remaining, grouped_codes[dimension] = np.divmod(remaining, radix)
+        else:
+            stacked = np.column_stack([codes[dimension] for dimension in dimensions])
+            unique_rows, inverse = np.unique(stacked, axis=0, return_inverse=True)
+            grouped_codes = {dimension: unique_rows[:, i] for i, dimension in enumerate(dimensions)}
+        inverse = inverse.ravel()
+        n_groups = len(next(iter(grouped_codes.values())))
+        grouped = {name: np.bincount(inverse, weights=values, minlength=n_groups) for name, values in measures.items()}
+        return Cuboid(tuple(dimensions), {d: grouped_codes[d] for d in dimensions}, grouped)
+
+    def _to_frame(self, cuboid: Cuboid) -> pd.DataFrame:
+        """Decode a cuboid into a DataFrame with dimension values, measures and derived stats."""
+        frame = pd.DataFrame({
+            **{dimension: self.levels[dimension][cuboid.codes[dimension]] for dimension in cuboid.dimensions},
+            **cuboid.measures,
+        })
+        if COUNT_MEASURE in frame.columns:
+            count = frame[COUNT_MEASURE]
+            frame[COUNT_MEASURE] = count.round().astype(np.int64)
+            if SUM_MEASURE in frame.columns:
+                frame["AvgSales"] = frame[SUM_MEASURE] / count
+                if SQUARES_MEASURE in frame.columns:
+                    squares = frame[SQUARES_MEASURE] - frame[SUM_MEASURE] ** 2 / count
+                    frame["VarSales"] = (squares / (count - 1)).where(count > 1)
+        return frame
+
+    def rollup(self, dimensions: Sequence[str] = ()) -> pd.DataFrame:
+        """Aggregate the cube to the given dimensions (an empty list gives the grand total)."""
+        dimensions = self._ordered(self._check(dimensions))
+        cuboid = self.cuboids.get(frozenset(dimensions))
+        if cuboid is None:
+            cuboid = self._aggregate(self._cheapest_source(dimensions), dimensions)
+        return self._to_frame(cuboid)
+
+    def drill_down(self, dimensions: Sequence[str], dimension: str) -> pd.DataFrame:
+        """Add one dimension to a roll-up."""
+        return self.rollup([*dimensions, dimension])
+
+    def dice(self, filters: Dict[str, Sequence[Any]], dimensions: Sequence[str] = ()) -> pd.DataFrame:
+        """Aggregate to the given dimensions over the rows whose values are in the filters."""
+        self._check(filters)
+        dimensions = self._ordered(self._check(dimensions))
+        source = self._cheapest_source([*dimensions, *filters])
+        mask = np.ones(len(source), dtype=bool)
+        for dimension, values in filters.items():
+            wanted = np.flatnonzero(np.isin(self.levels[dimension], list(values)))
+            mask &= np.isin(source.codes[dimension], wanted)
+        return self._to_frame(self._aggregate(source, dimensions, mask))
+
+    def slice(self, dimension: str, value: Any, dimensions: Sequence[str] = ()) -> pd.DataFrame:
+        """Aggregate to the given dimensions over the rows where one dimension equals a value."""
+        return self.dice({dimension: [value]}, dimensions)
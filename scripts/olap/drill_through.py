@@ -0,0 +1,150 @@
+"""
+Drill-through Index for the OLAP Cube
+File: scripts/olap/drill_through.py
+
+Maps each cube cell (DayOfWeek, ProductID, CustomerID) to the TransactionIDs behind
+it, replacing the GROUP_CONCAT(TransactionID) column that made the cube CSV about
+as large as the fact table. IDs are stored per cell as sorted, delta-encoded
+integer arrays in a compressed .npz file beside the cube:
+
+    cell_keys  sorted mixed-radix key of each cell's dimension codes
+    offsets    start of each cell's IDs in deltas (one extra entry at the end)
+    firsts     first (smallest) ID of each cell
+    deltas     gaps between consecutive IDs, in the smallest unsigned type that fits
+
+Looking up a cell is a binary search plus a cumulative sum over that cell's gaps.
+DayOfWeek is the weekday name ("Sunday" ... "Saturday"), as in olap_cube.csv, so
+any cube row can be looked up as written.
+"""
+
+import pathlib
+import sqlite3
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts.olap.queries import DAY_NAMES, DRILL_THROUGH_QUERY
+
+# Constants
+DRILL_THROUGH_DIMENSIONS: Tuple[str, ...] = ("DayOfWeek", "ProductID", "CustomerID")
+ID_COLUMN: str = "TransactionID"
+UNSIGNED_TYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+class DrillThroughIndex:
+    """Compressed per-cell ID sets for looking up the facts behind a cube cell."""
+
+    def __init__(self, dimensions: Sequence[str], levels: Dict[str, np.ndarray], cell_keys: np.ndarray,
+                 offsets: np.ndarray, firsts: np.ndarray, deltas: np.ndarray):
+        self.dimensions = tuple(dimensions)
+        self.levels = levels
+        self.cell_keys = cell_keys
+        self.offsets = offsets
+        self.firsts = firsts
+        self.deltas = deltas
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dimensions: Sequence[str] = DRILL_THROUGH_DIMENSIONS,
+                   id_column: str = ID_COLUMN) -> "DrillThroughIndex":
+        """Build the index from rows with the dimension columns and an integer ID column."""
+        levels, key = {}, np.zeros(len(df), dtype=np.int64)
+        for dimension in dimensions:
+            codes, uniques = pd.factorize(df[dimension], sort=True)
+            levels[dimension] = np.asarray(uniques)
+            if levels[dimension].dtype == object:
+                levels[dimension] = levels[dimension].astype(str)  # .npz files cannot hold objects
+            key = key * len(uniques) + codes
+        ids = df[id_column].to_numpy(dtype=np.int64)
+        order = np.lexsort((ids, key))
+        key, ids = key[order], ids[order]
+
+        cell_keys, starts = np.unique(key, return_index=True)
+        firsts = ids[starts]
+        gaps = np.diff(ids)
+        # Drop the gap that crosses from one cell into the next; each cell keeps its own first ID
+        boundaries = starts[1:] - 1
+        keep = np.ones(len(gaps), dtype=bool)
+        keep[boundaries] = False
+        gaps = gaps[keep]
+        counts = np.diff(np.append(starts, len(ids))) - 1
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        gap_type = next(t for t in UNSIGNED_TYPES if gaps.size == 0 or gaps.max() <= np.iinfo(t).max)
+        return cls(dimensions, levels, cell_keys, offsets, firsts, gaps.astype(gap_type))
+
+    @classmethod
+    def from_warehouse(cls, conn: sqlite3.Connection) -> "DrillThroughIndex":
+        """Build the index for the OLAP cube cells from the sales table, with weekday names as in the cube."""
+        df = pd.read_sql_query(DRILL_THROUGH_QUERY, conn)
+        df["DayOfWeek"] = df["DayOfWeek"].map({int(number): name for number, name in DAY_NAMES.items()})
+        return cls.from_frame(df)
+
+    def __len__(self) -> int:
+        return len(self.cell_keys)
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory size of the index arrays."""
+        arrays = (self.cell_keys, self.offsets, self.firsts, self.deltas, *self.levels.values())
+        return sum(array.nbytes for array in arrays)
+
+    def _level_code(self, dimension: str, value: Any) -> int:
+        """Return the position of value among a dimension's levels, converting it to their type first.
+
+        Raises KeyError if the dimension has no such value.
+        """
+        levels = self.levels[dimension]
+        try:
+            if levels.dtype.kind in "iu":
+                if isinstance(value, (float, np.floating)) and not float(value).is_integer():
+                    raise ValueError(value)
+                value = int(value)
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            raise KeyError(f"{dimension} has no value {value!r}") from None
+        code = int(np.searchsorted(levels, value))
+        if code == len(levels) or levels[code] != value:
+            raise KeyError(f"{dimension} has no value {value!r}")
+        return code
+
+    def lookup(self, **cell: Any) -> np.ndarray:
+        """Return the sorted IDs of one cell, e.g. lookup(DayOfWeek="Saturday", ProductID=101, CustomerID=1004).
+
+        Values are converted to the type of each dimension, so a cube row read back
+        as text ("101") finds the same cell as 101. Raises KeyError for a value
+        that does not occur in the data; a cell whose values all occur but never
+        together has no rows and returns an empty array.
+        """
+        if set(cell) != set(self.dimensions):
+            raise KeyError(f"A cell needs exactly these dimensions: {list(self.dimensions)}")
+        key = 0
+        for dimension in self.dimensions:
+            key = key * len(self.levels[dimension]) + self._level_code(dimension, cell[dimension])
+        position = int(np.searchsorted(self.cell_keys, key))
+        if position == len(self.cell_keys) or self.cell_keys[position] != key:
+            return np.empty(0, dtype=np.int64)
+        gaps = self.deltas[self.offsets[position]:self.offsets[position + 1]].astype(np.int64)
+        return np.concatenate([[self.firsts[position]], self.firsts[position] + np.cumsum(gaps)])
+
+    def save(self, path: pathlib.Path) -> pathlib.Path:
+        """Write the index to a compressed .npz file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            dimensions=np.array(self.dimensions),
+            cell_keys=self.cell_keys,
+            offsets=self.offsets,
+            firsts=self.firsts,
+            deltas=self.deltas,
+            **{f"levels_{dimension}": values for dimension, values in self.levels.items()},
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "DrillThroughIndex":
+        """Read an index written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            dimensions = [str(dimension) for dimension in data["dimensions"]]
+            levels = {dimension: data[f"levels_{dimension}"] for dimension in dimensions}
+            return cls(dimensions, levels, data["cell_keys"], data["offsets"], data["firsts"], data["deltas"])
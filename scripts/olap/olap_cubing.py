@@ -1,71 +1,88 @@
+import argparse
 import sqlite3
-import pandas as pd
 import pathlib
 import sys
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.dw_access import read_connection  # noqa: E402
+from scripts.olap.drill_through import DrillThroughIndex  # noqa: E402
+from scripts.olap.queries import DAY_NAMES, OLAP_CUBE_QUERY  # noqa: E402
+from scripts.query_cache import cached_read_sql  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
+
 # Constants
 DW_DIR = pathlib.Path("data").joinpath("dw")
 DB_PATH = DW_DIR.joinpath("smart_sales.db")
 OUTPUT_DIR = pathlib.Path("data").joinpath("olap_cubing_outputs")
 OUTPUT_FILE = OUTPUT_DIR.joinpath("olap_cube.csv")
+DRILL_THROUGH_FILE = OUTPUT_DIR.joinpath("olap_cube_transactions.npz")
 
 
-def create_olap_cube() -> None:
-    """Generate an OLAP cube and save it as a CSV file."""
-    conn = None
+@cached_stage(
+    inputs=[DB_PATH],
+    outputs=lambda drill_through: [OUTPUT_FILE] + ([DRILL_THROUGH_FILE] if drill_through else []),
+    code=("scripts.olap.queries", "scripts.olap.drill_through"),
+)
+def create_olap_cube(drill_through: bool = False) -> None:
+    """Generate an OLAP cube and save it as a CSV file.
+
+    With drill_through, also save the TransactionIDs of each cell as a compressed
+    index beside the cube (see drill_through.DrillThroughIndex). Skipped when the
+    warehouse file is unchanged since the cube was last built.
+    """
     try:
         # Ensure output directory exists
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         print("Output directory ensured.")
 
-        # Connect to the SQLite database
-        conn = sqlite3.connect(DB_PATH)
-        print("Connected to SQLite database.")
-
-        # SQL query to generate the OLAP cube with day names
-        query = """
-        SELECT 
-            strftime('%w', SaleDate) AS DayOfWeek, -- Day of the week (0=Sunday, 1=Monday, ..., 6=Saturday)
-            ProductID,
-            CustomerID,
-            SUM(SaleAmount) AS TotalSales,
-            AVG(SaleAmount) AS AvgSales,
-            COUNT(TransactionID) AS SalesCount,
-            GROUP_CONCAT(TransactionID) AS TransactionIDs
-        FROM sales
-        GROUP BY DayOfWeek, ProductID, CustomerID
-        ORDER BY DayOfWeek, ProductID, CustomerID;
-        """
-
-        # Execute the query and save the results to a DataFrame
-        cube_df = pd.read_sql_query(query, conn)
-        print("OLAP cube query executed successfully.")
-
-        # Map day_of_week numbers to weekday names
-        day_map = {
-            "0": "Sunday", "1": "Monday", "2": "Tuesday",
-            "3": "Wednesday", "4": "Thursday", "5": "Friday", "6": "Saturday"
-        }
-        cube_df["DayOfWeek"] = cube_df["DayOfWeek"].map(day_map)
-
-        # Save the cube to a CSV file
-        cube_df.to_csv(OUTPUT_FILE, index=False)
-        print(f"OLAP cube saved to {OUTPUT_FILE}.")
+        # Borrow a read-only connection from the shared pool
+        with read_connection(DB_PATH) as conn:
+            print("Connected to SQLite database.")
+
+            # Execute the query (or reuse its result if no data was loaded since) and save the results to a DataFrame
+            cube_df = cached_read_sql(OLAP_CUBE_QUERY, conn)
+            print("OLAP cube query executed successfully.")
+
+            # Map day_of_week numbers to weekday names
+            cube_df["DayOfWeek"] = cube_df["DayOfWeek"].map(DAY_NAMES)
+
+            # Save the cube to a CSV file
+            cube_df.to_csv(OUTPUT_FILE, index=False)
+            print(f"OLAP cube saved to {OUTPUT_FILE}.")
+
+            if drill_through:
+                index = DrillThroughIndex.from_warehouse(conn)
+                index.save(DRILL_THROUGH_FILE)
+                print(f"Drill-through index for {len(index)} cells saved to {DRILL_THROUGH_FILE}.")
+        print("SQLite connection returned to the pool.")
 
     except sqlite3.Error as e:
         print(f"SQLite error: {e}")
+        raise
     except Exception as e:
         print(f"Unexpected error: {e}")
-    finally:
-        if conn:
-            conn.close()
-            print("SQLite connection closed.")
+        raise
 
 
 def main() -> None:
     """Main function to create the OLAP cube."""
+    parser = argparse.ArgumentParser(description="Create the OLAP cube from the data warehouse.")
+    parser.add_argument(
+        "--drill-through",
+        action="store_true",
+        help="Also save the TransactionIDs behind each cube cell as a compressed index.",
+    )
+    args = parser.parse_args()
     print("Starting OLAP cubing process...")
-    create_olap_cube()
+    try:
+        create_olap_cube(drill_through=args.drill_through)
+    except Exception:
+        print("OLAP cubing process failed.")
+        sys.exit(1)
     print("OLAP cubing process completed.")
 
 
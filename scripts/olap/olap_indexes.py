@@ -0,0 +1,111 @@
+"""
+OLAP Indexes and Query Plan Check
+File: scripts/olap/olap_indexes.py
+
+Creates the indexes the OLAP queries in queries.py rely on, and checks with
+EXPLAIN QUERY PLAN that none of them falls back to a full table scan or a temp
+B-tree for GROUP BY / ORDER BY.
+
+The main index is a covering expression index led by strftime('%w', SaleDate), so
+the weekday cubes are read in group order straight from the index. SaleDate is
+included at the end because SQLite only covers the query when the column behind
+the expression is in the index too. TransactionID is included as well: it is the
+rowid of the sales table created by create_dw.py, but not of a sales table left
+by an older load, where the drill-through query would otherwise scan the table.
+
+Usage:
+    python3 scripts/olap/olap_indexes.py
+
+Exits with status 1 if any query plan has a problem.
+"""
+
+import pathlib
+import sqlite3
+import sys
+from typing import Dict, List, Optional
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.dw_access import write_connection  # noqa: E402
+from scripts.olap.queries import OLAP_QUERIES  # noqa: E402
+
+# Constants
+DB_PATH: pathlib.Path = pathlib.Path("data").joinpath("dw", "smart_sales.db")
+OLAP_INDEX_DEFINITIONS: Dict[str, str] = {
+    "idx_sales_weekday_product_customer": (
+        "CREATE INDEX IF NOT EXISTS idx_sales_weekday_product_customer "
+        "ON sales (strftime('%w', SaleDate), ProductID, CustomerID, SaleAmount, SaleDate, TransactionID);"
+    ),
+}
+
+
+def _stored_sql(ddl: str) -> str:
+    """Return ddl as SQLite stores it in sqlite_master."""
+    return ddl.replace(" IF NOT EXISTS", "").rstrip(";")
+
+
+def ensure_olap_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Create any missing or outdated OLAP indexes and return the names of those created.
+
+    Bulk loads drop and rebuild every index on the sales table, and upserts keep
+    them current, so the indexes only need creating once, or again when their
+    definition changes.
+    """
+    existing = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index';"))
+    created = []
+    for name, ddl in OLAP_INDEX_DEFINITIONS.items():
+        if existing.get(name) != _stored_sql(ddl):
+            if name in existing:
+                conn.execute(f"DROP INDEX {name};")
+            conn.execute(ddl)
+            created.append(name)
+            logger.info(f"Created OLAP index {name}.")
+    conn.commit()
+    return created
+
+
+def explain_query_plan(conn: sqlite3.Connection, query: str) -> List[str]:
+    """Return the detail lines of EXPLAIN QUERY PLAN for a query."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+def plan_problems(plan: List[str]) -> List[str]:
+    """Return the plan lines that show a full scan or a temp B-tree.
+
+    Scanning a non-covering index is still a full scan, with a table lookup per
+    row on top, so only `SCAN ... USING COVERING INDEX` is accepted.
+    """
+    return [
+        line for line in plan
+        if (line.startswith("SCAN") and " USING COVERING INDEX " not in line) or "USE TEMP B-TREE" in line
+    ]
+
+
+def check_query_plans(conn: sqlite3.Connection, queries: Optional[Dict[str, str]] = None) -> Dict[str, List[str]]:
+    """Return {query name: problem plan lines} for every query with a problem."""
+    problems = {}
+    for name, query in (queries or OLAP_QUERIES).items():
+        found = plan_problems(explain_query_plan(conn, query))
+        if found:
+            problems[name] = found
+    return problems
+
+
+def main() -> None:
+    """Create the OLAP indexes and check the plans of the shipped OLAP queries."""
+    with write_connection(DB_PATH) as conn:
+        ensure_olap_indexes(conn)
+        problems = check_query_plans(conn)
+    for name, lines in problems.items():
+        logger.error(f"Query {name} has a slow plan: {lines}")
+    if problems:
+        sys.exit(1)
+    logger.info("All OLAP query plans use indexes without temp B-trees.")
+
+
+if __name__ == "__main__":
+    main()
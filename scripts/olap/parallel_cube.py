@@ -0,0 +1,220 @@
+"""
+Parallel OLAP Cube Build
+File: scripts/olap/parallel_cube.py
+
+Builds the finest cuboid of the sales cube on several processes. The sales fact
+table is split into partitions, either by SaleDate range or by ProductID range. Each
+worker opens its own read-only SQLite connection and aggregates one partition.
+The partial aggregates are merged with associative combine steps:
+
+    TotalSales, SalesCount, SumSquares   summed
+    MinSale                              minimum
+    MaxSale                              maximum
+
+so the result does not depend on how the rows were partitioned. Ranges are cut
+at quantiles of the SaleDate or ProductID index, so every partition holds about
+the same number of rows and each worker reads only its own range of the index.
+
+Example:
+    base = build_cube_parallel(DB_PATH, workers=8)
+    cube = OlapCube(base)  # roll-ups of the additive measures
+
+    python3 scripts/olap/parallel_cube.py --workers 8 --partition-by product
+"""
+
+import argparse
+import os
+import pathlib
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.dw_access import connect  # noqa: E402
+from scripts.olap.cube_engine import CUBE_DIMENSIONS  # noqa: E402
+
+# Constants
+DB_PATH: pathlib.Path = pathlib.Path("data").joinpath("dw", "smart_sales.db")
+OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
+OUTPUT_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("parallel_olap_cube.csv")
+PARTITIONS_PER_WORKER: int = 4  # more partitions than workers evens out uneven partitions
+
+# SQL expression for each dimension the parallel build can group by
+DIMENSION_EXPRESSIONS = {
+    "DayOfWeek": "strftime('%w', SaleDate)",
+    "ProductID": "ProductID",
+    "CustomerID": "CustomerID",
+    "StoreID": "StoreID",
+    "SaleDate": "SaleDate",
+}
+
+# Partial aggregate of each measure, and the step that combines partials
+MEASURE_EXPRESSIONS = {
+    "TotalSales": "SUM(SaleAmount)",
+    "SalesCount": "COUNT(*)",
+    "SumSquares": "SUM(SaleAmount * SaleAmount)",
+    "MinSale": "MIN(SaleAmount)",
+    "MaxSale": "MAX(SaleAmount)",
+}
+COMBINE_STEPS = {
+    "TotalSales": "sum",
+    "SalesCount": "sum",
+    "SumSquares": "sum",
+    "MinSale": "min",
+    "MaxSale": "max",
+}
+
+# A partition is a WHERE clause with its parameters
+Partition = Tuple[str, Tuple]
+
+
+def range_partitions(conn: sqlite3.Connection, column: str, n_partitions: int) -> List[Partition]:
+    """Split sales into contiguous ranges of column holding about the same number of rows.
+
+    The boundaries come from one ordered pass over the column's index (a GROUP BY
+    that returns each distinct value with its row count), and each range is a
+    `column >= ? AND column < ?` search on that index. Rows with a null key get a
+    partition of their own.
+    """
+    counts = conn.execute(f"SELECT {column}, COUNT(*) FROM sales GROUP BY {column} ORDER BY {column};").fetchall()
+    null_rows = sum(count for value, count in counts if value is None)
+    counts = [(value, count) for value, count in counts if value is not None]
+    row_count = sum(count for _, count in counts)
+    bounds = []
+    seen = 0
+    for value, count in counts:
+        # A value starts a new range once the rows before it reach the next quantile
+        if seen and seen >= row_count * (len(bounds) + 1) // n_partitions and len(bounds) < n_partitions - 1:
+            bounds.append(value)
+        seen += count
+    if not bounds:
+        partitions = [(f"{column} IS NOT NULL", ())]
+    else:
+        partitions = [(f"{column} < ?", (bounds[0],))]
+        partitions += [
+            (f"{column} >= ? AND {column} < ?", (low, high)) for low, high in zip(bounds, bounds[1:])
+        ]
+        partitions.append((f"{column} >= ?", (bounds[-1],)))
+    if null_rows:
+        partitions.append((f"{column} IS NULL", ()))
+    return partitions
+
+
+def date_partitions(conn: sqlite3.Connection, n_partitions: int) -> List[Partition]:
+    """Split sales into SaleDate ranges holding about the same number of rows."""
+    return range_partitions(conn, "SaleDate", n_partitions)
+
+
+def product_partitions(conn: sqlite3.Connection, n_partitions: int) -> List[Partition]:
+    """Split sales into ProductID ranges holding about the same number of rows."""
+    return range_partitions(conn, "ProductID", n_partitions)
+
+
+def partial_query(dimensions: Sequence[str], where: str) -> str:
+    """Return the GROUP BY query that aggregates one partition."""
+    unknown = [dimension for dimension in dimensions if dimension not in DIMENSION_EXPRESSIONS]
+    if unknown:
+        raise KeyError(f"No SQL expression for dimensions: {unknown}")
+    columns = [f"{DIMENSION_EXPRESSIONS[dimension]} AS {dimension}" for dimension in dimensions]
+    columns += [f"{expression} AS {measure}" for measure, expression in MEASURE_EXPRESSIONS.items()]
+    query = f"SELECT {', '.join(columns)} FROM sales WHERE {where}"
+    if dimensions:
+        query += f" GROUP BY {', '.join(dimensions)}"
+    return query + ";"
+
+
+def compute_partial(db_path: str, dimensions: Sequence[str], partition: Partition) -> pd.DataFrame:
+    """Aggregate one partition on a read-only connection (runs in a worker process)."""
+    where, params = partition
+    conn = connect(db_path, read_only=True)  # not pooled: connections must not cross a fork
+    try:
+        partial = pd.read_sql_query(partial_query(dimensions, where), conn, params=params)
+    finally:
+        conn.close()
+    return partial[partial["SalesCount"] > 0]
+
+
+def merge_partials(partials: Sequence[pd.DataFrame], dimensions: Sequence[str]) -> pd.DataFrame:
+    """Combine partial aggregates into one row per dimension combination."""
+    combined = pd.concat(partials, ignore_index=True)
+    if not dimensions:
+        return combined.agg(COMBINE_STEPS).to_frame().T
+    merged = combined.groupby(list(dimensions), sort=True).agg(COMBINE_STEPS).reset_index()
+    merged["SalesCount"] = merged["SalesCount"].astype("int64")
+    return merged
+
+
+def build_cube_parallel(
+    db_path: pathlib.Path = DB_PATH,
+    dimensions: Sequence[str] = CUBE_DIMENSIONS,
+    workers: Optional[int] = None,
+    partition_by: str = "date",
+    n_partitions: Optional[int] = None,
+) -> pd.DataFrame:
+    """Aggregate the sales facts by the dimensions on a pool of worker processes.
+
+    Args:
+        db_path (Path): SQLite warehouse; workers open it read-only.
+        dimensions (Sequence[str]): Keys of DIMENSION_EXPRESSIONS to group by.
+        workers (int): Worker processes; defaults to the CPU count. 1 runs in-process.
+        partition_by (str): "date" for SaleDate ranges or "product" for ProductID ranges.
+        n_partitions (int): Number of partitions; defaults to PARTITIONS_PER_WORKER per worker.
+
+    Returns:
+        DataFrame: One row per dimension combination with the merged measures.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_partitions = n_partitions or workers * PARTITIONS_PER_WORKER
+    try:
+        splitters = {"date": date_partitions, "product": product_partitions}
+        if partition_by not in splitters:
+            raise ValueError(f"Unknown partitioning: {partition_by}")
+        conn = connect(db_path, read_only=True)
+        try:
+            partitions = splitters[partition_by](conn, n_partitions)
+        finally:
+            conn.close()
+
+        logger.info(f"Building cube over {len(partitions)} {partition_by} partitions on {workers} workers...")
+        tasks = [(str(db_path), tuple(dimensions), partition) for partition in partitions]
+        if workers == 1:
+            partials = [compute_partial(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(compute_partial, *zip(*tasks)))
+        cube = merge_partials(partials, dimensions)
+        logger.info(f"Parallel cube built with {len(cube)} rows.")
+        return cube
+    except Exception as e:
+        logger.error(f"Error building cube in parallel: {e}")
+        raise
+
+
+def main() -> None:
+    """Build the sales cube in parallel and save it as a CSV file."""
+    parser = argparse.ArgumentParser(description="Build the sales cube on several processes.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument(
+        "--partition-by",
+        choices=("date", "product"),
+        default="date",
+        help="Split sales by SaleDate range or by ProductID range.",
+    )
+    args = parser.parse_args()
+
+    cube = build_cube_parallel(DB_PATH, workers=args.workers, partition_by=args.partition_by)
+    OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    cube.to_csv(OUTPUT_FILE, index=False)
+    logger.info(f"Parallel OLAP cube saved to {OUTPUT_FILE}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,21 @@ Purpose: Analyze product performance by day of the week.
 
 This script performs OLAP-style analysis to aggregate product sales data
 from a data warehouse, grouping by day of the week and product. 
-The results are saved to a CSV file.
+The aggregation runs in SQLite over the pre-aggregated sales_daily_summary
+table, so only the grouped rows leave the database. The results are saved to a CSV file.
+
+Sales rows already in a DataFrame are aggregated with the shared definition in
+scripts/backends.py, on the backend choose_backend picks for their size. Rows
+streamed in chunks, or memory-mapped from the columnar snapshot in
+fact_snapshot.py, are never all in memory at once; ProductDayAccumulator adds
+them chunk by chunk into a dense 7 x n_products array instead.
 """
 
+import numpy as np
 import pandas as pd
-import sqlite3
 import pathlib
 import sys
+from typing import Any, Iterable, Iterator, Optional
 
 # Adjust the import path so it correctly finds the logger in the utils folder
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent  # Going up three levels to the root
@@ -20,11 +28,19 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # Now the logger can be imported
+from scripts import backends  # noqa: E402
+from scripts.dw_access import read_connection  # noqa: E402
+from scripts.fact_snapshot import FactTableReader  # noqa: E402
+from scripts.olap.queries import DAY_NAMES, PRODUCT_PERFORMANCE_QUERY  # noqa: E402
+from scripts.query_cache import cached_read_sql  # noqa: E402
 
 # Constants
 DW_DIR = pathlib.Path("data").joinpath("dw")
 DB_PATH = DW_DIR.joinpath("smart_sales.db")
 OLAP_OUTPUT_DIR = pathlib.Path("data").joinpath("olap_cubing_outputs")
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+DEFAULT_CHUNK_SIZE = 100_000
 
 # Ensure the output directory exists
 OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -32,37 +48,168 @@ OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 def ingest_sales_data_from_dw() -> pd.DataFrame:
     """Ingest sales data from SQLite data warehouse."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        sales_df = pd.read_sql_query("SELECT * FROM sales", conn)
-        conn.close()
+        with read_connection(DB_PATH) as conn:
+            sales_df = cached_read_sql("SELECT * FROM sales", conn)
         logger.info("Sales data successfully loaded from SQLite data warehouse.")
         return sales_df
     except Exception as e:
         logger.error(f"Error loading sales table data from data warehouse: {e}")
         raise
 
-def create_product_performance_cube(sales_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate sales data by product and day of the week."""
+def ingest_sales_chunks_from_dw(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream the columns needed for the product performance cube from the sales table."""
     try:
-        # Ensure SaleDate is in correct format
-        sales_df["SaleDate"] = pd.to_datetime(sales_df["SaleDate"], errors='coerce')
+        with read_connection(DB_PATH) as conn:
+            query = "SELECT SaleDate, ProductID, SaleAmount FROM sales"
+            yield from pd.read_sql_query(query, conn, chunksize=chunk_size)
+    except Exception as e:
+        logger.error(f"Error streaming sales data from data warehouse: {e}")
+        raise
+
+def query_product_performance_from_dw() -> pd.DataFrame:
+    """Aggregate sales by day of the week and product inside the data warehouse."""
+    try:
+        with read_connection(DB_PATH) as conn:
+            cube = cached_read_sql(PRODUCT_PERFORMANCE_QUERY, conn)
+        cube["DayOfWeek"] = cube["DayOfWeek"].map(DAY_NAMES)
+        cube = cube.sort_values(["DayOfWeek", "ProductID"], ignore_index=True)
+        logger.info("Product performance cube queried from SQLite data warehouse.")
+        return cube
+    except Exception as e:
+        logger.error(f"Error querying product performance from data warehouse: {e}")
+        raise
+
+class ProductDayAccumulator:
+    """Running sums and counts of SaleAmount per (weekday, product).
+
+    Weekdays come from the datetime64 day ordinal and products are coded by
+    their position in a sorted array of known ProductIDs, so each chunk is
+    added with one np.bincount over a dense (7 x n_products) array. The array
+    grows when a chunk brings new products. Rows without a valid SaleDate or
+    ProductID are skipped, as the groupby they replace skipped them. A row with
+    a missing SaleAmount still counts as a sale (SalesCount counted
+    TransactionIDs) but adds nothing to TotalSales or AvgSales.
+    """
+
+    def __init__(self):
+        self.products = np.empty(0, dtype=np.int64)
+        self.totals = np.zeros((7, 0), dtype=np.float64)
+        self.counts = np.zeros((7, 0), dtype=np.int64)
+        self.amount_counts = np.zeros((7, 0), dtype=np.int64)
+
+    def _add_products(self, product_ids: np.ndarray) -> None:
+        """Extend the product axis with any IDs not seen before, keeping it sorted."""
+        new = np.setdiff1d(product_ids, self.products)
+        if new.size == 0:
+            return
+        products = np.union1d(self.products, new)
+        old_columns = np.searchsorted(products, self.products)
+        totals = np.zeros((7, len(products)), dtype=np.float64)
+        counts = np.zeros((7, len(products)), dtype=np.int64)
+        amount_counts = np.zeros((7, len(products)), dtype=np.int64)
+        totals[:, old_columns] = self.totals
+        counts[:, old_columns] = self.counts
+        amount_counts[:, old_columns] = self.amount_counts
+        self.products, self.totals, self.counts, self.amount_counts = products, totals, counts, amount_counts
+
+    def update(self, sales_df: pd.DataFrame) -> "ProductDayAccumulator":
+        """Add one chunk of sales rows with SaleDate, ProductID and SaleAmount columns."""
+        sale_dates = sales_df["SaleDate"]
+        if not pd.api.types.is_datetime64_any_dtype(sale_dates):
+            sale_dates = pd.to_datetime(sale_dates, errors="coerce")
+        days = sale_dates.to_numpy(dtype="datetime64[D]")
+        amounts = sales_df["SaleAmount"].to_numpy(dtype=np.float64)
+        product_ids = pd.to_numeric(sales_df["ProductID"], errors="coerce").to_numpy(dtype=np.float64)
+        return self.update_arrays(days, product_ids, amounts)
+
+    def update_arrays(self, days: np.ndarray, product_ids: np.ndarray, amounts: np.ndarray) -> "ProductDayAccumulator":
+        """Add one chunk given as arrays: datetime64[D] days, ProductIDs and SaleAmounts.
 
-        # Add DayOfWeek
-        sales_df["DayOfWeek"] = sales_df["SaleDate"].dt.day_name()
+        The arrays are only read, so memory-mapped snapshot columns can be passed as they are.
+        """
+        valid = ~np.isnat(days)
+        if np.issubdtype(product_ids.dtype, np.floating):
+            valid &= ~np.isnan(product_ids)
+        if not valid.all():
+            days, amounts, product_ids = days[valid], amounts[valid], product_ids[valid]
+        product_ids = product_ids.astype(np.int64, copy=False)
 
-        # Aggregate the sales data
-        grouped = sales_df.groupby(["DayOfWeek", "ProductID"]).agg(
-            TotalSales=("SaleAmount", "sum"),
-            AvgSales=("SaleAmount", "mean"),
-            SalesCount=("TransactionID", "count")
-        ).reset_index()
+        weekdays = (days.view(np.int64) + EPOCH_WEEKDAY) % 7
+        unique_ids, codes = np.unique(product_ids, return_inverse=True)
+        self._add_products(unique_ids)
+        n_products = len(self.products)
+        cells = weekdays * n_products + np.searchsorted(self.products, unique_ids)[codes.ravel()]
+        has_amount = ~np.isnan(amounts)
+        self.totals += np.bincount(
+            cells, weights=np.where(has_amount, amounts, 0.0), minlength=7 * n_products
+        ).reshape(7, n_products)
+        self.counts += np.bincount(cells, minlength=7 * n_products).reshape(7, n_products)
+        self.amount_counts += np.bincount(cells, weights=has_amount, minlength=7 * n_products).reshape(
+            7, n_products
+        ).astype(np.int64)
+        return self
 
+    def to_frame(self) -> pd.DataFrame:
+        """Return the non-empty cells, ordered like a groupby over (DayOfWeek, ProductID)."""
+        weekdays, columns = np.nonzero(self.counts)
+        counts = self.counts[weekdays, columns]
+        totals = self.totals[weekdays, columns]
+        amount_counts = self.amount_counts[weekdays, columns]
+        cube = pd.DataFrame({
+            "DayOfWeek": np.asarray(WEEKDAY_NAMES)[weekdays],
+            "ProductID": self.products[columns],
+            "TotalSales": totals,
+            "AvgSales": np.divide(totals, amount_counts, out=np.full(len(totals), np.nan), where=amount_counts > 0),
+            "SalesCount": counts,
+        })
+        return cube.sort_values(["DayOfWeek", "ProductID"], ignore_index=True)
+
+def create_product_performance_cube(sales_df: Any, backend: Optional[str] = None) -> Any:
+    """Aggregate sales data by product and day of the week.
+
+    Polars or Spark frames are aggregated by their own engine, and the result
+    comes back as that engine's frame. A pandas frame is aggregated on backend,
+    by default the one choose_backend picks for its size, and the result comes
+    back as a pandas frame.
+    """
+    if not isinstance(sales_df, pd.DataFrame):
+        return backends.create_product_performance_cube(sales_df, backend)
+    try:
+        if backend is None:
+            backend = backends.choose_backend(int(sales_df.memory_usage(deep=True).sum()), local_only=True)
+        cube = backends.create_product_performance_cube(sales_df, backend)
+        logger.info(f"Product performance cube created successfully with the {backend} backend.")
+        return backends.backend_for(cube).to_pandas(cube)
+    except Exception as e:
+        logger.error(f"Error creating product performance cube: {e}")
+        raise
+
+def create_product_performance_cube_from_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Aggregate streamed chunks of sales data by product and day of the week."""
+    try:
+        accumulator = ProductDayAccumulator()
+        for chunk in chunks:
+            accumulator.update(chunk)
+        cube = accumulator.to_frame()
         logger.info("Product performance cube created successfully.")
-        return grouped
+        return cube
     except Exception as e:
         logger.error(f"Error creating product performance cube: {e}")
         raise
 
+def create_product_performance_cube_from_snapshot(reader: FactTableReader) -> pd.DataFrame:
+    """Aggregate the memory-mapped sales snapshot by product and day of the week."""
+    try:
+        accumulator = ProductDayAccumulator()
+        for days, product_ids, amounts in reader.chunks(["SaleDate", "ProductID", "SaleAmount"]):
+            accumulator.update_arrays(days, product_ids, amounts)
+        cube = accumulator.to_frame()
+        logger.info(f"Product performance cube created from the snapshot in {reader.snapshot_dir}.")
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating product performance cube from the snapshot: {e}")
+        raise
+
 def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
     """Write the OLAP cube to a CSV file."""
     try:
@@ -76,8 +223,7 @@ def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
 def main():
     """Main function for OLAP cubing."""
     logger.info("Starting OLAP Cubing process for product performance by day...")
-    sales_df = ingest_sales_data_from_dw()
-    product_performance_cube = create_product_performance_cube(sales_df)
+    product_performance_cube = query_product_performance_from_dw()
     write_cube_to_csv(product_performance_cube, "product_performance_by_day.csv")
     logger.info("OLAP Cubing process completed successfully.")
     logger.info(f"Please see outputs in {OLAP_OUTPUT_DIR}")
@@ -0,0 +1,76 @@
+"""
+OLAP Queries
+File: scripts/olap/queries.py
+
+SQL for the OLAP scripts, kept in one place so olap_indexes.py can check the plan
+of every shipped query. Day of week is strftime('%w', SaleDate), 0=Sunday ... 6=Saturday.
+
+Aggregate-only queries read sales_daily_summary (see dw_summary.py), which holds
+one pre-aggregated row per day, product, customer and store, instead of the facts.
+"""
+
+from typing import Dict
+
+# Day-of-week numbers returned by strftime('%w', ...) mapped to weekday names
+DAY_NAMES: Dict[str, str] = {
+    "0": "Sunday", "1": "Monday", "2": "Tuesday",
+    "3": "Wednesday", "4": "Thursday", "5": "Friday", "6": "Saturday",
+}
+
+# Used by olap_cubing.create_olap_cube; TransactionIDs per cell are in the drill-through index
+OLAP_CUBE_QUERY: str = """
+SELECT
+    DayOfWeek,
+    ProductID,
+    CustomerID,
+    SUM(TotalSales) AS TotalSales,
+    SUM(TotalSales) / SUM(SalesCount) AS AvgSales,
+    SUM(SalesCount) AS SalesCount
+FROM sales_daily_summary
+GROUP BY DayOfWeek, ProductID, CustomerID
+ORDER BY DayOfWeek, ProductID, CustomerID;
+"""
+
+# Used by drill_through.DrillThroughIndex; read in index order, sorted in NumPy
+DRILL_THROUGH_QUERY: str = """
+SELECT
+    CAST(strftime('%w', SaleDate) AS INTEGER) AS DayOfWeek,
+    ProductID,
+    CustomerID,
+    TransactionID
+FROM sales;
+"""
+
+# Used by product_performance_by_day, which aggregated SELECT * in pandas before
+PRODUCT_PERFORMANCE_QUERY: str = """
+SELECT
+    DayOfWeek,
+    ProductID,
+    SUM(TotalSales) AS TotalSales,
+    SUM(TotalSales) / SUM(SalesCount) AS AvgSales,
+    SUM(SalesCount) AS SalesCount
+FROM sales_daily_summary
+GROUP BY DayOfWeek, ProductID
+ORDER BY DayOfWeek, ProductID;
+"""
+
+# Finest cuboid read by cube_engine.OlapCube.from_warehouse
+CUBE_BASE_QUERY: str = """
+SELECT
+    DayOfWeek,
+    ProductID,
+    CustomerID,
+    StoreID,
+    SUM(TotalSales) AS TotalSales,
+    SUM(SalesCount) AS SalesCount,
+    SUM(SumSquares) AS SumSquares
+FROM sales_daily_summary
+GROUP BY DayOfWeek, ProductID, CustomerID, StoreID;
+"""
+
+OLAP_QUERIES: Dict[str, str] = {
+    "olap_cube": OLAP_CUBE_QUERY,
+    "product_performance_by_day": PRODUCT_PERFORMANCE_QUERY,
+    "cube_base": CUBE_BASE_QUERY,
+    "drill_through": DRILL_THROUGH_QUERY,
+}
@@ -1,42 +1,83 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import pathlib
 import sys
+from typing import Optional
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
 from utils.logger import logger  # Make sure logger is working
+from scripts.dw_access import read_connection  # noqa: E402
+from scripts.fact_snapshot import SNAPSHOT_DIR, FactTableReader  # noqa: E402
+from scripts.olap.cube_engine import OlapCube  # noqa: E402
+from scripts.olap.queries import DAY_NAMES  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
 # Constants
-OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
-CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+DB_PATH: pathlib.Path = pathlib.Path("data").joinpath("dw", "smart_sales.db")
 RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
+CHART_FILE: pathlib.Path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_of_week.png")
 
 # Create output directory for results if it doesn't exist
 RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
-    """Load the precomputed OLAP cube data."""
+def load_sales_cube(db_path: pathlib.Path = DB_PATH) -> OlapCube:
+    """Build the in-memory sales cube from the pre-aggregated summary in the data warehouse."""
     try:
-        logger.info(f"Loading OLAP cube from {file_path}")
-        cube_df = pd.read_csv(file_path)
-        logger.info(f"OLAP cube data successfully loaded from {file_path}.")
-        return cube_df
+        logger.info(f"Building sales cube from {db_path}")
+        with read_connection(db_path) as conn:
+            return OlapCube.from_warehouse(conn)
     except Exception as e:
-        logger.error(f"Error loading OLAP cube data: {e}")
+        logger.error(f"Error building sales cube: {e}")
         raise
 
-def analyze_sales_by_weekday(cube_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate total sales by DayOfWeek."""
+def query_sales_by_weekday(cube: OlapCube) -> pd.DataFrame:
+    """Roll the sales cube up to total sales by DayOfWeek."""
     try:
-        logger.info("Analyzing sales by weekday...")
-        sales_by_weekday = (
-    cube_df.groupby("DayOfWeek")["TotalSales"].sum().reset_index()
-)
+        sales_by_weekday = cube.rollup(["DayOfWeek"])
+        sales_by_weekday["DayOfWeek"] = sales_by_weekday["DayOfWeek"].map(DAY_NAMES)
+        sales_by_weekday.sort_values(by="TotalSales", inplace=True)
+        logger.info("Sales by DayOfWeek rolled up from the sales cube successfully.")
+        return sales_by_weekday
+    except Exception as e:
+        logger.error(f"Error querying sales by DayOfWeek: {e}")
+        raise
+
+def load_sales_snapshot(snapshot_dir: pathlib.Path = SNAPSHOT_DIR, db_path: pathlib.Path = DB_PATH) -> Optional[FactTableReader]:
+    """Open the columnar sales snapshot, or return None if it is missing or older than the warehouse."""
+    if not snapshot_dir.joinpath("manifest.json").exists():
+        return None
+    reader = FactTableReader(snapshot_dir)
+    with read_connection(db_path) as conn:
+        if not reader.is_current(conn):
+            logger.info(f"Sales snapshot in {snapshot_dir} is older than the warehouse; not using it.")
+            return None
+    return reader
 
-        sales_by_weekday.rename(columns={"sale_amount_usd_sum": "TotalSales"}, inplace=True)
+def query_sales_by_weekday_from_snapshot(reader: FactTableReader) -> pd.DataFrame:
+    """Total sales by DayOfWeek straight from the memory-mapped sales columns."""
+    try:
+        totals, counts = np.zeros(7), np.zeros(7, dtype=np.int64)
+        for days, amounts in reader.chunks(["SaleDate", "SaleAmount"]):
+            valid = ~np.isnat(days) & ~np.isnan(amounts)
+            weekdays = (days[valid].view(np.int64) + 4) % 7  # 1970-01-01 was a Thursday; 0=Sunday as in strftime('%w')
+            totals += np.bincount(weekdays, weights=amounts[valid], minlength=7)
+            counts += np.bincount(weekdays, minlength=7)
+        present = np.flatnonzero(counts)
+        sales_by_weekday = pd.DataFrame({
+            "DayOfWeek": [DAY_NAMES[str(day)] for day in present],
+            "TotalSales": totals[present],
+            "SalesCount": counts[present],
+        })
         sales_by_weekday.sort_values(by="TotalSales", inplace=True)
-        logger.info("Sales aggregated by DayOfWeek successfully.")
+        logger.info("Sales by DayOfWeek aggregated from the sales snapshot successfully.")
         return sales_by_weekday
     except Exception as e:
-        logger.error(f"Error analyzing sales by DayOfWeek: {e}")
+        logger.error(f"Error aggregating sales by DayOfWeek from the snapshot: {e}")
         raise
 
 def identify_least_profitable_day(sales_by_weekday: pd.DataFrame) -> str:
@@ -49,6 +90,12 @@ def identify_least_profitable_day(sales_by_weekday: pd.DataFrame) -> str:
         logger.error(f"Error identifying least profitable day: {e}")
         raise
 
+@cached_stage(outputs=[CHART_FILE])
+def save_sales_by_weekday_chart(sales_by_weekday: pd.DataFrame) -> None:
+    """Save the current figure as the chart of sales_by_weekday (skipped if the saved chart shows the same totals)."""
+    plt.savefig(CHART_FILE)
+    logger.info(f"Visualization saved to {CHART_FILE}.")
+
 def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
     """Visualize total sales by day of the week."""
     try:
@@ -66,9 +113,7 @@ def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
         plt.tight_layout()
 
         # Save the visualization
-        output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_of_week.png")
-        plt.savefig(output_path)
-        logger.info(f"Visualization saved to {output_path}.")
+        save_sales_by_weekday_chart(sales_by_weekday)
         plt.show()
     except Exception as e:
         logger.error(f"Error visualizing sales by day of the week: {e}")
@@ -78,19 +123,22 @@ def main():
     """Main function for analyzing and visualizing sales data."""
     logger.info("Starting SALES_LOW_REVENUE_DAYOFWEEK analysis...")
 
-    # Step 1: Load the precomputed OLAP cube
+    # Step 1: Use the columnar sales snapshot if the ETL wrote a current one
     try:
-        cube_df = load_olap_cube(CUBED_FILE)
+        reader = load_sales_snapshot()
     except Exception as e:
-        logger.error(f"Failed to load OLAP cube: {e}")
-        return
+        logger.warning(f"Could not open the sales snapshot: {e}")
+        reader = None
 
-    # Step 2: Analyze total sales by DayOfWeek
+    # Step 2: Total sales by DayOfWeek, from the snapshot or rolled up from the sales cube
     try:
-        sales_by_weekday = analyze_sales_by_weekday(cube_df)
+        if reader is not None:
+            sales_by_weekday = query_sales_by_weekday_from_snapshot(reader)
+        else:
+            sales_by_weekday = query_sales_by_weekday(load_sales_cube())
     except Exception as e:
         logger.error(f"Failed to analyze sales by weekday: {e}")
-        return
+        sys.exit(1)
 
     # Step 3: Identify the least profitable day
     try:
@@ -98,14 +146,14 @@ def main():
         logger.info(f"Least profitable day: {least_profitable_day}")
     except Exception as e:
         logger.error(f"Failed to identify least profitable day: {e}")
-        return
+        sys.exit(1)
 
     # Step 4: Visualize total sales by DayOfWeek
     try:
         visualize_sales_by_weekday(sales_by_weekday)
     except Exception as e:
         logger.error(f"Failed to visualize sales by weekday: {e}")
-        return
+        sys.exit(1)
 
     logger.info("Analysis and visualization completed successfully.")
 
@@ -0,0 +1,391 @@
+"""
+Pipeline Orchestrator
+File: scripts/orchestrator.py
+
+Runs the warehouse pipeline as a DAG of stages instead of a fixed manual order:
+
+    prepare_customers ─┐
+    prepare_products  ─┼─> etl_to_dw ─┬─> olap_cubing
+    prepare_sales     ─┤              ├─> product_performance
+    create_dw ─────────┘              └─> sales_by_weekday (chart)
+
+Each stage declares the files it reads and writes. A stage depends on the stages
+that write its inputs (plus any listed in `after`), and stages whose dependencies
+are done run concurrently on an asyncio event loop: scripts as subprocesses,
+Python callables on a process pool, at most `workers` at a time.
+
+Before running, a stage's fingerprint is computed from the content hashes of its
+inputs, its code and its arguments. Its code is the script (or the module of the
+callable) plus every project module it imports, directly or through other project
+modules, so editing a helper such as dw_loader.py re-runs the stages built on it.
+A stage whose fingerprint matches the last successful run, and whose outputs all
+exist, is skipped. A run is successful when the script exits with status 0 (or
+the callable returns): the pipeline scripts exit non-zero on failure, and a
+script may leave outputs that are already current untouched. The run ends with a
+timing report of every stage and of the critical path, the chain of stages that
+determined the total run time.
+
+Usage:
+    python3 scripts/orchestrator.py [--workers 4] [--force]
+"""
+
+import argparse
+import ast
+import asyncio
+import hashlib
+import inspect
+import json
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+
+# Constants
+STATE_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "pipeline_state.json")
+DEFAULT_WORKERS: int = 4
+HASH_BLOCK_SIZE: int = 1 << 20
+
+RAN = "ran"
+SKIPPED = "skipped"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+
+@dataclass
+class Stage:
+    """One pipeline step: a script (run as a subprocess) or a picklable callable (run on the process pool).
+
+    Paths are relative to the project root.
+    """
+
+    name: str
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    script: Optional[str] = None
+    args: Sequence[str] = ()
+    func: Optional[Callable[..., Any]] = None
+    after: Sequence[str] = ()
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    start: float = 0.0
+    end: float = 0.0
+    error: Optional[str] = None
+    dependencies: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _data(*parts: str) -> str:
+    return str(pathlib.Path("data").joinpath(*parts))
+
+
+PIPELINE_STAGES: Tuple[Stage, ...] = (
+    Stage(
+        "prepare_customers",
+        script="scripts/prepare_customers_data.py",
+        inputs=[_data("raw", "customers_data.csv")],
+        outputs=[_data("prepared", "customers_data_prepared.csv")],
+    ),
+    Stage(
+        "prepare_products",
+        script="scripts/prepare_products_data.py",
+        inputs=[_data("raw", "products_data.csv")],
+        outputs=[_data("prepared", "products_data_prepared.csv")],
+    ),
+    Stage(
+        "prepare_sales",
+        script="scripts/prepare_sales_data.py",
+        inputs=[_data("raw", "sales_data.csv")],
+        outputs=[_data("prepared", "sales_data_prepared.csv")],
+    ),
+    Stage(
+        "create_dw",
+        script="scripts/create_dw.py",
+        inputs=["scripts/create_dw.py", "scripts/dw_summary.py"],
+        outputs=[_data("dw", "smart_sales.db")],
+    ),
+    Stage(
+        "etl_to_dw",
+        script="scripts/etl_to_dw.py",
+        inputs=[
+            _data("prepared", "customers_data_prepared.csv"),
+            _data("prepared", "products_data_prepared.csv"),
+            _data("prepared", "sales_data_prepared.csv"),
+        ],
+        # The snapshot manifest carries the warehouse data version, so it changes with every load
+        outputs=[_data("dw", "sales_columns", "manifest.json")],
+        after=["create_dw"],
+    ),
+    Stage(
+        "olap_cubing",
+        script="scripts/olap/olap_cubing.py",
+        inputs=[_data("dw", "sales_columns", "manifest.json")],
+        outputs=[_data("olap_cubing_outputs", "olap_cube.csv")],
+    ),
+    Stage(
+        "product_performance",
+        script="scripts/olap/product_performance_by_day.py",
+        inputs=[_data("dw", "sales_columns", "manifest.json")],
+        outputs=[_data("olap_cubing_outputs", "product_performance_by_day.csv")],
+    ),
+    Stage(
+        "sales_by_weekday",
+        script="scripts/olap/sales_analysis_by_weekday.py",
+        inputs=[_data("dw", "sales_columns", "manifest.json")],
+        outputs=[_data("results", "sales_by_day_of_week.png")],
+    ),
+)
+
+
+def file_hash(path: pathlib.Path) -> str:
+    """Return the SHA-256 of a file's content, or 'missing'."""
+    if not path.is_file():
+        return "missing"
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _module_path(module_name: str, root: pathlib.Path) -> Optional[pathlib.Path]:
+    """Return the project file of an importable module name, or None if it is not part of the project."""
+    base = root.joinpath(*module_name.split("."))
+    for path in (base.with_suffix(".py"), base.joinpath("__init__.py")):
+        if path.is_file():
+            return path
+    return None
+
+
+def code_files(path: pathlib.Path, root: pathlib.Path = PROJECT_ROOT) -> List[pathlib.Path]:
+    """Return path and every project module it imports, directly or transitively, in a stable order."""
+    found: Set[pathlib.Path] = set()
+    pending = [path.resolve()]
+    while pending:
+        current = pending.pop()
+        if current in found or not current.is_file():
+            continue
+        found.add(current)
+        for node in ast.walk(ast.parse(current.read_text(), filename=str(current))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from scripts import etl_to_dw` imports a module, `from scripts.x import y` a name
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                module_path = _module_path(name, root)
+                if module_path is not None:
+                    pending.append(module_path.resolve())
+    return sorted(found)
+
+
+def stage_fingerprint(stage: Stage, root: pathlib.Path = PROJECT_ROOT) -> str:
+    """Hash of what a stage's result depends on: its inputs, its code and its arguments."""
+    if stage.script:
+        entry = root.joinpath(stage.script)
+        function = stage.script
+    else:
+        entry = pathlib.Path(inspect.getfile(stage.func))
+        function = f"{stage.func.__module__}.{stage.func.__qualname__}"
+    code = {
+        str(path.relative_to(root.resolve())) if path.is_relative_to(root.resolve()) else str(path): file_hash(path)
+        for path in code_files(entry, root)
+    }
+    inputs = {path: file_hash(root.joinpath(path)) for path in stage.inputs}
+    payload = json.dumps(
+        {"function": function, "code": code, "args": list(stage.args), "inputs": inputs}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stage_dependencies(stages: Sequence[Stage]) -> Dict[str, List[str]]:
+    """Return each stage's upstream stages, in an order where dependencies come first.
+
+    Raises ValueError for unknown stage names, outputs written by two stages, and cycles.
+    """
+    writers: Dict[str, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in writers:
+                raise ValueError(f"{output} is written by both {writers[output]} and {stage.name}.")
+            writers[output] = stage.name
+    names = {stage.name for stage in stages}
+    dependencies = {}
+    for stage in stages:
+        unknown = [name for name in stage.after if name not in names]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} runs after unknown stages: {unknown}")
+        upstream = {writers[path] for path in stage.inputs if path in writers} | set(stage.after)
+        upstream.discard(stage.name)
+        dependencies[stage.name] = sorted(upstream)
+
+    ordered: Dict[str, List[str]] = {}
+    visiting = set()
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"The pipeline has a cycle through {name}.")
+        visiting.add(name)
+        for upstream in dependencies[name]:
+            visit(upstream)
+        visiting.discard(name)
+        ordered[name] = dependencies[name]
+
+    for stage in stages:
+        visit(stage.name)
+    return ordered
+
+
+def critical_path(results: Dict[str, StageResult]) -> List[StageResult]:
+    """Return the chain of stages, ending with the last to finish, that each waited on the previous one."""
+    finished = [result for result in results.values() if result.status != BLOCKED]
+    if not finished:
+        return []
+    path = [max(finished, key=lambda result: result.end)]
+    while True:
+        upstream = [results[name] for name in path[-1].dependencies if results[name].status != BLOCKED]
+        if not upstream:
+            break
+        path.append(max(upstream, key=lambda result: result.end))
+    return list(reversed(path))
+
+
+def timing_report(results: Dict[str, StageResult], wall_time: float) -> str:
+    """Format per-stage timings and the critical-path breakdown."""
+    lines = [f"{'Stage':<22} {'Status':<8} {'Start':>8} {'Duration':>9}"]
+    for result in sorted(results.values(), key=lambda result: result.start):
+        lines.append(f"{result.name:<22} {result.status:<8} {result.start:>7.2f}s {result.duration:>8.2f}s")
+    path = critical_path(results)
+    lines.append(f"Critical path ({sum(r.duration for r in path):.2f}s of {wall_time:.2f}s wall time):")
+    for result in path:
+        share = result.duration / wall_time if wall_time else 0.0
+        lines.append(f"  {result.name:<20} {result.duration:>8.2f}s {share:>6.1%}")
+    return "\n".join(lines)
+
+
+class PipelineRunner:
+    """Runs a DAG of stages concurrently, skipping stages whose inputs are unchanged."""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage] = PIPELINE_STAGES,
+        workers: int = DEFAULT_WORKERS,
+        state_file: pathlib.Path = STATE_FILE,
+        root: pathlib.Path = PROJECT_ROOT,
+        force: bool = False,
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        self.dependencies = stage_dependencies(stages)
+        self.workers = workers
+        self.state_file = state_file
+        self.root = root
+        self.force = force
+        self.state: Dict[str, str] = json.loads(state_file.read_text()) if state_file.exists() else {}
+
+    def run(self) -> Dict[str, StageResult]:
+        """Run the pipeline and return the result of every stage."""
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> Dict[str, StageResult]:
+        self._started = time.perf_counter()
+        self._slots = asyncio.Semaphore(self.workers)
+        results: Dict[str, StageResult] = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self._pool = pool
+            tasks: Dict[str, asyncio.Task] = {}
+            for name, upstream in self.dependencies.items():
+                tasks[name] = asyncio.ensure_future(self._run_stage(self.stages[name], [tasks[u] for u in upstream]))
+            for result in await asyncio.gather(*tasks.values()):
+                results[result.name] = result
+        self._save_state()
+        wall_time = time.perf_counter() - self._started
+        logger.info("Pipeline timings:\n" + timing_report(results, wall_time))
+        return results
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._started
+
+    async def _run_stage(self, stage: Stage, upstream: List["asyncio.Task"]) -> StageResult:
+        upstream_results = await asyncio.gather(*upstream)
+        dependencies = self.dependencies[stage.name]
+        if any(result.status in (FAILED, BLOCKED) for result in upstream_results):
+            logger.warning(f"Stage {stage.name} not run: an upstream stage failed.")
+            now = self._now()
+            return StageResult(stage.name, BLOCKED, now, now, dependencies=dependencies)
+
+        async with self._slots:
+            start = self._now()
+            loop = asyncio.get_running_loop()
+            fingerprint = await loop.run_in_executor(None, stage_fingerprint, stage, self.root)
+            outputs_exist = all(self.root.joinpath(path).exists() for path in stage.outputs)
+            if not self.force and outputs_exist and self.state.get(stage.name) == fingerprint:
+                logger.info(f"Stage {stage.name} skipped: inputs unchanged.")
+                return StageResult(stage.name, SKIPPED, start, self._now(), dependencies=dependencies)
+
+            logger.info(f"Stage {stage.name} started.")
+            try:
+                if stage.script:
+                    await self._run_script(stage)
+                else:
+                    await loop.run_in_executor(self._pool, stage.func, *stage.args)
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed: {e}")
+                self.state.pop(stage.name, None)
+                return StageResult(stage.name, FAILED, start, self._now(), error=str(e), dependencies=dependencies)
+
+            # Fingerprint again: a stage may have rewritten one of its own inputs
+            self.state[stage.name] = await loop.run_in_executor(None, stage_fingerprint, stage, self.root)
+            result = StageResult(stage.name, RAN, start, self._now(), dependencies=dependencies)
+            logger.info(f"Stage {stage.name} finished in {result.duration:.2f}s.")
+            return result
+
+    async def _run_script(self, stage: Stage) -> None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, str(self.root.joinpath(stage.script)), *stage.args,
+            cwd=self.root,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        output, _ = await process.communicate()
+        if process.returncode != 0:
+            tail = output.decode(errors="replace").strip().splitlines()[-5:]
+            raise RuntimeError(f"{stage.script} exited with code {process.returncode}: {' | '.join(tail)}")
+
+    def _save_state(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.state_file.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+
+
+def main() -> None:
+    """Run the pipeline DAG."""
+    parser = argparse.ArgumentParser(description="Run the smart store pipeline as a DAG of stages.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Stages run at the same time.")
+    parser.add_argument("--force", action="store_true", help="Run every stage, even if its inputs are unchanged.")
+    args = parser.parse_args()
+
+    results = PipelineRunner(workers=args.workers, force=args.force).run()
+    if any(result.status in (FAILED, BLOCKED) for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
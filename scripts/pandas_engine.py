@@ -0,0 +1,271 @@
+"""
+Pandas Engine
+File: scripts/pandas_engine.py
+
+Single-node versions of the Spark pipeline's step1-step3 functions, built on
+pandas and NumPy. Each function has the same name and signature as its Spark
+counterpart in step1_extract, step2_transform or step3_load and writes the same
+outputs. step0_pipeline can therefore run either engine, and uses this one when
+runtime_profile finds that the data fits in memory. Otherwise starting a JVM
+takes longer than the work itself.
+
+The `spark` argument of the readers is accepted and ignored, and the plan
+helpers (persist, check_exchanges) have nothing to do here. The transforms take
+a `backend` from scripts/backends.py: pandas by default, or Polars when
+step0_pipeline's choose_backend picks it for a larger input. Either way they
+return pandas frames, so the savers work unchanged.
+"""
+
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts import backends, prepared_io  # noqa: E402
+from scripts.grouping_sets import (  # noqa: E402
+    GROUPING_ID_COLUMN,
+    SALES_CUBE_VIEWS,
+    grouping_columns,
+    grouping_id_for,
+)
+
+# Schemas of the prepared tables as pandas dtypes, matching step1_extract's Spark schemas
+PRODUCTS_SCHEMA: Dict[str, str] = {
+    "ProductID": "int64",
+    "ProductName": "string",
+    "Category": "string",
+    "UnitPrice": "float64",
+    "StockQuantity": "Int64",
+    "StoreSection": "string",
+}
+SALES_SCHEMA: Dict[str, str] = {
+    "TransactionID": "int64",
+    "SaleDate": "datetime64[us]",
+    "CustomerID": "Int64",
+    "ProductID": "Int64",
+    "StoreID": "Int64",
+    "CampaignID": "Int64",
+    "SaleAmount": "float64",
+    "DiscountPercent": "Int64",
+    "PaymentType": "string",
+}
+
+# Date formats found in prepared CSV files, as in step1_extract.CSV_DATE_FORMATS
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y")
+
+# Parquet outputs are partitioned by these columns when they have them, as in step3_load
+DEFAULT_PARTITION_COLUMNS = ("Year", "Month")
+
+
+def parse_csv_date(values: pd.Series) -> pd.Series:
+    """Parse text dates in any of CSV_DATE_FORMATS (NaT if none matches)."""
+    parsed = pd.to_datetime(values, format=CSV_DATE_FORMATS[0], errors="coerce")
+    for date_format in CSV_DATE_FORMATS[1:]:
+        parsed = parsed.fillna(pd.to_datetime(values, format=date_format, errors="coerce"))
+    return parsed
+
+
+def conform_to_schema(df: pd.DataFrame, schema: Mapping[str, str]) -> pd.DataFrame:
+    """Select the schema's columns in its order, cast to its dtypes (text dates are parsed)."""
+    columns = {}
+    for column, dtype in schema.items():
+        values = df[column]
+        if dtype.startswith("datetime64") and not pd.api.types.is_datetime64_any_dtype(values):
+            values = parse_csv_date(values.astype("string"))
+        columns[column] = values.astype(dtype)
+    return pd.DataFrame(columns)
+
+
+def read_csv(spark: Any, file_path: Path, schema: Optional[Mapping[str, str]] = None) -> pd.DataFrame:
+    """
+    Read a CSV file with a header into a pandas DataFrame.
+
+    Args:
+        spark: Unused; kept for the signature of step1_extract.read_csv.
+        file_path (Path): Path to the CSV file.
+        schema (Mapping[str, str]): Expected columns and dtypes. Without a schema
+            pandas infers the types.
+
+    Returns:
+        pd.DataFrame: The loaded DataFrame.
+    """
+    try:
+        logger.info(f"Reading CSV file: {file_path}")
+        if schema is None:
+            df = pd.read_csv(file_path)
+        else:
+            df = conform_to_schema(pd.read_csv(file_path, usecols=list(schema), dtype=str), schema)
+        logger.info(f"Successfully loaded {len(df)} rows from {file_path}")
+        return df
+    except Exception as e:
+        logger.error(f"Error reading CSV file {file_path}: {e}")
+        raise
+
+
+def read_prepared(spark: Any, csv_path: Path, schema: Optional[Mapping[str, str]] = None) -> pd.DataFrame:
+    """Read a prepared table, from the Parquet file beside csv_path when there is one."""
+    try:
+        logger.info(f"Reading prepared table: {csv_path}")
+        df = prepared_io.read_prepared(csv_path, columns=list(schema) if schema else None)
+        return conform_to_schema(df, schema) if schema else df
+    except Exception as e:
+        logger.error(f"Error reading prepared table {csv_path}: {e}")
+        raise
+
+
+def with_date_parts(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """Add Year, Month and DayOfWeek (1 = Sunday, as in Spark) from SaleDate, unless already there."""
+    return backends.with_date_parts(sales_df, backends.PANDAS)
+
+
+def persist_sales_with_date_parts(sales_df: pd.DataFrame, storage_level: Any = None) -> pd.DataFrame:
+    """Derive the date parts once; the frame is already in memory, so there is nothing to persist."""
+    return with_date_parts(sales_df)
+
+
+def join_dimension(fact_df: pd.DataFrame, dimension_df: pd.DataFrame, on: Any,
+                   how: str = "inner", threshold_bytes: Optional[int] = None) -> pd.DataFrame:
+    """Join a dimension to a fact table (a hash join; there is nothing to broadcast in one process)."""
+    return fact_df.merge(dimension_df, on=on, how=how)
+
+
+def check_exchanges(df: pd.DataFrame, max_shuffles: int, description: str, strict: bool = False) -> Dict[str, int]:
+    """Return zero exchanges: a pandas plan never shuffles between processes."""
+    return {"shuffle": 0, "broadcast": 0}
+
+
+def _as_pandas(df: Any) -> pd.DataFrame:
+    """Return a transform result from any backend as a pandas frame."""
+    return backends.backend_for(df).to_pandas(df)
+
+
+def calculate_sales_count(products_df: pd.DataFrame, sales_df: pd.DataFrame,
+                          backend: str = backends.PANDAS) -> pd.DataFrame:
+    """
+    Calculate the total sales count per product (sale amount over unit price).
+
+    Returns:
+        pd.DataFrame: ProductID and sum(Count), named like the Spark result.
+    """
+    try:
+        logger.info(f"Calculating sales count per product with the {backend} backend.")
+        sales_count = _as_pandas(backends.calculate_sales_count(products_df, sales_df, backend))
+        logger.info("Sales count calculation completed successfully.")
+        return sales_count
+    except Exception as e:
+        logger.error(f"Error during transformation: {e}")
+        raise ValueError(f"Error during transformation: {e}")
+
+
+def cube_sales_by_date(sales_df: pd.DataFrame, backend: str = backends.PANDAS) -> pd.DataFrame:
+    """Cube sales data by Year, Month, and DayOfWeek."""
+    try:
+        logger.info("Cubing sales data by Year, Month, and DayOfWeek.")
+        return _as_pandas(backends.cube_sales_by_date(sales_df, backend))
+    except Exception as e:
+        logger.error(f"Error during cubing: {e}")
+        raise ValueError(f"Error during cubing: {e}")
+
+
+def cube_sales_by_date_and_store(sales_df: pd.DataFrame, backend: str = backends.PANDAS) -> pd.DataFrame:
+    """Cube sales data by Year, Month, DayOfWeek, and StoreID."""
+    try:
+        logger.info("Cubing sales data by Year, Month, DayOfWeek, and StoreID.")
+        return _as_pandas(backends.cube_sales_by_date_and_store(sales_df, backend))
+    except Exception as e:
+        logger.error(f"Error during cubing: {e}")
+        raise ValueError(f"Error during cubing: {e}")
+
+
+def cube_sales_grouping_sets(sales_df: pd.DataFrame,
+                             views: Mapping[str, Sequence[str]] = SALES_CUBE_VIEWS,
+                             backend: str = backends.PANDAS) -> pd.DataFrame:
+    """
+    Aggregate sales at every level in views, tagged with Spark's grouping_id.
+
+    Columns a view does not group by are null in its rows, as in the Spark result.
+    """
+    try:
+        logger.info(f"Cubing sales data for {len(views)} views: {list(views)}.")
+        sales_df = with_date_parts(sales_df)
+        columns = grouping_columns(views)
+        levels = []
+        for view_columns in views.values():
+            level = _as_pandas(backends.total_sales(sales_df, view_columns, backend))
+            level = level.reindex(columns=[*columns, "TotalSales"])
+            level.insert(len(columns), GROUPING_ID_COLUMN, grouping_id_for(view_columns, columns))
+            levels.append(level)
+        cubed_sales = pd.concat(levels, ignore_index=True)
+        # Nullable integers keep integer keys integers next to the nulls of coarser views
+        return cubed_sales.astype({
+            column: "Int64" if pd.api.types.is_integer_dtype(sales_df[column].dtype) else sales_df[column].dtype
+            for column in columns
+        })
+    except Exception as e:
+        logger.error(f"Error during cubing: {e}")
+        raise ValueError(f"Error during cubing: {e}")
+
+
+def _remove(path: Path) -> None:
+    """Remove an earlier output, which Spark may have written as a directory."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def save_to_csv_and_parquet(
+    df: pd.DataFrame,
+    output_dir: Path,
+    file_name: str,
+    partition_by: Optional[Sequence[str]] = None,
+) -> None:
+    """
+    Save a DataFrame to output_dir/file_name.csv and output_dir/file_name.parquet.
+
+    The CSV is a single file. The Parquet output is a Year=.../Month=... directory
+    tree like the one Spark writes, so step4_visualize.read_output reads either.
+    """
+    logger.info("Starting the save operation for CSV and Parquet files.")
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if partition_by is None:
+            partition_by = [column for column in DEFAULT_PARTITION_COLUMNS if column in df.columns]
+
+        csv_path = output_dir.joinpath(f"{file_name}.csv")
+        _remove(csv_path)
+        df.to_csv(csv_path, index=False)
+        logger.info(f"Data saved to CSV: {csv_path}")
+
+        if not prepared_io.parquet_available():
+            logger.warning("pyarrow is not installed; skipping the Parquet output.")
+            return
+        parquet_path = output_dir.joinpath(f"{file_name}.parquet")
+        _remove(parquet_path)
+        # Written without pandas metadata, like Spark's output: partition columns read back as categories
+        table = prepared_io.pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        prepared_io.pq.write_to_dataset(table, parquet_path, partition_cols=list(partition_by) or None)
+        logger.info(f"Data saved to Parquet: {parquet_path} (partitioned by {list(partition_by) or 'nothing'})")
+
+    except Exception as e:
+        logger.error(f"Error saving files: {e}")
+        raise
+
+
+def save_grouping_sets(df: pd.DataFrame, output_dir: Path, views: Mapping[str, Sequence[str]]) -> None:
+    """Split the result of cube_sales_grouping_sets into one output per view, by grouping_id."""
+    columns = grouping_columns(views)
+    measures = [column for column in df.columns if column not in columns and column != GROUPING_ID_COLUMN]
+    for file_name, view_columns in views.items():
+        gid = grouping_id_for(view_columns, columns)
+        logger.info(f"Saving view {file_name} (grouping_id {gid}).")
+        view_df = df.loc[df[GROUPING_ID_COLUMN] == gid, [*view_columns, *measures]].reset_index(drop=True)
+        save_to_csv_and_parquet(view_df, output_dir, file_name)
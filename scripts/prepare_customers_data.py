@@ -1,52 +1,96 @@
+"""
+Prepare Customers Data
+File: scripts/prepare_customers_data.py
+
+Cleans data/raw/customers_data.csv and saves it to data/prepared/customers_data_prepared.parquet
+(with a CSV export beside it).
+
+Usage:
+    python3 scripts/prepare_customers_data.py [--stream] [--chunk-size N]
+
+--stream reads the raw file in fixed-size chunks and writes the prepared file
+incrementally, for extracts that do not fit in memory.
+"""
+
+import argparse
+import pathlib
+import sys
+from typing import Tuple
+
 import pandas as pd
 
-# Load raw customers data
-customers = pd.read_csv('data/raw/customers_data.csv')
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 
-# 1. Remove duplicates
-customers.drop_duplicates(inplace=True)
+# Now we can import local modules
+from utils.logger import logger  # noqa: E402
+from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.data_streaming import DEFAULT_CHUNK_SIZE, stream_clean_csv  # noqa: E402
+from scripts.prepared_io import export_parquet_from_csv, prepared_files, write_prepared  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
-# 2. Handle missing values
-customers['LoyaltyPoints'].fillna(0, inplace=True)  # Example: fill missing LoyaltyPoints with 0
+# Constants
+RAW_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "raw", "customers_data.csv")
+PREPARED_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "prepared", "customers_data_prepared.csv")
+# Modules the cleaning depends on besides this script (part of the stage cache key)
+CLEANING_CODE: Tuple[str, ...] = ("scripts.data_scrubber", "scripts.data_streaming", "scripts.dtype_schema", "scripts.prepared_io")
+MAX_LOYALTY_POINTS: int = 5000  # Points above 5000 are unrealistic
 
-# 3. Remove outliers in LoyaltyPoints (e.g., points above 5000 might be unrealistic)
-customers = customers[customers['LoyaltyPoints'] <= 5000]
 
-# 4. Standardize CustomerSegment values
-customers['CustomerSegment'] = customers['CustomerSegment'].replace({
-    'VIP': 'VIP', 'vip': 'VIP', 'Regular': 'Regular', 'regular': 'Regular'
-})
+def clean_customers(customers: pd.DataFrame) -> pd.DataFrame:
+    """Apply the row-level cleaning steps to de-duplicated customer rows."""
+    # Handle missing values
+    customers = customers.assign(LoyaltyPoints=customers["LoyaltyPoints"].fillna(0))
 
-# Save cleaned data
-customers.to_csv('data/prepared/customers_data_prepared.csv', index=False)
-print("Prepared customers data saved.")
-import pandas as pd
+    # Remove outliers in LoyaltyPoints
+    customers = customers[customers["LoyaltyPoints"] <= MAX_LOYALTY_POINTS]
+
+    # Standardize CustomerSegment values
+    return customers.assign(
+        CustomerSegment=customers["CustomerSegment"].replace({"vip": "VIP", "regular": "Regular"})
+    )
+
+
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_customers_data() -> None:
+    """Clean the raw customers file in memory."""
+    customers = pd.read_csv(RAW_FILE)
+    logger.info(f"Initial number of customers: {len(customers)}")
+
+    # Remove duplicates
+    customers = clean_customers(customers.drop_duplicates())
+
+    logger.info(f"Prepared number of customers: {len(customers)}")
 
-# Load raw customers data
-customers = pd.read_csv('data/raw/customers_data.csv')
+    # Apply compact dtypes and save Parquet plus the CSV export and its schema
+    scrubber = DataScrubber(customers)
+    write_prepared(scrubber.optimize_dtypes(), PREPARED_FILE, scrubber.dtype_schema)
+    logger.info(f"Cleaned customer data has been saved to {PREPARED_FILE}")
 
-# Initial record count
-initial_count = len(customers)
-print(f"Initial number of customers: {initial_count}")
 
-# 1. Remove duplicates
-customers.drop_duplicates(inplace=True)
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_customers_data_streaming(chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Clean the raw customers file in chunks, writing the prepared file incrementally."""
+    stream_clean_csv(RAW_FILE, PREPARED_FILE, clean_customers, chunk_size, optimize_dtypes=True)
+    export_parquet_from_csv(PREPARED_FILE)
 
-# 2. Handle missing values
-customers['LoyaltyPoints'].fillna(0, inplace=True)
 
-# 3. Remove outliers in LoyaltyPoints (e.g., points above 5000 might be unrealistic)
-customers = customers[customers['LoyaltyPoints'] <= 5000]
+def main() -> None:
+    """Main function for preparing customers data."""
+    parser = argparse.ArgumentParser(description="Prepare raw customers data.")
+    parser.add_argument("--stream", action="store_true", help="Process the raw file in chunks.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode.")
+    args = parser.parse_args()
 
-# 4. Standardize CustomerSegment values
-customers['CustomerSegment'] = customers['CustomerSegment'].replace({
-    'VIP': 'VIP', 'vip': 'VIP', 'Regular': 'Regular', 'regular': 'Regular'
-})
+    logger.info("Starting customers data preparation...")
+    if args.stream:
+        prepare_customers_data_streaming(args.chunk_size)
+    else:
+        prepare_customers_data()
+    logger.info("Customers data preparation complete.")
 
-# Prepared record count
-prepared_count = len(customers)
-print(f"Prepared number of customers: {prepared_count}")
 
-# Save cleaned data
-customers.to_csv('data/prepared/customers_data_prepared.csv', index=False)
-print("Cleaned customer data has been saved to data/prepared/customers_data_prepared.csv")
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,100 @@
+"""
+Prepare Products Data
+File: scripts/prepare_products_data.py
+
+Cleans data/raw/products_data.csv and saves it to data/prepared/products_data_prepared.parquet
+(with a CSV export beside it).
+
+Usage:
+    python3 scripts/prepare_products_data.py [--stream] [--chunk-size N]
+
+--stream reads the raw file in fixed-size chunks and writes the prepared file
+incrementally, for extracts that do not fit in memory.
+"""
+
+import argparse
+import pathlib
+import sys
+from typing import Tuple
+
 import pandas as pd
 
-# Load raw products data
-products = pd.read_csv('data/raw/products_data.csv')
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 
-# 1. Remove duplicates
-products.drop_duplicates(inplace=True)
+# Now we can import local modules
+from utils.logger import logger  # noqa: E402
+from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.data_streaming import DEFAULT_CHUNK_SIZE, stream_clean_csv  # noqa: E402
+from scripts.prepared_io import export_parquet_from_csv, prepared_files, write_prepared  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
-# 2. Handle missing values (e.g., fill StockQuantity with 0 if missing)
-products['StockQuantity'].fillna(0, inplace=True)
+# Constants
+RAW_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "raw", "products_data.csv")
+PREPARED_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "prepared", "products_data_prepared.csv")
+# Modules the cleaning depends on besides this script (part of the stage cache key)
+CLEANING_CODE: Tuple[str, ...] = ("scripts.data_scrubber", "scripts.data_streaming", "scripts.dtype_schema", "scripts.prepared_io")
+MAX_UNIT_PRICE: float = 5000  # Prices above 5000 are unrealistic
+MAX_STOCK_QUANTITY: int = 1000  # Stock over 1000 is unrealistic
 
-# 3. Remove outliers in UnitPrice (e.g., prices above 5000 might be unrealistic)
-products = products[products['UnitPrice'] <= 5000]
 
-# 4. Standardize StoreSection values (e.g., capitalize consistently)
-products['StoreSection'] = products['StoreSection'].str.title()
+def clean_products(products: pd.DataFrame) -> pd.DataFrame:
+    """Apply the row-level cleaning steps to de-duplicated product rows."""
+    # Handle missing values
+    products = products.assign(StockQuantity=products["StockQuantity"].fillna(0))
 
-# Save cleaned data
-products.to_csv('data/prepared/products_data_prepared.csv', index=False)
-print("Prepared products data saved.")
-import pandas as pd
+    # Remove outliers in UnitPrice and StockQuantity
+    products = products[
+        (products["UnitPrice"] <= MAX_UNIT_PRICE) & (products["StockQuantity"] <= MAX_STOCK_QUANTITY)
+    ]
+
+    # Standardize Category and StoreSection values
+    return products.assign(
+        Category=products["Category"].replace({"electronics": "Electronics", "clothing": "Clothing"}),
+        StoreSection=products["StoreSection"].str.title(),
+    )
+
+
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_products_data() -> None:
+    """Clean the raw products file in memory."""
+    products = pd.read_csv(RAW_FILE)
+    logger.info(f"Initial number of products: {len(products)}")
+
+    # Remove duplicates
+    products = clean_products(products.drop_duplicates())
+
+    logger.info(f"Prepared number of products: {len(products)}")
 
-# Load raw products data
-products = pd.read_csv('data/raw/products_data.csv')
+    # Apply compact dtypes and save Parquet plus the CSV export and its schema
+    scrubber = DataScrubber(products)
+    write_prepared(scrubber.optimize_dtypes(), PREPARED_FILE, scrubber.dtype_schema)
+    logger.info(f"Cleaned product data has been saved to {PREPARED_FILE}")
 
-# Initial record count
-initial_count = len(products)
-print(f"Initial number of products: {initial_count}")
 
-# 1. Remove duplicates
-products.drop_duplicates(inplace=True)
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_products_data_streaming(chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Clean the raw products file in chunks, writing the prepared file incrementally."""
+    stream_clean_csv(RAW_FILE, PREPARED_FILE, clean_products, chunk_size, optimize_dtypes=True)
+    export_parquet_from_csv(PREPARED_FILE)
 
-# 2. Handle missing values
-products['StockQuantity'].fillna(0, inplace=True)
 
-# 3. Remove outliers in StockQuantity (e.g., stock over 1000 might be unrealistic)
-products = products[products['StockQuantity'] <= 1000]
+def main() -> None:
+    """Main function for preparing products data."""
+    parser = argparse.ArgumentParser(description="Prepare raw products data.")
+    parser.add_argument("--stream", action="store_true", help="Process the raw file in chunks.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode.")
+    args = parser.parse_args()
 
-# 4. Standardize Category values
-products['Category'] = products['Category'].replace({
-    'electronics': 'Electronics', 'clothing': 'Clothing'
-})
+    logger.info("Starting products data preparation...")
+    if args.stream:
+        prepare_products_data_streaming(args.chunk_size)
+    else:
+        prepare_products_data()
+    logger.info("Products data preparation complete.")
 
-# Prepared record count
-prepared_count = len(products)
-print(f"Prepared number of products: {prepared_count}")
 
-# Save cleaned data
-products.to_csv('data/prepared/products_data_prepared.csv', index=False)
-print("Cleaned product data has been saved to data/prepared/products_data_prepared.csv")
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,141 @@
+"""
+Prepare Sales Data
+File: scripts/prepare_sales_data.py
+
+Cleans data/raw/sales_data.csv and saves it to data/prepared/sales_data_prepared.parquet
+(with a CSV export beside it).
+
+Usage:
+    python3 scripts/prepare_sales_data.py [--stream] [--chunk-size N] [--iqr] [--epsilon E]
+
+--stream reads the raw file in fixed-size chunks and writes the prepared file
+incrementally, for extracts that do not fit in memory. --iqr also removes
+SaleAmount outliers outside 1.5 x the interquartile range; in streaming mode the
+quartiles come from a quantile sketch with rank error --epsilon.
+"""
+
+import argparse
+import pathlib
+import sys
+from typing import Optional, Tuple
+
 import pandas as pd
 
-# Load raw sales data
-sales = pd.read_csv('data/raw/sales_data.csv')
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
 
-# 1. Remove duplicates
-sales.drop_duplicates(inplace=True)
+# Now we can import local modules
+from utils.logger import logger  # noqa: E402
+from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.data_streaming import DEFAULT_CHUNK_SIZE, drop_duplicate_chunks, read_csv_in_chunks, stream_clean_csv  # noqa: E402
+from scripts.prepared_io import export_parquet_from_csv, prepared_files, write_prepared  # noqa: E402
+from scripts.quantile_sketch import DEFAULT_EPSILON  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
-# 2. Handle missing values in SaleAmount by filling with the median
-sales['SaleAmount'].fillna(sales['SaleAmount'].median(), inplace=True)
+# Constants
+RAW_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "raw", "sales_data.csv")
+PREPARED_FILE: pathlib.Path = PROJECT_ROOT.joinpath("data", "prepared", "sales_data_prepared.csv")
+# Modules the cleaning depends on besides this script (part of the stage cache key)
+CLEANING_CODE: Tuple[str, ...] = (
+    "scripts.data_scrubber",
+    "scripts.data_streaming",
+    "scripts.dtype_schema",
+    "scripts.prepared_io",
+    "scripts.quantile_sketch",
+)
+MAX_SALE_AMOUNT: float = 10000  # Amounts over 10,000 are unrealistic
+IQR_MULTIPLIER: float = 1.5
 
-# 3. Remove outliers in SaleAmount using the interquartile range (IQR)
-q1 = sales['SaleAmount'].quantile(0.25)
-q3 = sales['SaleAmount'].quantile(0.75)
-iqr = q3 - q1
-lower_bound = q1 - 1.5 * iqr
-upper_bound = q3 + 1.5 * iqr
-sales = sales[(sales['SaleAmount'] >= lower_bound) & (sales['SaleAmount'] <= upper_bound)]
 
-# 4. Standardize PaymentType values (e.g., capitalize values)
-sales['PaymentType'] = sales['PaymentType'].str.capitalize()
+def clean_sales(sales: pd.DataFrame, median_sale_amount: float, quartiles: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """Apply the row-level cleaning steps to de-duplicated sales rows.
+
+    quartiles is the (Q1, Q3) pair of SaleAmount; when given, IQR outliers are removed.
+    """
+    # Handle missing values
+    sales = sales.assign(
+        SaleAmount=sales["SaleAmount"].fillna(median_sale_amount),
+        DiscountPercent=sales["DiscountPercent"].fillna(0),
+    )
+
+    # Remove outliers in SaleAmount
+    if quartiles is not None:
+        sales = DataScrubber(sales).filter_column_outliers_iqr("SaleAmount", *quartiles, multiplier=IQR_MULTIPLIER)
+    sales = sales[sales["SaleAmount"] <= MAX_SALE_AMOUNT]
+
+    # Standardize PaymentType values (e.g. cash -> Cash)
+    return sales.assign(PaymentType=sales["PaymentType"].str.capitalize())
+
+
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_sales_data(iqr_filter: bool = False) -> None:
+    """Clean the raw sales file in memory."""
+    sales = pd.read_csv(RAW_FILE)
+    logger.info(f"Initial number of sales: {len(sales)}")
+
+    # Remove duplicates
+    sales = sales.drop_duplicates()
+
+    median = sales["SaleAmount"].median()
+    quartiles = None
+    if iqr_filter:
+        filled = sales["SaleAmount"].fillna(median)
+        quartiles = (filled.quantile(0.25), filled.quantile(0.75))
+    sales = clean_sales(sales, median, quartiles)
+
+    logger.info(f"Prepared number of sales: {len(sales)}")
+
+    # Apply compact dtypes and save Parquet plus the CSV export and its schema
+    scrubber = DataScrubber(sales)
+    write_prepared(scrubber.optimize_dtypes(), PREPARED_FILE, scrubber.dtype_schema)
+    logger.info(f"Cleaned sales data has been saved to {PREPARED_FILE}")
 
-# Save cleaned data
-sales.to_csv('data/prepared/sales_data_prepared.csv', index=False)
-print("Prepared sales data saved.")
-import pandas as pd
 
-# Load raw sales data
-sales = pd.read_csv('data/raw/sales_data.csv')
+@cached_stage(inputs=[RAW_FILE], outputs=prepared_files(PREPARED_FILE), code=CLEANING_CODE)
+def prepare_sales_data_streaming(chunk_size: int = DEFAULT_CHUNK_SIZE, iqr_filter: bool = False,
+                                 epsilon: float = DEFAULT_EPSILON) -> None:
+    """Clean the raw sales file in two streaming passes with bounded memory.
 
-# Initial record count
-initial_count = len(sales)
-print(f"Initial number of sales: {initial_count}")
+    The first pass feeds de-duplicated SaleAmount values into a quantile sketch to
+    estimate the median fill value and the quartiles (within rank error epsilon).
+    The second pass cleans each chunk and writes it to the prepared file.
+    """
+    chunks = drop_duplicate_chunks(read_csv_in_chunks(RAW_FILE, chunk_size))
+    stats = DataScrubber.sketch_column_quantiles(chunks, "SaleAmount", epsilon, fill_missing_with_median=True)
+    logger.info(
+        f"SaleAmount estimates from {stats['count']} values: "
+        f"Q1={stats['q1']:.2f}, median={stats['median']:.2f}, Q3={stats['q3']:.2f}."
+    )
+    quartiles = (stats["q1"], stats["q3"]) if iqr_filter else None
 
-# 1. Remove duplicates
-sales.drop_duplicates(inplace=True)
+    stream_clean_csv(
+        RAW_FILE,
+        PREPARED_FILE,
+        lambda chunk: clean_sales(chunk, stats["median"], quartiles),
+        chunk_size,
+        optimize_dtypes=True,
+    )
+    export_parquet_from_csv(PREPARED_FILE)
 
-# 2. Handle missing values
-sales['DiscountPercent'].fillna(0, inplace=True)
 
-# 3. Remove outliers in SaleAmount (e.g., amounts over 10,000 might be unrealistic)
-sales = sales[sales['SaleAmount'] <= 10000]
+def main() -> None:
+    """Main function for preparing sales data."""
+    parser = argparse.ArgumentParser(description="Prepare raw sales data.")
+    parser.add_argument("--stream", action="store_true", help="Process the raw file in chunks.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in streaming mode.")
+    parser.add_argument("--iqr", action="store_true", help="Also remove SaleAmount outliers outside 1.5 x IQR.")
+    parser.add_argument("--epsilon", type=float, default=DEFAULT_EPSILON, help="Quantile rank error in streaming mode.")
+    args = parser.parse_args()
 
-# 4. Standardize PaymentType values
-sales['PaymentType'] = sales['PaymentType'].replace({
-    'cash': 'Cash', 'credit': 'Credit'
-})
+    logger.info("Starting sales data preparation...")
+    if args.stream:
+        prepare_sales_data_streaming(args.chunk_size, iqr_filter=args.iqr, epsilon=args.epsilon)
+    else:
+        prepare_sales_data(iqr_filter=args.iqr)
+    logger.info("Sales data preparation complete.")
 
-# Prepared record count
-prepared_count = len(sales)
-print(f"Prepared number of sales: {prepared_count}")
 
-# Save cleaned data
-sales.to_csv('data/prepared/sales_data_prepared.csv', index=False)
-print("Cleaned sales data has been saved to data/prepared/sales_data_prepared.csv")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Prepared Data Storage
+File: scripts/prepared_io.py
+
+Reads and writes the files in data/prepared. Each prepared table is stored as
+Parquet (columnar, with its dtypes preserved) next to the CSV export and its
+dtype schema, e.g.:
+
+    data/prepared/sales_data_prepared.parquet      <- read by the pipeline
+    data/prepared/sales_data_prepared.csv          <- export for people and tools
+    data/prepared/sales_data_prepared.schema.json
+
+Readers prefer the Parquet file, so downstream stages skip CSV parsing and can
+prune columns and skip row groups. When pyarrow is not installed, or a Parquet
+file has not been written yet, everything falls back to the CSV and its schema.
+"""
+
+import pathlib
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from scripts.dtype_schema import (
+    DtypeSchema,
+    load_dtype_schema,
+    read_csv_with_schema,
+    schema_path_for,
+    write_csv_with_schema,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV remains the fallback format
+    pa = None
+    pq = None
+
+# Constants
+PARQUET: str = "parquet"
+CSV: str = "csv"
+DEFAULT_FORMATS: Tuple[str, ...] = (PARQUET, CSV)
+DEFAULT_ROW_GROUP_SIZE: int = 1_000_000
+CSV_TO_PARQUET_CHUNK_SIZE: int = 500_000
+
+Filter = Tuple[str, str, Any]
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+def parquet_path_for(csv_path: pathlib.Path) -> pathlib.Path:
+    """Return the Parquet file that sits beside a prepared CSV file."""
+    return csv_path.with_suffix(".parquet")
+
+
+def prepared_files(csv_path: pathlib.Path) -> List[pathlib.Path]:
+    """Return every file written for a prepared table: the CSV export, its schema and (with pyarrow) the Parquet file."""
+    files = [csv_path, schema_path_for(csv_path)]
+    if parquet_available():
+        files.append(parquet_path_for(csv_path))
+    return files
+
+
+def _arrow_schema(schema: DtypeSchema, columns: Sequence[str]) -> "pa.Schema":
+    """Build a fixed Arrow schema from a dtype schema, so every chunk is written alike."""
+    dtypes, dates = schema.get("dtypes", {}), schema.get("dates", {})
+    fields = []
+    for column in columns:
+        dtype = dtypes.get(column)
+        if column in dates:
+            arrow_type = pa.timestamp("us")
+        elif dtype == "category":
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif dtype is not None:
+            arrow_type = pa.from_numpy_dtype(pd.api.types.pandas_dtype(dtype))
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def write_prepared(
+    df: pd.DataFrame,
+    csv_path: pathlib.Path,
+    schema: Optional[DtypeSchema] = None,
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> List[pathlib.Path]:
+    """Write a prepared table in the requested formats and return the paths written.
+
+    The CSV export always gets its dtype schema beside it.
+    """
+    formats = set(formats)
+    written = []
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    if PARQUET in formats and parquet_available():
+        parquet_path = parquet_path_for(csv_path)
+        df.to_parquet(parquet_path, index=False, row_group_size=row_group_size)
+        written.append(parquet_path)
+    if CSV in formats or not written:
+        write_csv_with_schema(df, csv_path, schema)
+        written.append(csv_path)
+    return written
+
+
+def export_parquet_from_csv(
+    csv_path: pathlib.Path,
+    chunk_size: int = CSV_TO_PARQUET_CHUNK_SIZE,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Optional[pathlib.Path]:
+    """Convert a prepared CSV (with its schema) to Parquet in chunks, with bounded memory.
+
+    Used after streaming preparation, where each chunk is appended to the CSV as it
+    is cleaned and the final dtypes are only known once the whole file is written.
+    """
+    if not parquet_available():
+        return None
+    schema = load_dtype_schema(csv_path) or {"dtypes": {}, "dates": {}}
+    parquet_path = parquet_path_for(csv_path)
+    tmp_path = parquet_path.with_name(parquet_path.name + ".tmp")
+    writer = None
+    try:
+        with pd.read_csv(csv_path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[""]) as reader:
+            for chunk in reader:
+                if writer is None:
+                    arrow_schema = _arrow_schema(schema, list(chunk.columns))
+                    writer = pq.ParquetWriter(tmp_path, arrow_schema)
+                typed = pd.DataFrame({
+                    column: _coerce(chunk[column], arrow_schema.field(column).type, schema)
+                    for column in chunk.columns
+                })
+                table = pa.Table.from_pandas(typed, schema=arrow_schema, preserve_index=False)
+                writer.write_table(table, row_group_size=row_group_size)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if writer is None:
+        return None
+    writer.close()
+    tmp_path.replace(parquet_path)
+    return parquet_path
+
+
+def _coerce(values: pd.Series, arrow_type: "pa.DataType", schema: DtypeSchema) -> pd.Series:
+    if pa.types.is_timestamp(arrow_type):
+        return pd.to_datetime(values, format=schema["dates"][values.name]).astype("datetime64[us]")
+    if pa.types.is_dictionary(arrow_type):
+        return values.astype("category")
+    if pa.types.is_string(arrow_type):
+        return values
+    return values.astype(arrow_type.to_pandas_dtype())
+
+
+def _apply_filters(df: pd.DataFrame, filters: Sequence[Filter]) -> pd.DataFrame:
+    operators = {
+        "==": lambda s, v: s == v, "=": lambda s, v: s == v, "!=": lambda s, v: s != v,
+        "<": lambda s, v: s < v, "<=": lambda s, v: s <= v, ">": lambda s, v: s > v,
+        ">=": lambda s, v: s >= v, "in": lambda s, v: s.isin(v), "not in": lambda s, v: ~s.isin(v),
+    }
+    for column, op, value in filters:
+        df = df[operators[op](df[column], value)]
+    return df
+
+
+def read_prepared(
+    csv_path: pathlib.Path,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Sequence[Filter]] = None,
+    fmt: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read a prepared table, preferring Parquet over CSV.
+
+    Args:
+        csv_path (Path): Path of the prepared CSV; the Parquet file beside it is used if present.
+        columns (Sequence[str]): Only read these columns.
+        filters (Sequence[tuple]): Row filters like [("StoreID", "==", 404)], ANDed together.
+            Parquet uses them to skip whole row groups.
+        fmt (str): Force "parquet" or "csv" instead of choosing automatically.
+    """
+    parquet_path = parquet_path_for(csv_path)
+    use_parquet = fmt == PARQUET or (fmt is None and parquet_available() and parquet_path.exists())
+    if use_parquet:
+        df = pd.read_parquet(parquet_path, columns=list(columns) if columns else None, filters=list(filters) if filters else None)
+        return df.reset_index(drop=True)
+    # The filter columns are read too, so rows can be filtered before projecting to columns
+    usecols = None
+    if columns:
+        usecols = list(columns) + [column for column, _, _ in filters or () if column not in columns]
+    df = read_csv_with_schema(csv_path, usecols=usecols)
+    if filters:
+        df = _apply_filters(df, filters).reset_index(drop=True)
+    return df[list(columns)] if columns else df
@@ -0,0 +1,128 @@
+"""
+Streaming Quantile Sketch
+File: scripts/quantile_sketch.py
+
+A KLL quantile sketch (Karnin, Lang and Liberty, 2016). It estimates quantiles of
+a numeric stream in a single pass using memory that depends only on the error
+bound, never on the number of values seen. Sketches built over separate chunks or
+files can be merged.
+"""
+
+import math
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Constants
+DEFAULT_EPSILON: float = 0.01  # Normalized rank error, i.e. within 1% of the true quantile's rank
+COMPACTOR_DECAY: float = 2 / 3
+MIN_COMPACTOR_CAPACITY: int = 2
+
+
+def k_for_epsilon(epsilon: float) -> int:
+    """Return the KLL size parameter k that gives roughly the requested rank error."""
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be between 0 and 1.")
+    # Empirical fit for the single-quantile rank error of KLL sketches: eps ~ 2.296 / k^0.9723
+    return max(8, int(math.ceil((2.296 / epsilon) ** (1 / 0.9723))))
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream of floats with bounded memory.
+
+    Values are held in a stack of compactors; an item at level h stands for 2**h
+    original values. When a level outgrows its capacity it is sorted and every
+    other item is promoted to the next level. At most about 3 * k items are kept.
+    """
+
+    def __init__(self, epsilon: float = DEFAULT_EPSILON, seed: Optional[int] = None):
+        self.epsilon = epsilon
+        self.k = k_for_epsilon(epsilon)
+        self.count = 0
+        self._levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(MIN_COMPACTOR_CAPACITY, int(math.ceil(self.k * COMPACTOR_DECAY ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                kept = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:-1] if items.size % 2 else items
+                promoted = paired[self._rng.integers(2)::2]
+                self._levels[level] = kept
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+
+    def update(self, value: float, weight: int = 1) -> None:
+        """Add a value, optionally repeated weight times."""
+        if weight <= 0 or math.isnan(value):
+            return
+        self.count += weight
+        # A weight of w is inserted as one item at every level h where bit h of w is set
+        level = 0
+        while weight:
+            if weight & 1:
+                while level >= len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                self._levels[level] = np.append(self._levels[level], value)
+            weight >>= 1
+            level += 1
+        self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Add a batch of values. NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self.count += values.size
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Fold another sketch into this one."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _weighted_items(self):
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(items.size, 2 ** level, dtype=np.int64) for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        """Return the estimated values at each quantile q in [0, 1]."""
+        qs = np.asarray(list(qs), dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.size, np.nan)
+        values, cumulative = self._weighted_items()
+        targets = qs * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        return values[np.minimum(positions, values.size - 1)]
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated value at quantile q in [0, 1]."""
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value: float) -> float:
+        """Return the estimated fraction of values less than or equal to value."""
+        if self.count == 0:
+            return math.nan
+        values, cumulative = self._weighted_items()
+        position = np.searchsorted(values, value, side="right")
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
@@ -0,0 +1,213 @@
+"""
+Warehouse Query Cache
+File: scripts/query_cache.py
+
+Caches the results of read-only SQL against the data warehouse, so repeated
+analyses and dashboard refreshes do not re-run the same query until new data
+is loaded. Results are keyed by:
+
+    normalized SQL (whitespace outside string literals collapsed, trailing ';' dropped)
+    + query parameters
+    + the warehouse data version and identity (dw_metadata, bumped by every ETL load)
+
+so a load invalidates every cached result without tracking which tables a query
+reads. The random identity stored with each version keeps a recreated database,
+whose version restarts at 1, from matching results of the one it replaced. The
+database file is part of the key too; in-memory databases are not cached.
+Results are kept in two tiers:
+
+- memory: the most recently used DataFrames (LRU, bounded by entry count)
+- disk: one Parquet file per result in data/cache/queries, bounded by total size;
+  the least recently used files are evicted first, and files from other data
+  versions are removed as soon as a new version is seen
+
+Without pyarrow only the memory tier is used. Callers get a copy of the cached
+DataFrame, so changing it does not change the cache.
+
+Example:
+    cube = cached_read_sql(OLAP_CUBE_QUERY, conn)
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+import pandas as pd
+
+from scripts.dw_loader import read_data_stamp
+from scripts.prepared_io import parquet_available
+from utils.logger import logger
+
+# Constants
+CACHE_DIR: pathlib.Path = pathlib.Path("data").joinpath("cache", "queries")
+DEFAULT_MEMORY_ENTRIES: int = 32
+DEFAULT_DISK_BYTES: int = 512 * 1024 * 1024  # 512 MiB
+
+# A single-quoted SQL string literal, with '' as an escaped quote
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop the trailing semicolon."""
+    parts = _STRING_LITERAL.split(sql)
+    # Odd positions are string literals and are kept as written
+    normalized = "".join(part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts))
+    return normalized.strip().rstrip(";").strip()
+
+
+def database_file(conn: sqlite3.Connection) -> str:
+    """Return the file of the connection's main database ('' for an in-memory database)."""
+    for _, name, file in conn.execute("PRAGMA database_list;"):
+        if name == "main":
+            return file or ""
+    return ""
+
+
+def cache_key(sql: str, params: Optional[Sequence[Any]], version: str, database: str = "") -> str:
+    """Return the cache key of a query: a hash of the normalized SQL, parameters, data stamp and database."""
+    payload = json.dumps([normalize_sql(sql), list(params or ()), version, database], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """Two-tier (memory LRU + Parquet on disk) cache of query results."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[pathlib.Path] = CACHE_DIR,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_bytes: int = DEFAULT_DISK_BYTES,
+    ):
+        """
+        Args:
+            cache_dir (Path): Directory for the Parquet tier; None keeps results in memory only.
+            max_memory_entries (int): Results kept in memory.
+            max_disk_bytes (int): Total size of the Parquet files kept on disk.
+        """
+        self.cache_dir = cache_dir if cache_dir is not None and parquet_available() else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+
+    def read_sql(self, sql: str, conn: sqlite3.Connection, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+        """Return the result of a read-only query, from the cache when the data has not changed."""
+        database = database_file(conn)
+        if not database:
+            return pd.read_sql_query(sql, conn, params=params)
+        version = read_data_stamp(conn)
+        if version != self._version:
+            self._drop_stale(version)
+        key = cache_key(sql, params, version, database)
+
+        result = self._get_memory(key)
+        if result is None:
+            result = self._get_disk(key, version)
+        if result is not None:
+            self.hits += 1
+            return result.copy()
+
+        self.misses += 1
+        result = pd.read_sql_query(sql, conn, params=params)
+        self._put_memory(key, result)
+        self._put_disk(key, version, result)
+        return result.copy()
+
+    def clear(self) -> None:
+        """Remove every cached result from both tiers."""
+        self.memory.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.parquet"):
+                path.unlink(missing_ok=True)
+
+    def _get_memory(self, key: str) -> Optional[pd.DataFrame]:
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+        return result
+
+    def _put_memory(self, key: str, result: pd.DataFrame) -> None:
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _disk_path(self, key: str, version: str) -> pathlib.Path:
+        return self.cache_dir.joinpath(f"v{version}-{key}.parquet")
+
+    def _get_disk(self, key: str, version: str) -> Optional[pd.DataFrame]:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key, version)
+        try:
+            result = pd.read_parquet(path)
+        except (FileNotFoundError, OSError):
+            return None
+        os.utime(path)  # the modification time records the last use, for LRU eviction
+        self._put_memory(key, result)
+        return result
+
+    def _put_disk(self, key: str, version: str, result: pd.DataFrame) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._disk_path(key, version)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            result.to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+            self._evict_disk()
+        except Exception as e:
+            # The disk tier is an optimization; a result that cannot be written stays in memory
+            logger.warning(f"Could not write query result to the disk cache: {e}")
+
+    def _evict_disk(self) -> None:
+        """Remove the least recently used files until the disk tier fits its size bound."""
+        files = [(path.stat().st_mtime, path.stat().st_size, path) for path in self.cache_dir.glob("*.parquet")]
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _drop_stale(self, version: str) -> None:
+        """Forget results cached for other data versions (the cache directory serves one warehouse)."""
+        self.memory.clear()
+        self._version = version
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return
+        current = f"v{version}-"
+        for path in self.cache_dir.glob("v*.parquet"):
+            if not path.name.startswith(current):
+                path.unlink(missing_ok=True)
+
+
+_default_cache: Optional[QueryCache] = None
+
+
+def default_cache() -> QueryCache:
+    """Return the process-wide query cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = QueryCache()
+    return _default_cache
+
+
+def cached_read_sql(sql: str, conn: sqlite3.Connection, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+    """pd.read_sql_query through the process-wide query cache."""
+    started = time.perf_counter()
+    cache = default_cache()
+    hits = cache.hits
+    result = cache.read_sql(sql, conn, params)
+    source = "cache" if cache.hits > hits else "warehouse"
+    logger.info(f"Query result ({len(result)} rows) read from {source} in {time.perf_counter() - started:.3f}s.")
+    return result
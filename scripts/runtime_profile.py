@@ -0,0 +1,191 @@
+"""
+Runtime Profile
+File: scripts/runtime_profile.py
+
+Chooses how step0_pipeline runs from the size of its input and the machine it
+runs on:
+
+- pandas: the data fits in memory on this node, so the pandas engine
+  (scripts/pandas_engine.py) does the work without starting a JVM.
+- spark: a local-mode SparkSession sized for the input. It sets the shuffle
+  partitions (about 128 MiB each instead of a fixed 200), turns on adaptive
+  execution so tiny stages coalesce further, uses Arrow for pandas conversions
+  and sets the driver memory. The Spark UI is not started, to save startup time.
+
+Set SMART_STORE_ENGINE=pandas or SMART_STORE_ENGINE=spark to override the choice.
+step0_pipeline asks backends.choose_backend, which builds on this choice and runs
+the pandas engine's transforms on Polars for larger inputs when it is installed.
+"""
+
+import functools
+import inspect
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterable, Optional
+
+from scripts.prepared_io import parquet_path_for
+
+# Constants
+PANDAS: str = "pandas"
+SPARK: str = "spark"
+ENGINE_ENV: str = "SMART_STORE_ENGINE"
+
+# A table in pandas takes several times the size of its file, and the data fits
+# on one node when that is at most PANDAS_MEMORY_SHARE of physical memory
+PANDAS_MEMORY_FACTOR: int = 10
+PANDAS_MEMORY_SHARE: float = 0.5
+TARGET_PARTITION_BYTES: int = 128 * 1024 * 1024
+MIN_DRIVER_MEMORY_BYTES: int = 1024 * 1024 * 1024
+DRIVER_MEMORY_SHARE: float = 0.75
+DEFAULT_MEMORY_BYTES: int = 4 * 1024 * 1024 * 1024
+
+# Functions each engine provides under the same names and signatures
+ENGINE_FUNCTIONS = (
+    "PRODUCTS_SCHEMA", "SALES_SCHEMA", "read_csv", "read_prepared",
+    "persist_sales_with_date_parts", "join_dimension", "check_exchanges", "calculate_sales_count",
+    "cube_sales_by_date", "cube_sales_by_date_and_store", "cube_sales_grouping_sets",
+    "save_to_csv_and_parquet", "save_grouping_sets",
+)
+
+
+@dataclass(frozen=True)
+class RuntimeProfile:
+    engine: str
+    input_bytes: int
+    cores: int
+    memory_bytes: int
+    shuffle_partitions: int
+    adaptive: bool
+    arrow: bool
+    driver_memory: str
+
+
+def total_memory_bytes() -> int:
+    """Physical memory of this machine, or DEFAULT_MEMORY_BYTES where it cannot be read."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return DEFAULT_MEMORY_BYTES
+
+
+def prepared_input_bytes(csv_paths: Iterable[Path]) -> int:
+    """Total size of the prepared tables as they will be read (Parquet when it exists, else CSV)."""
+    total = 0
+    for csv_path in csv_paths:
+        parquet_path = parquet_path_for(csv_path)
+        path = parquet_path if parquet_path.exists() else csv_path
+        if path.exists():
+            total += path.stat().st_size
+    return total
+
+
+def spark_available() -> bool:
+    try:
+        import pyspark  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _memory_string(n_bytes: int) -> str:
+    """Format a byte count as a JVM memory setting, e.g. 1536m."""
+    return f"{max(1, n_bytes // (1024 * 1024))}m"
+
+
+def choose_profile(
+    input_bytes: int,
+    cores: Optional[int] = None,
+    memory_bytes: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> RuntimeProfile:
+    """
+    Choose the engine and Spark settings for an input of input_bytes.
+
+    Args:
+        input_bytes (int): Size of the input files.
+        cores (int): Cores to use; defaults to all of this machine's.
+        memory_bytes (int): Memory to plan for; defaults to this machine's.
+        engine (str): "pandas" or "spark" to skip the automatic choice; defaults
+            to the SMART_STORE_ENGINE environment variable.
+
+    Returns:
+        RuntimeProfile: The chosen settings.
+    """
+    cores = cores or os.cpu_count() or 1
+    memory_bytes = memory_bytes or total_memory_bytes()
+    engine = engine or os.environ.get(ENGINE_ENV) or None
+    if engine not in (None, PANDAS, SPARK):
+        raise ValueError(f"Unknown engine {engine!r}; expected {PANDAS!r} or {SPARK!r}.")
+
+    in_memory_bytes = input_bytes * PANDAS_MEMORY_FACTOR
+    if engine is None:
+        fits = in_memory_bytes <= memory_bytes * PANDAS_MEMORY_SHARE
+        engine = PANDAS if fits or not spark_available() else SPARK
+
+    # Enough partitions to keep every core busy, and enough that none is much over TARGET_PARTITION_BYTES
+    shuffle_partitions = max(cores, math.ceil(input_bytes / TARGET_PARTITION_BYTES))
+    driver_memory = min(max(in_memory_bytes, MIN_DRIVER_MEMORY_BYTES), int(memory_bytes * DRIVER_MEMORY_SHARE))
+    return RuntimeProfile(
+        engine=engine,
+        input_bytes=input_bytes,
+        cores=cores,
+        memory_bytes=memory_bytes,
+        shuffle_partitions=shuffle_partitions,
+        adaptive=True,
+        arrow=arrow_available(),
+        driver_memory=_memory_string(driver_memory),
+    )
+
+
+def build_spark_session(profile: RuntimeProfile, app_name: str) -> Any:
+    """Start (or get) a local-mode SparkSession configured by profile."""
+    from pyspark.sql import SparkSession
+
+    adaptive = str(profile.adaptive).lower()
+    arrow = str(profile.arrow).lower()
+    return (
+        SparkSession.builder.appName(app_name)
+        .master(f"local[{profile.cores}]")
+        .config("spark.driver.memory", profile.driver_memory)
+        .config("spark.sql.shuffle.partitions", str(profile.shuffle_partitions))
+        .config("spark.sql.adaptive.enabled", adaptive)
+        .config("spark.sql.adaptive.coalescePartitions.enabled", adaptive)
+        .config("spark.sql.execution.arrow.pyspark.enabled", arrow)
+        .config("spark.sql.execution.arrow.pyspark.fallback.enabled", "true")
+        .config("spark.ui.enabled", "false")
+        .config("spark.ui.showConsoleProgress", "false")
+        .getOrCreate()
+    )
+
+
+def load_engine(engine: str, backend: Optional[str] = None) -> Any:
+    """Return the ENGINE_FUNCTIONS of an engine, as attributes of one object.
+
+    For the pandas engine, backend (a scripts/backends.py name, e.g. "polars") is
+    passed to every function that takes one, so its transforms run on that backend.
+    """
+    if engine == PANDAS:
+        from scripts import pandas_engine
+        modules = [pandas_engine]
+    else:
+        from scripts import step1_extract, step2_transform, step3_load
+        modules = [step1_extract, step2_transform, step3_load]
+    functions = {}
+    for name in ENGINE_FUNCTIONS:
+        function = next(getattr(module, name) for module in modules if hasattr(module, name))
+        if engine == PANDAS and backend is not None and callable(function) \
+                and "backend" in inspect.signature(function).parameters:
+            function = functools.partial(function, backend=backend)
+        functions[name] = function
+    return SimpleNamespace(**functions)
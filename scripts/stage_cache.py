@@ -0,0 +1,469 @@
+"""
+Pipeline Stage Cache
+File: scripts/stage_cache.py
+
+Build-system style memoization of pipeline functions, so a step whose inputs,
+parameters and code have not changed is not run again. Decorate a function with
+the files it reads and writes:
+
+    @cached_stage(inputs=lambda: [RAW_FILE], outputs=lambda: prepared_files(PREPARED_FILE),
+                  code=("scripts.data_scrubber",))
+    def prepare_sales_data(iqr_filter: bool = False) -> None:
+        ...
+
+A call is keyed by the SHA-256 of:
+
+    the function's name and the source of its module (plus the modules in `code`)
+    + its arguments, bound to the signature with defaults applied (DataFrames by content)
+    + the content hashes of its input files (a missing file hashes as 'missing')
+
+After a successful call, each output file is stored in data/cache/stages/objects
+under the hash of its content, and entries/<key>.json maps the output paths to
+those objects (along with the pickled return value). A later call with the same
+key does not run the function: outputs whose content differs from the cached
+one are copied back from the object store, and the cached value is returned.
+Output directories are stored file by file.
+
+Outputs too large to keep a second copy of (the SQLite warehouse) can be left
+out of the store with store_outputs=False. The entry then records each output's
+(inode, size, modification time) instead, and a later call is skipped only
+while the outputs are still exactly as that call left them; nothing is ever
+copied back over them.
+
+File hashes are remembered by (size, modification time), so checking an
+unchanged stage reads no file contents, and a no-op rerun of the whole
+pipeline costs a few stat() calls per file.
+
+A call is cached only if every output was written by it; a function that logs
+an error and returns without writing its outputs is run again next time. The
+store is bounded by total size: the least recently used entries are evicted
+first, then objects no entry refers to are removed. Set SMART_STORE_STAGE_CACHE=0
+to run every stage regardless.
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pathlib
+import pickle
+import shutil
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from utils.logger import logger
+
+# Constants
+CACHE_DIR: pathlib.Path = pathlib.Path("data").joinpath("cache", "stages")
+DEFAULT_MAX_BYTES: int = 4 * 1024 * 1024 * 1024  # 4 GiB
+HASH_BLOCK_SIZE: int = 1 << 20
+CACHE_FORMAT_VERSION: int = 1  # part of every key; bump when the key or entry layout changes
+DISABLE_ENV: str = "SMART_STORE_STAGE_CACHE"
+HASH_MEMO_FILE: str = "file_hashes.json"
+MISSING: str = "missing"
+
+PathLike = Union[str, pathlib.Path]
+PathSpec = Union[Sequence[PathLike], Callable[..., Iterable[PathLike]]]
+
+# Content hash of each file under an output path, by path relative to it ("" for a plain file)
+Tree = Dict[str, str]
+
+
+def cache_enabled() -> bool:
+    """Return False if stage caching is switched off with SMART_STORE_STAGE_CACHE=0."""
+    return os.environ.get(DISABLE_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _argument_digest(value: Any) -> Any:
+    """JSON stand-in for an argument that json cannot encode: DataFrames by content, paths by name."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.sha256(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            digest.update(json.dumps([list(map(str, value.columns)), list(map(str, value.dtypes))]).encode("utf-8"))
+        return {"pandas": digest.hexdigest()}
+    if isinstance(value, pathlib.PurePath):
+        return str(value)
+    return repr(value)
+
+
+def _resolve_paths(spec: Optional[PathSpec], arguments: Dict[str, Any]) -> List[pathlib.Path]:
+    if spec is None:
+        return []
+    paths = spec(**arguments) if callable(spec) else spec
+    return [pathlib.Path(path) for path in paths]
+
+
+def _module_file(module_name: str) -> Optional[pathlib.Path]:
+    module = sys.modules.get(module_name) or importlib.import_module(module_name)
+    file = getattr(module, "__file__", None)
+    return pathlib.Path(file) if file else None
+
+
+class StageCache:
+    """Content-addressed store of stage outputs, keyed by a hash of everything a stage depends on."""
+
+    def __init__(self, cache_dir: pathlib.Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (Path): Directory of the object store, the entries and the file hash memo.
+            max_bytes (int): Total size of the stored objects.
+        """
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.objects_dir = self.cache_dir.joinpath("objects")
+        self.entries_dir = self.cache_dir.joinpath("entries")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memo: Optional[Dict[str, list]] = None
+        self._memo_changed = False
+
+    # File hashing
+
+    def _load_memo(self) -> Dict[str, list]:
+        if self._memo is None:
+            try:
+                self._memo = json.loads(self.cache_dir.joinpath(HASH_MEMO_FILE).read_text())
+            except (FileNotFoundError, ValueError):
+                self._memo = {}
+        return self._memo
+
+    def _save_memo(self) -> None:
+        if not self._memo_changed:
+            return
+        memo = self._load_memo()
+        # Forget files that no longer exist, so the memo does not grow without bound
+        for name in [name for name in memo if not os.path.exists(name)]:
+            del memo[name]
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir.joinpath(HASH_MEMO_FILE)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(memo))
+        os.replace(temp_path, path)
+        self._memo_changed = False
+
+    def file_hash(self, path: pathlib.Path) -> str:
+        """Return the SHA-256 of a file's content, or 'missing'; reuses the last hash if size and mtime are unchanged."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return MISSING
+        name = str(pathlib.Path(path).resolve())
+        memo = self._load_memo()
+        known = memo.get(name)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        memo[name] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        self._memo_changed = True
+        return digest.hexdigest()
+
+    def _remember_hash(self, path: pathlib.Path, content_hash: str) -> None:
+        stat = os.stat(path)
+        self._load_memo()[str(path.resolve())] = [stat.st_size, stat.st_mtime_ns, content_hash]
+        self._memo_changed = True
+
+    def tree_hashes(self, path: pathlib.Path) -> Tree:
+        """Content hashes of a file ({"": hash}) or of every file under a directory; {} if missing."""
+        if path.is_file():
+            return {"": self.file_hash(path)}
+        if path.is_dir():
+            return {
+                file.relative_to(path).as_posix(): self.file_hash(file)
+                for file in sorted(path.rglob("*")) if file.is_file()
+            }
+        return {}
+
+    @staticmethod
+    def _tree_stats(path: pathlib.Path) -> List[Tuple[str, int, int, int]]:
+        """(name, inode, size, mtime) of every file under a path, to tell whether a call rewrote it."""
+        files = [path] if path.is_file() else sorted(path.rglob("*")) if path.is_dir() else []
+        stats = []
+        for file in files:
+            if file.is_file():
+                stat = file.stat()
+                stats.append((str(file), stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return stats
+
+    # Keys
+
+    def key(
+        self,
+        func: Callable,
+        arguments: Dict[str, Any],
+        inputs: Sequence[pathlib.Path],
+        code: Sequence[str] = (),
+    ) -> str:
+        """Return the cache key of a call: a hash of the code, the arguments and the input contents."""
+        code_files = [pathlib.Path(inspect.getfile(func))] + [_module_file(name) for name in code]
+        payload = json.dumps(
+            {
+                "format": CACHE_FORMAT_VERSION,
+                "function": f"{func.__module__}.{func.__qualname__}",
+                "code": [self.file_hash(file) if file else MISSING for file in code_files],
+                "arguments": arguments,
+                "inputs": {str(path): self.tree_hashes(path) or MISSING for path in inputs},
+            },
+            sort_keys=True,
+            default=_argument_digest,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Object store
+
+    def _object_path(self, content_hash: str) -> pathlib.Path:
+        return self.objects_dir.joinpath(content_hash[:2], content_hash)
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.entries_dir.joinpath(f"{key}.json")
+
+    def _put_file(self, source: pathlib.Path, content_hash: str) -> None:
+        target = self._object_path(content_hash)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+
+    def _put_bytes(self, data: bytes) -> str:
+        content_hash = hashlib.sha256(data).hexdigest()
+        target = self._object_path(content_hash)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, target)
+        return content_hash
+
+    def _restore_file(self, content_hash: str, target: pathlib.Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(self._object_path(content_hash), temp_path)
+        os.replace(temp_path, target)
+        self._remember_hash(target, content_hash)
+
+    # Lookup and store
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """Return the entry of a key if it and every object it refers to are still stored."""
+        try:
+            entry = json.loads(self._entry_path(key).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        hashes = [h for tree in entry["outputs"].values() for h in tree.values()]
+        if entry.get("value"):
+            hashes.append(entry["value"])
+        if not all(self._object_path(h).exists() for h in hashes):
+            return None
+        return entry
+
+    def restore(self, entry: dict) -> int:
+        """Bring the outputs of an entry back to their cached content; return the number of files copied."""
+        restored = 0
+        for name, tree in entry["outputs"].items():
+            path = pathlib.Path(name)
+            current = self.tree_hashes(path)
+            if current == tree:
+                continue
+            if "" in tree:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                self._restore_file(tree[""], path)
+                restored += 1
+                continue
+            if path.is_file():
+                path.unlink()
+            for relative in set(current) - set(tree):
+                path.joinpath(relative).unlink()
+            for relative, content_hash in tree.items():
+                if current.get(relative) != content_hash:
+                    self._restore_file(content_hash, path.joinpath(relative))
+                    restored += 1
+        return restored
+
+    def _signatures(self, outputs: Sequence[pathlib.Path]) -> Dict[str, list]:
+        return {str(path): [list(stat) for stat in self._tree_stats(path)] for path in outputs}
+
+    def store(
+        self,
+        key: str,
+        function: str,
+        outputs: Sequence[pathlib.Path],
+        value: Any,
+        store_outputs: bool = True,
+    ) -> None:
+        """Record the outputs and return value of a call under its key, then evict down to the size bound.
+
+        With store_outputs=False the outputs are not copied; only their file signatures are recorded.
+        """
+        trees = {str(path): self.tree_hashes(path) for path in outputs} if store_outputs else {}
+        for path, tree in trees.items():
+            for relative, content_hash in tree.items():
+                self._put_file(pathlib.Path(path).joinpath(relative) if relative else pathlib.Path(path), content_hash)
+        value_hash = self._put_bytes(pickle.dumps(value)) if value is not None else None
+        entry = {"function": function, "created": time.time(), "outputs": trees, "value": value_hash}
+        if not store_outputs:
+            entry["signatures"] = self._signatures(outputs)
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        path = self._entry_path(key)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(entry, indent=2))
+        os.replace(temp_path, path)
+        self.evict(keep=key)
+
+    def load_value(self, entry: dict) -> Any:
+        if not entry.get("value"):
+            return None
+        return pickle.loads(self._object_path(entry["value"]).read_bytes())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove the least recently used entries until the objects fit max_bytes, then unreferenced objects."""
+        if not self.entries_dir.exists():
+            return
+        entries = []
+        for path in self.entries_dir.glob("*.json"):
+            try:
+                entry = json.loads(path.read_text())
+            except (FileNotFoundError, ValueError):
+                path.unlink(missing_ok=True)
+                continue
+            hashes = {h for tree in entry["outputs"].values() for h in tree.values()}
+            if entry.get("value"):
+                hashes.add(entry["value"])
+            entries.append((path.stat().st_mtime, path, hashes))
+
+        sizes = {}
+        for _, _, hashes in entries:
+            for content_hash in hashes:
+                if content_hash not in sizes:
+                    object_path = self._object_path(content_hash)
+                    sizes[content_hash] = object_path.stat().st_size if object_path.exists() else 0
+        live = {content_hash for _, _, hashes in entries for content_hash in hashes}
+        total = sum(sizes[content_hash] for content_hash in live)
+        for _, path, hashes in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if path.stem == keep:
+                continue
+            path.unlink(missing_ok=True)
+            entries = [item for item in entries if item[1] != path]
+            still_live = {content_hash for _, _, others in entries for content_hash in others}
+            total -= sum(sizes[content_hash] for content_hash in live - still_live)
+            live = still_live
+
+        if self.objects_dir.exists():
+            for object_path in self.objects_dir.glob("*/*"):
+                if object_path.name not in live:
+                    object_path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every entry and object."""
+        shutil.rmtree(self.entries_dir, ignore_errors=True)
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+
+    # Calls
+
+    def call(
+        self,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+        inputs: Optional[PathSpec] = None,
+        outputs: Optional[PathSpec] = None,
+        code: Sequence[str] = (),
+        store_outputs: bool = True,
+    ) -> Any:
+        """Return func(*args, **kwargs), restoring its outputs from the cache instead when nothing changed."""
+        started = time.perf_counter()
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        output_paths = _resolve_paths(outputs, arguments)
+        key = self.key(func, arguments, _resolve_paths(inputs, arguments), code)
+
+        entry = self.lookup(key)
+        if entry is not None and "signatures" in entry and entry["signatures"] != self._signatures(output_paths):
+            entry = None  # outputs kept out of the store have changed since; only running again restores them
+        if entry is not None:
+            restored = self.restore(entry)
+            os.utime(self._entry_path(key))  # the modification time records the last use, for LRU eviction
+            self._save_memo()
+            self.hits += 1
+            logger.info(
+                f"{func.__name__} is up to date ({restored} output files restored) - "
+                f"skipped in {time.perf_counter() - started:.3f}s."
+            )
+            return self.load_value(entry)
+
+        self.misses += 1
+        before = {path: self._tree_stats(path) for path in output_paths}
+        value = func(*args, **kwargs)
+        unwritten = [str(path) for path in output_paths if not path.exists() or self._tree_stats(path) == before[path]]
+        if unwritten:
+            logger.warning(f"{func.__name__} did not write {unwritten}; its result is not cached.")
+            return value
+        try:
+            self.store(key, f"{func.__module__}.{func.__qualname__}", output_paths, value, store_outputs)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # The cache is an optimization; a result that cannot be stored is simply recomputed next time
+            logger.warning(f"Could not cache the result of {func.__name__}: {e}")
+        self._save_memo()
+        return value
+
+
+_default_cache: Optional[StageCache] = None
+
+
+def default_stage_cache() -> StageCache:
+    """Return the process-wide stage cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = StageCache()
+    return _default_cache
+
+
+def cached_stage(
+    inputs: Optional[PathSpec] = None,
+    outputs: Optional[PathSpec] = None,
+    code: Sequence[str] = (),
+    bypass: Optional[Callable[..., bool]] = None,
+    cache: Optional[StageCache] = None,
+    store_outputs: bool = True,
+) -> Callable[[Callable], Callable]:
+    """Memoize a pipeline function on the contents of its input files, its arguments and its code.
+
+    Args:
+        inputs: Files or directories the function reads, or a callable taking the
+            function's arguments (by name, defaults applied) and returning them.
+        outputs: Files or directories the function writes, in the same forms.
+        code: Modules (by import name) the function's behavior depends on, besides its own.
+        bypass: Called with the function's arguments; True runs the function uncached
+            (e.g. for incremental loads, whose result depends on the previous state).
+        cache: The StageCache to use; defaults to the process-wide one.
+        store_outputs: False keeps the outputs out of the object store; the call is
+            then skipped only while its outputs are untouched, and never restored.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache_enabled():
+                return func(*args, **kwargs)
+            if bypass is not None:
+                bound = inspect.signature(func).bind(*args, **kwargs)
+                bound.apply_defaults()
+                if bypass(**bound.arguments):
+                    return func(*args, **kwargs)
+            return (cache or default_stage_cache()).call(func, args, kwargs, inputs, outputs, code, store_outputs)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
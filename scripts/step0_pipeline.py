@@ -2,20 +2,26 @@
 import sys
 from pathlib import Path
 
-# External imports
-from pyspark.sql import SparkSession
-
 # For local imports, temporarily add project root to Python sys.path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 # Local module imports - REMEMBER TO IMPORT YOUR NEW FUNCTIONS HERE
+# (steps 1-3 come from the backend chosen by backends.choose_backend: Spark, or
+# the pandas engine with pandas or Polars transforms)
 from utils.logger import logger  # noqa: E402
-from scripts.step1_extract import read_csv                  # noqa: E402
-from scripts.step2_transform import calculate_sales_count, cube_sales_by_date_and_store   # noqa: E402
-from scripts.step3_load import save_to_csv_and_parquet      # noqa: E402
-from scripts.step4_visualize import visualize_sales_count, visualize_cubed_sales_stacked   # noqa: E402  
+from scripts.backends import choose_backend  # noqa: E402
+from scripts.grouping_sets import SALES_CUBE_VIEWS  # noqa: E402
+from scripts.runtime_profile import (  # noqa: E402
+    PANDAS,
+    SPARK,
+    build_spark_session,
+    choose_profile,
+    load_engine,
+    prepared_input_bytes,
+)
+from scripts.step4_visualize import visualize_sales_count, visualize_cubed_sales_stacked   # noqa: E402
 
 def main():
     """
@@ -23,48 +29,57 @@ def main():
     """
     logger.info("Starting Spark Sales Analysis Pipeline")
 
-    # Initialize SparkSession
-    spark = SparkSession.builder.appName("Spark Sales Analysis").getOrCreate()
-    
-    try:
-        # File Paths
-        data_dir = PROJECT_ROOT.joinpath("data")
-        products_file = data_dir.joinpath("prepared", "products_data_prepared.csv")
-        sales_file = data_dir.joinpath("prepared", "sales_data_prepared.csv")
-        output_dir = data_dir.joinpath("output")
+    # File Paths
+    data_dir = PROJECT_ROOT.joinpath("data")
+    products_file = data_dir.joinpath("prepared", "products_data_prepared.csv")
+    sales_file = data_dir.joinpath("prepared", "sales_data_prepared.csv")
+    output_dir = data_dir.joinpath("output")
 
+    # Choose the backend and, for Spark, a SparkSession sized for the input
+    input_bytes = prepared_input_bytes([products_file, sales_file])
+    backend = choose_backend(input_bytes)
+    profile = choose_profile(input_bytes, engine=SPARK if backend == SPARK else PANDAS)
+    logger.info(f"Backend: {backend}; runtime profile: {profile}")
+    engine = load_engine(profile.engine, backend)
+    spark = build_spark_session(profile, "Spark Sales Analysis") if profile.engine == SPARK else None
+
+    try:
         # Step 1: Extract
         logger.info("Step 1: Extract - Reading data files")
-        products_df = read_csv(spark, products_file)
-        sales_df = read_csv(spark, sales_file)
+        products_df = engine.read_prepared(spark, products_file, engine.PRODUCTS_SCHEMA)
+        sales_df = engine.read_prepared(spark, sales_file, engine.SALES_SCHEMA)
 
-        # Step 2: Transform
-        logger.info("Step 2: Transform - Calculating sales count")
-        sales_count_df = calculate_sales_count(products_df, sales_df)
+        # Step 2: Transform - derive the date parts once and share them across transforms
+        sales_df = engine.persist_sales_with_date_parts(sales_df)
 
-        logger.info("Step 2: Transform - Calculating cube sales by date")
-        cubed_sales_by_date_and_store_df = cube_sales_by_date_and_store(sales_df)
+        logger.info("Step 2: Transform - Calculating sales count")
+        sales_count_df = engine.calculate_sales_count(products_df, sales_df)
+        engine.check_exchanges(sales_count_df, max_shuffles=1, description="Sales count")
 
+        logger.info("Step 2: Transform - Calculating cube sales by date and by date and store")
+        cubed_sales_df = engine.cube_sales_grouping_sets(sales_df, SALES_CUBE_VIEWS)
+        engine.check_exchanges(cubed_sales_df, max_shuffles=1, description="Sales cube grouping sets")
 
         # Step 3: Load
         logger.info("Step 3: Load - Saving results")
-        save_to_csv_and_parquet(sales_count_df, output_dir, "sales_count")
-        save_to_csv_and_parquet(cubed_sales_by_date_and_store_df, output_dir, "cubed_sales_by_date_and_store")
+        engine.save_to_csv_and_parquet(sales_count_df, output_dir, "sales_count")
+        engine.save_grouping_sets(cubed_sales_df, output_dir, SALES_CUBE_VIEWS)
 
         # Step 4: Visualize
         logger.info("Step 4: Visualize - Generating sales count chart")
-        visualize_sales_count(output_dir.joinpath("sales_count.csv"))
-        visualize_cubed_sales_stacked(output_dir.joinpath("cubed_sales_by_date_and_store.csv"))
+        visualize_sales_count(output_dir.joinpath("sales_count.parquet"))
+        visualize_cubed_sales_stacked(output_dir.joinpath("cubed_sales_by_date_and_store.parquet"))
 
         logger.info("Pipeline execution completed successfully.")
-    
+
     except Exception as e:
         logger.error(f"Pipeline execution failed: {e}")
-    
+
     finally:
-        # Stop SparkSession
-        logger.info("Stopping SparkSession")
-        spark.stop()
+        if spark is not None:
+            # Stop SparkSession (this also drops the persisted sales frame)
+            logger.info("Stopping SparkSession")
+            spark.stop()
 
 if __name__ == "__main__":
     main()
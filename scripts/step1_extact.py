@@ -1,5 +1,5 @@
 from pyspark.sql import SparkSession
-from scripts.step1_extract import read_csv  # Import your extraction function
+from scripts.step1_extract import PRODUCTS_SCHEMA, SALES_SCHEMA, read_csv  # Import your extraction function
 
 def main():
     """
@@ -14,8 +14,8 @@ def main():
         sales_file = data_dir + "prepared/sales_data_prepared.csv"
 
         # Step 1: Extract
-        products_df = read_csv(spark, products_file)
-        sales_df = read_csv(spark, sales_file)
+        products_df = read_csv(spark, products_file, PRODUCTS_SCHEMA)
+        sales_df = read_csv(spark, sales_file, SALES_SCHEMA)
 
         # Step 2: Transform (other transformations can go here)
         # Example transformation (you can add your actual transformation functions)
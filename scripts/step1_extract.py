@@ -0,0 +1,137 @@
+# Python Standard Library Imports
+import sys
+from pathlib import Path
+
+from typing import Optional
+
+# External imports
+from pyspark.sql import Column, DataFrame, SparkSession
+from pyspark.sql.functions import coalesce, col, to_date
+from pyspark.sql.types import (
+    DateType,
+    DoubleType,
+    IntegerType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Local module imports
+from utils.logger import logger  # noqa: E402
+from scripts.prepared_io import parquet_path_for  # noqa: E402
+
+# Schemas of the prepared tables, in file column order. Reading with a schema
+# skips the inference pass over the whole file and gives every run the same types.
+PRODUCTS_SCHEMA = StructType([
+    StructField("ProductID", IntegerType(), nullable=False),
+    StructField("ProductName", StringType()),
+    StructField("Category", StringType()),
+    StructField("UnitPrice", DoubleType()),
+    StructField("StockQuantity", IntegerType()),
+    StructField("StoreSection", StringType()),
+])
+SALES_SCHEMA = StructType([
+    StructField("TransactionID", LongType(), nullable=False),
+    StructField("SaleDate", DateType()),
+    StructField("CustomerID", IntegerType()),
+    StructField("ProductID", IntegerType()),
+    StructField("StoreID", IntegerType()),
+    StructField("CampaignID", IntegerType()),
+    StructField("SaleAmount", DoubleType()),
+    StructField("DiscountPercent", IntegerType()),
+    StructField("PaymentType", StringType()),
+])
+
+# Date formats found in prepared CSV files: ISO from the prepare scripts, M/d/yyyy in older exports
+CSV_DATE_FORMATS = ("yyyy-MM-dd", "M/d/yyyy")
+
+
+def parse_csv_date(column: str) -> Column:
+    """Parse a text date column in any of CSV_DATE_FORMATS (NULL if none matches)."""
+    return coalesce(*(to_date(col(column), date_format) for date_format in CSV_DATE_FORMATS))
+
+
+def conform_to_schema(df: DataFrame, schema: StructType) -> DataFrame:
+    """Select the schema's columns in its order, cast to its types (e.g. int8 Parquet columns to int)."""
+    return df.select([col(field.name).cast(field.dataType).alias(field.name) for field in schema.fields])
+
+
+def read_csv(spark: SparkSession, file_path: Path, schema: Optional[StructType] = None) -> DataFrame:
+    """
+    Read a CSV file with a header into a Spark DataFrame.
+
+    Args:
+        spark (SparkSession): The active Spark session.
+        file_path (Path): Path to the CSV file.
+        schema (StructType): Expected columns and types. The header must name the
+            same columns; date columns are parsed from any of CSV_DATE_FORMATS.
+            Without a schema the types are inferred, which scans the whole file.
+
+    Returns:
+        DataFrame: The loaded Spark DataFrame.
+    """
+    try:
+        logger.info(f"Reading CSV file: {file_path}")
+        if schema is None:
+            return spark.read.csv(str(file_path), header=True, inferSchema=True)
+
+        # Dates are read as text and parsed afterwards, so either date format is accepted
+        dates = [field.name for field in schema.fields if isinstance(field.dataType, DateType)]
+        text_schema = StructType([
+            StructField(field.name, StringType()) if field.name in dates else field for field in schema.fields
+        ])
+        df = spark.read.csv(str(file_path), header=True, schema=text_schema, enforceSchema=False)
+        for name in dates:
+            df = df.withColumn(name, parse_csv_date(name))
+        return df
+    except Exception as e:
+        logger.error(f"Error reading CSV file {file_path}: {e}")
+        raise
+
+
+def read_parquet(spark: SparkSession, file_path: Path) -> DataFrame:
+    """
+    Read a Parquet file into a Spark DataFrame, using the schema stored in the file.
+
+    Args:
+        spark (SparkSession): The active Spark session.
+        file_path (Path): Path to the Parquet file.
+
+    Returns:
+        DataFrame: The loaded Spark DataFrame.
+    """
+    try:
+        logger.info(f"Reading Parquet file: {file_path}")
+        return spark.read.parquet(str(file_path))
+    except Exception as e:
+        logger.error(f"Error reading Parquet file {file_path}: {e}")
+        raise
+
+
+def read_prepared(spark: SparkSession, csv_path: Path, schema: Optional[StructType] = None) -> DataFrame:
+    """
+    Read a prepared table, preferring the Parquet file written beside the CSV export.
+
+    Parquet keeps the column types, so Spark neither re-parses text nor runs
+    schema inference over the whole file. With a schema, the result has exactly
+    its columns and types whichever file was read.
+
+    Args:
+        spark (SparkSession): The active Spark session.
+        csv_path (Path): Path to the prepared CSV file.
+        schema (StructType): Expected columns and types, e.g. SALES_SCHEMA.
+
+    Returns:
+        DataFrame: The loaded Spark DataFrame.
+    """
+    parquet_path = parquet_path_for(csv_path)
+    if parquet_path.exists():
+        df = read_parquet(spark, parquet_path)
+        return conform_to_schema(df, schema) if schema is not None else df
+    return read_csv(spark, csv_path, schema)
@@ -1,10 +1,13 @@
 # Python Standard Library Imports
+import re
 import sys
 from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence, Union
 
 # External imports
+from pyspark import StorageLevel
 from pyspark.sql import DataFrame
-from pyspark.sql.functions import year, month, dayofweek, col, sum as spark_sum
+from pyspark.sql.functions import broadcast
 
 # For local imports, temporarily add project root to Python sys.path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -13,6 +16,113 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Local module imports
 from utils.logger import logger  # noqa: E402
+from scripts import backends  # noqa: E402
+from scripts.grouping_sets import (  # noqa: E402
+    GROUPING_ID_COLUMN,
+    SALES_CUBE_VIEWS,
+    grouping_columns,
+)
+
+# Dimensions up to this estimated size are broadcast to every executor instead of
+# shuffling the fact table to join them (Spark's own default threshold is 10 MiB)
+BROADCAST_THRESHOLD_BYTES: int = 10 * 1024 * 1024
+
+# Shuffle exchanges in a physical plan (BroadcastExchange is counted separately)
+_SHUFFLE_EXCHANGE = re.compile(
+    r"(?<!Broadcast)Exchange (?:hashpartitioning|rangepartitioning|RoundRobinPartitioning|SinglePartition)"
+)
+_BROADCAST_EXCHANGE = re.compile(r"BroadcastExchange ")
+
+
+def estimated_size_bytes(df: DataFrame) -> Optional[int]:
+    """Return the optimizer's size estimate of a DataFrame, or None if Spark has none."""
+    try:
+        return int(df._jdf.queryExecution().optimizedPlan().stats().sizeInBytes().toString())
+    except Exception as e:
+        logger.warning(f"No size estimate for DataFrame: {e}")
+        return None
+
+
+def join_dimension(fact_df: DataFrame, dimension_df: DataFrame, on: Union[str, Sequence[str]],
+                   how: str = "inner", threshold_bytes: int = BROADCAST_THRESHOLD_BYTES) -> DataFrame:
+    """
+    Join a dimension to a fact table, broadcasting the dimension when it is small.
+
+    A broadcast join ships the dimension to every executor and joins each fact
+    partition where it is, so the fact table is not shuffled. Dimensions without
+    a size estimate, or above the threshold, use Spark's default join.
+
+    Args:
+        fact_df (DataFrame): The large side.
+        dimension_df (DataFrame): The dimension to join.
+        on (str or list): Join key column(s).
+        how (str): Join type.
+        threshold_bytes (int): Largest estimated dimension size to broadcast.
+
+    Returns:
+        DataFrame: The joined DataFrame.
+    """
+    size = estimated_size_bytes(dimension_df)
+    if size is not None and size <= threshold_bytes:
+        logger.info(f"Broadcasting dimension of about {size} bytes for the join on {on}.")
+        dimension_df = broadcast(dimension_df)
+    return fact_df.join(dimension_df, on=on, how=how)
+
+
+def with_date_parts(sales_df: DataFrame) -> DataFrame:
+    """Add Year, Month and DayOfWeek (1 = Sunday) from SaleDate, unless the frame already has them."""
+    return backends.with_date_parts(sales_df, backends.SPARK)
+
+
+def persist_sales_with_date_parts(sales_df: DataFrame,
+                                  storage_level: StorageLevel = StorageLevel.MEMORY_AND_DISK) -> DataFrame:
+    """
+    Derive the date parts once and persist the result for every transform that reads it.
+
+    Pass the returned frame to calculate_sales_count and the cube functions, so
+    the sales files are read and the dates parsed once instead of once per job.
+    Call unpersist() on it when the pipeline is done.
+    """
+    logger.info("Persisting sales with Year, Month and DayOfWeek for reuse.")
+    return with_date_parts(sales_df).persist(storage_level)
+
+
+def plan_exchanges(df: DataFrame) -> Dict[str, int]:
+    """Count the shuffle and broadcast exchanges in a DataFrame's physical plan."""
+    plan = df._jdf.queryExecution().executedPlan().toString()
+    # After adaptive execution the plan string holds both the final and the initial plan
+    if "== Initial Plan ==" in plan:
+        plan = plan.split("== Initial Plan ==", 1)[1]
+    return {"shuffle": len(_SHUFFLE_EXCHANGE.findall(plan)), "broadcast": len(_BROADCAST_EXCHANGE.findall(plan))}
+
+
+def check_exchanges(df: DataFrame, max_shuffles: int, description: str, strict: bool = False) -> Dict[str, int]:
+    """
+    Check that a DataFrame's plan shuffles no more than expected.
+
+    A plan with more shuffle exchanges than max_shuffles usually means a small
+    dimension was not broadcast or a shared input was recomputed.
+
+    Args:
+        df (DataFrame): The DataFrame whose plan to check.
+        max_shuffles (int): Shuffle exchanges the transform needs (e.g. 1 per groupBy).
+        description (str): Name of the transform, for the log.
+        strict (bool): Raise ValueError instead of logging a warning.
+
+    Returns:
+        dict: Number of shuffle and broadcast exchanges.
+    """
+    exchanges = plan_exchanges(df)
+    message = (f"{description}: {exchanges['shuffle']} shuffle and {exchanges['broadcast']} "
+               f"broadcast exchanges (expected at most {max_shuffles} shuffles).")
+    if exchanges["shuffle"] <= max_shuffles:
+        logger.info(message)
+    elif strict:
+        raise ValueError(f"Unnecessary exchanges in {message}")
+    else:
+        logger.warning(f"Unnecessary exchanges in {message}")
+    return exchanges
+
 
 def calculate_sales_count(products_df: DataFrame, sales_df: DataFrame) -> DataFrame:
     """
@@ -27,14 +137,9 @@ def calculate_sales_count(products_df: DataFrame, sales_df: DataFrame) -> DataFr
     """
     logger.info("Starting transformation: calculating sales count by product.")
     try:
-        # Join sales data with product details and calculate count
-        sales_with_count = sales_df.join(
-            products_df.select("ProductID", "UnitPrice"),
-            on="ProductID"
-        ).withColumn("Count", col("SaleAmount") / col("UnitPrice"))
-
-        # Group by ProductID to calculate total count
-        count_by_product = sales_with_count.groupBy("ProductID").sum("Count")
+        # Join sales data with product details (broadcast, as products is small), calculate
+        # count and group by ProductID; the transform itself is shared with the other backends
+        count_by_product = backends.calculate_sales_count(products_df, sales_df, backends.SPARK)
         logger.info("Transformation completed successfully.")
         return count_by_product
 
@@ -47,13 +152,7 @@ def cube_sales_by_date(sales_df: DataFrame) -> DataFrame:
     """Cube sales data by Year, Month, and DayOfWeek."""
     try:
         logger.info("Cubing sales data by Year, Month, and DayOfWeek.")
-        cubed_df = sales_df.withColumn("Year", year(col("SaleDate"))) \
-                           .withColumn("Month", month(col("SaleDate"))) \
-                           .withColumn("DayOfWeek", dayofweek(col("SaleDate")))
-
-        cubed_sales = cubed_df.groupBy("Year", "Month", "DayOfWeek").agg(
-            spark_sum("SaleAmount").alias("TotalSales")
-        )
+        cubed_sales = backends.cube_sales_by_date(sales_df, backends.SPARK)
         logger.info("Cubing by Year, Month, and DayOfWeek completed successfully.")
         return cubed_sales
     except Exception as e:
@@ -74,15 +173,9 @@ def cube_sales_by_date_and_store(sales_df: DataFrame) -> DataFrame:
     try:
         logger.info("Cubing sales data by Year, Month, DayOfWeek, and StoreID.")
 
-        # Add Year, Month, and DayOfWeek columns
-        cubed_df = sales_df.withColumn("Year", year(col("SaleDate"))) \
-                           .withColumn("Month", month(col("SaleDate"))) \
-                           .withColumn("DayOfWeek", dayofweek(col("SaleDate")))
-
-        # Group by Year, Month, DayOfWeek, and StoreID, and aggregate Total Sales
-        cubed_sales = cubed_df.groupBy("Year", "Month", "DayOfWeek", "StoreID").agg(
-            spark_sum("SaleAmount").alias("TotalSales")
-        )
+        # Add Year, Month, and DayOfWeek columns (already there if the frame was persisted with them),
+        # group by Year, Month, DayOfWeek, and StoreID, and aggregate Total Sales
+        cubed_sales = backends.cube_sales_by_date_and_store(sales_df, backends.SPARK)
         
         logger.info("Cubing by Year, Month, DayOfWeek, and StoreID completed successfully.")
         return cubed_sales
@@ -90,3 +183,43 @@ def cube_sales_by_date_and_store(sales_df: DataFrame) -> DataFrame:
     except Exception as e:
         logger.error(f"Error during cubing: {e}")
         raise ValueError(f"Error during cubing: {e}")
+
+
+def cube_sales_grouping_sets(sales_df: DataFrame,
+                             views: Mapping[str, Sequence[str]] = SALES_CUBE_VIEWS) -> DataFrame:
+    """
+    Aggregate sales at every level in views in a single job with GROUPING SETS.
+
+    Separate groupBy calls scan and shuffle the sales once per view. Here each
+    input row is expanded once per grouping set and all levels are aggregated
+    behind one shuffle. Rows carry a grouping_id column telling which view they
+    belong to; columns a view does not group by are null in its rows. Use
+    step3_load.save_grouping_sets to write one output per view.
+
+    Args:
+        sales_df (DataFrame): Input sales DataFrame.
+        views (Mapping[str, Sequence[str]]): Grouping columns of each view.
+
+    Returns:
+        DataFrame: The grouping columns, grouping_id and TotalSales.
+    """
+    try:
+        logger.info(f"Cubing sales data for {len(views)} views with GROUPING SETS: {list(views)}.")
+        cubed_df = with_date_parts(sales_df)
+        columns = grouping_columns(views)
+
+        # The DataFrame API has no groupingSets() before Spark 4, so this goes through SQL
+        view_name = "sales_for_grouping_sets"
+        cubed_df.createOrReplaceTempView(view_name)
+        select_list = ", ".join(f"`{column}`" for column in columns)
+        sets = ", ".join("(" + ", ".join(f"`{column}`" for column in view_columns) + ")"
+                         for view_columns in views.values())
+        cubed_sales = cubed_df.sparkSession.sql(
+            f"SELECT {select_list}, grouping_id() AS {GROUPING_ID_COLUMN}, SUM(SaleAmount) AS TotalSales "
+            f"FROM {view_name} GROUP BY {select_list} GROUPING SETS ({sets})"
+        )
+        logger.info("Cubing with GROUPING SETS completed successfully.")
+        return cubed_sales
+    except Exception as e:
+        logger.error(f"Error during cubing: {e}")
+        raise ValueError(f"Error during cubing: {e}")
@@ -1,6 +1,7 @@
 # Python Standard Library Imports
 import sys
 from pathlib import Path
+from typing import Mapping, Optional, Sequence
 
 # External imports
 from pyspark.sql import DataFrame
@@ -12,15 +13,33 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Local module imports
 from utils.logger import logger  # noqa: E402
+from scripts.grouping_sets import GROUPING_ID_COLUMN, grouping_columns, grouping_id_for  # noqa: E402
 
-def save_to_csv_and_parquet(spark_df: DataFrame, output_dir: Path, file_name: str) -> None:
+# Parquet outputs are partitioned by these columns when they have them
+DEFAULT_PARTITION_COLUMNS = ("Year", "Month")
+
+
+def save_to_csv_and_parquet(
+    spark_df: DataFrame,
+    output_dir: Path,
+    file_name: str,
+    partition_by: Optional[Sequence[str]] = None,
+) -> None:
     """
     Save Spark DataFrame to both CSV and Parquet formats.
 
+    Both are written by the executors as directories of part files
+    (output_dir/file_name.csv/ and output_dir/file_name.parquet/), so no rows
+    pass through the driver and outputs can be larger than its memory. The
+    Parquet output is partitioned into Year=.../Month=... directories, so
+    readers filtering on a period skip the other partitions.
+
     Args:
         spark_df (DataFrame): The Spark DataFrame to save.
         output_dir (Path): The directory where the files will be saved.
         file_name (str): Base name for the output files.
+        partition_by (Sequence[str]): Parquet partition columns; defaults to
+            those of DEFAULT_PARTITION_COLUMNS the DataFrame has.
     """
     logger.info("Starting the save operation for CSV and Parquet files.")
     try:
@@ -28,6 +47,54 @@ def save_to_csv_and_parquet(spark_df: DataFrame, output_dir: Path, file_name: st
         output_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Output directory created: {output_dir}")
 
-        # Convert Spark DataFrame to Pandas DataFrame
-        logger.info("Converting Spark DataFrame to Pandas DataFrame.")
-        pandas_df = spark_df.to
+        if partition_by is None:
+            partition_by = [column for column in DEFAULT_PARTITION_COLUMNS if column in spark_df.columns]
+
+        # Save as CSV, one part file per partition of the DataFrame
+        csv_path = output_dir.joinpath(f"{file_name}.csv")
+        spark_df.write.mode("overwrite").option("header", True).csv(str(csv_path))
+        logger.info(f"Data saved to CSV: {csv_path}")
+
+        # Save as Parquet, partitioned by period
+        parquet_path = output_dir.joinpath(f"{file_name}.parquet")
+        writer = spark_df.write.mode("overwrite")
+        if partition_by:
+            writer = writer.partitionBy(*partition_by)
+        writer.parquet(str(parquet_path))
+        logger.info(f"Data saved to Parquet: {parquet_path} (partitioned by {list(partition_by) or 'nothing'})")
+
+    except Exception as e:
+        logger.error(f"Error saving files: {e}")
+        raise
+
+
+
+def save_grouping_sets(
+    spark_df: DataFrame,
+    output_dir: Path,
+    views: Mapping[str, Sequence[str]],
+) -> None:
+    """
+    Split the result of a GROUPING SETS aggregation into one output per view.
+
+    The aggregate is persisted first, so the single shuffle behind it runs once
+    rather than once per view. Each view's rows are picked by grouping_id and
+    saved with save_to_csv_and_parquet under the view's name, keeping only the
+    view's own grouping columns and the measures.
+
+    Args:
+        spark_df (DataFrame): Output of step2_transform.cube_sales_grouping_sets.
+        output_dir (Path): The directory where the files will be saved.
+        views (Mapping[str, Sequence[str]]): The views the aggregate was built from.
+    """
+    columns = grouping_columns(views)
+    measures = [column for column in spark_df.columns if column not in columns and column != GROUPING_ID_COLUMN]
+    spark_df = spark_df.persist()
+    try:
+        for file_name, view_columns in views.items():
+            gid = grouping_id_for(view_columns, columns)
+            logger.info(f"Saving view {file_name} (grouping_id {gid}).")
+            view_df = spark_df.filter(spark_df[GROUPING_ID_COLUMN] == gid).select(*view_columns, *measures)
+            save_to_csv_and_parquet(view_df, output_dir, file_name)
+    finally:
+        spark_df.unpersist()
@@ -14,23 +14,47 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Local module imports
 from utils.logger import logger  # noqa: E402
+from scripts.stage_cache import cached_stage  # noqa: E402
 
 
+def read_output(file_path: Path) -> pd.DataFrame:
+    """Read a pipeline output, as Parquet or CSV depending on its suffix.
+
+    Spark writes each output as a directory of part files; a partitioned Parquet
+    directory comes back with its partition columns (e.g. Year, Month).
+    """
+    if file_path.suffix == ".parquet":
+        return pd.read_parquet(file_path)
+    if file_path.is_dir():
+        parts = sorted(file_path.glob("part-*.csv"))
+        return pd.concat([pd.read_csv(part) for part in parts], ignore_index=True)
+    return pd.read_csv(file_path)
+
+
+def sales_count_plot_path(csv_file_path: Path) -> Path:
+    """Return the chart visualize_sales_count saves beside its data file."""
+    return csv_file_path.parent.joinpath("sales_count_visualization.png")
+
+
+@cached_stage(
+    inputs=lambda csv_file_path: [csv_file_path],
+    outputs=lambda csv_file_path: [sales_count_plot_path(csv_file_path)],
+)
 def visualize_sales_count(csv_file_path: Path) -> None:
     """
-    Visualize sales count data saved in CSV format.
+    Visualize sales count data saved in Parquet or CSV format.
 
     Args:
-        csv_file_path (Path): Path to the CSV file containing sales count data.
+        csv_file_path (Path): Path to the Parquet or CSV file containing sales count data.
     """
     try:
         # Ensure the file exists
         if not csv_file_path.exists():
-            raise FileNotFoundError(f"CSV file not found at: {csv_file_path}")
+            raise FileNotFoundError(f"File not found at: {csv_file_path}")
 
         # Load the data
-        logger.info(f"Loading data from CSV file: {csv_file_path}")
-        df = pd.read_csv(csv_file_path)
+        logger.info(f"Loading data from file: {csv_file_path}")
+        df = read_output(csv_file_path)
 
         # Check if required columns exist
         required_columns = {"ProductID", "sum(Count)"}
@@ -61,9 +85,7 @@ def visualize_sales_count(csv_file_path: Path) -> None:
         plt.tight_layout()
 
         # Save and show the plot
-        output_plot_path = csv_file_path.parent.joinpath(
-            "sales_count_visualization.png"
-        )
+        output_plot_path = sales_count_plot_path(csv_file_path)
         plt.savefig(output_plot_path)
         logger.info(f"Visualization saved to: {output_plot_path}")
         plt.show()
@@ -78,7 +100,7 @@ def visualize_cubed_sales_stacked(cubed_df_path: Path):
 
     try:
         logger.info(f"Reading cubed sales data from {cubed_df_path}.")
-        cubed_df = pd.read_csv(cubed_df_path)
+        cubed_df = read_output(cubed_df_path)
 
         # Convert day of the week to names
         day_of_week_map = {
@@ -0,0 +1,305 @@
+"""
+Synthetic Raw Data
+File: scripts/synthetic_data.py
+
+Generates customers, products and sales files with the columns and formats of
+the files in data/raw, at any scale (benchmarks use 1e4 to 1e8 sales rows):
+
+    customers_data.csv   CustomerID, Name, Region, JoinDate (m/d/yy), LoyaltyPoints, CustomerSegment
+    products_data.csv    ProductID, ProductName, Category, UnitPrice, StockQuantity, StoreSection
+    sales_data.csv       TransactionID, SaleDate (m/d/yyyy), CustomerID, ProductID, StoreID,
+                         CampaignID, SaleAmount, DiscountPercent, PaymentType
+
+Distributions follow the shipped sample: a few products and customers account
+for most sales (Zipf-like popularity), sale amounts are the product's unit price
+times a small quantity less the discount, and most sales have no campaign or
+discount. The dirty data the prepare scripts clean up is injected at
+configurable rates:
+
+- nulls: LoyaltyPoints, StockQuantity, SaleAmount, DiscountPercent
+- duplicates: exact copies of rows already written
+- outliers: LoyaltyPoints over 5,000, UnitPrice over 5,000, StockQuantity over 1,000,
+  SaleAmount over 10,000
+- inconsistent labels: lowercase CustomerSegment, Category and PaymentType values
+
+Sales only reference customers and products that survive cleaning, so the
+prepared tables keep their foreign keys. Sales are generated and written in
+chunks, so memory use does not grow with the row count.
+
+Usage:
+    python3 scripts/synthetic_data.py --sales-rows 1000000 --output-dir data/synthetic/raw
+"""
+
+import argparse
+import pathlib
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+
+# Constants
+OUTPUT_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data", "synthetic", "raw")
+DEFAULT_SALES_ROWS: int = 10_000
+DEFAULT_CHUNK_SIZE: int = 1_000_000
+FIRST_CUSTOMER_ID: int = 1001
+FIRST_PRODUCT_ID: int = 101
+FIRST_TRANSACTION_ID: int = 550
+SALES_PER_CUSTOMER: int = 50
+SALES_PER_PRODUCT: int = 10_000
+MIN_CUSTOMERS: int = 100
+MIN_PRODUCTS: int = 20
+SALES_START: str = "2024-01-01"
+SALES_DAYS: int = 366
+
+FIRST_NAMES = ("William", "Wylie", "Dan", "Tiffany", "Susan", "Tony", "Jason", "Hermione", "Maria", "Ahmed",
+               "Mei", "Olga", "Carlos", "Priya", "Kofi", "Sofia")
+LAST_NAMES = ("White", "Coyote", "Brown", "James", "Johnson", "Stark", "Bourne", "Granger", "Garcia", "Khan",
+              "Chen", "Ivanova", "Lopez", "Patel", "Mensah", "Rossi")
+REGIONS = ("East", "West", "North", "South")
+SEGMENTS = {"Regular": 0.6, "VIP": 0.25, "Premium": 0.15}
+# Category -> (StoreSection, typical unit price, product names)
+CATEGORIES = {
+    "Electronics": ("Electronics", 120.0, ("laptop", "cable", "controller", "protector", "headphones", "charger")),
+    "Clothing": ("Apparel", 45.0, ("hoodie", "hat", "jacket", "scarf", "gloves", "socks")),
+    "Sports": ("Sports", 30.0, ("football", "racket", "helmet", "bottle", "mat", "ball")),
+}
+STORE_IDS = (401, 402, 403, 404, 405, 406)
+CAMPAIGNS = {0: 0.85, 1: 0.05, 2: 0.05, 3: 0.05}
+DISCOUNTS = {0: 0.6, 5: 0.2, 10: 0.12, 15: 0.08}
+PAYMENT_TYPES = {"Credit": 0.45, "Debit": 0.35, "Cash": 0.2}
+
+# Cleaning limits of the prepare scripts; outliers are generated beyond them
+MAX_LOYALTY_POINTS: int = 5000
+MAX_UNIT_PRICE: float = 5000
+MAX_STOCK_QUANTITY: int = 1000
+MAX_SALE_AMOUNT: float = 10000
+
+
+@dataclass
+class DirtRates:
+    """Share of rows that get each kind of defect."""
+    nulls: float = 0.01
+    duplicates: float = 0.01
+    outliers: float = 0.005
+    inconsistent_labels: float = 0.05
+
+
+def _choice(rng: np.random.Generator, weights: Dict, size: int) -> np.ndarray:
+    values = np.array(list(weights))
+    probabilities = np.array(list(weights.values()), dtype=np.float64)
+    return values[rng.choice(len(values), size=size, p=probabilities / probabilities.sum())]
+
+
+def _format_dates(days: np.ndarray, short_year: bool) -> pd.Series:
+    """Format days since the epoch as m/d/yy or m/d/yyyy without zero padding, like the raw files."""
+    dates = pd.DatetimeIndex(days.astype("datetime64[D]"))
+    year = dates.year % 100 if short_year else dates.year
+    return dates.month.astype(str) + "/" + dates.day.astype(str) + "/" + pd.Index(year).astype(str)
+
+
+def _zipf_indices(rng: np.random.Generator, n_items: int, size: int, exponent: float = 1.1) -> np.ndarray:
+    """Draw item positions with Zipf-like popularity: position 0 is the most popular."""
+    weights = 1.0 / np.arange(1, n_items + 1) ** exponent
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def _inject_nulls(df: pd.DataFrame, columns, rate: float, rng: np.random.Generator) -> pd.DataFrame:
+    for column in columns:
+        missing = rng.random(len(df)) < rate
+        if missing.any():
+            df[column] = df[column].astype("float64")
+            df.loc[missing, column] = np.nan
+    return df
+
+
+def _lowercase_some(values: pd.Series, rate: float, rng: np.random.Generator) -> pd.Series:
+    lower = rng.random(len(values)) < rate
+    return values.where(~lower, values.str.lower())
+
+
+def _inject_duplicates(df: pd.DataFrame, rate: float, rng: np.random.Generator) -> pd.DataFrame:
+    """Insert exact copies of random rows at random positions."""
+    count = int(round(len(df) * rate))
+    if count == 0:
+        return df
+    copies = df.iloc[rng.integers(0, len(df), size=count)]
+    combined = pd.concat([df, copies], ignore_index=True)
+    return combined.iloc[rng.permutation(len(combined))].reset_index(drop=True)
+
+
+def generate_customers(n_customers: int, rng: np.random.Generator, dirt: DirtRates = DirtRates()) -> pd.DataFrame:
+    """Customers with ids from 1001; outlier rows get ids after the clean ones."""
+    n_outliers = int(round(n_customers * dirt.outliers))
+    n_total = n_customers + n_outliers
+    join_days = rng.integers(np.datetime64("2019-01-01").astype(int), np.datetime64(SALES_START).astype(int), n_total)
+    loyalty = np.minimum(rng.lognormal(6.4, 0.8, n_total).round(-1), MAX_LOYALTY_POINTS).astype(np.int64)
+    loyalty[n_customers:] = rng.integers(MAX_LOYALTY_POINTS + 1, 10 * MAX_LOYALTY_POINTS, n_outliers)
+    customers = pd.DataFrame({
+        "CustomerID": np.arange(FIRST_CUSTOMER_ID, FIRST_CUSTOMER_ID + n_total),
+        "Name": pd.Series(np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), n_total)])
+        + " " + np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), n_total)],
+        "Region": np.array(REGIONS)[rng.integers(0, len(REGIONS), n_total)],
+        "JoinDate": _format_dates(join_days, short_year=True),
+        "LoyaltyPoints": loyalty,
+        "CustomerSegment": _choice(rng, SEGMENTS, n_total),
+    })
+    customers["CustomerSegment"] = _lowercase_some(customers["CustomerSegment"], dirt.inconsistent_labels, rng)
+    customers = _inject_nulls(customers, ["LoyaltyPoints"], dirt.nulls, rng)
+    return _inject_duplicates(customers, dirt.duplicates, rng)
+
+
+def generate_products(n_products: int, rng: np.random.Generator, dirt: DirtRates = DirtRates()) -> pd.DataFrame:
+    """Products with ids from 101; outlier rows get ids after the clean ones."""
+    n_outliers = int(round(n_products * dirt.outliers))
+    n_total = n_products + n_outliers
+    categories = np.array(list(CATEGORIES))[rng.integers(0, len(CATEGORIES), n_total)]
+    sections = np.array([CATEGORIES[category][0] for category in categories])
+    typical = np.array([CATEGORIES[category][1] for category in categories])
+    names = np.array([rng.choice(CATEGORIES[category][2]) for category in categories])
+    prices = np.minimum(typical * rng.lognormal(0.0, 0.6, n_total), MAX_UNIT_PRICE).round(2)
+    stock = rng.poisson(25, n_total).astype(np.int64)
+    outliers = np.arange(n_products, n_total)
+    price_outliers = outliers[rng.random(n_outliers) < 0.5]
+    stock_outliers = np.setdiff1d(outliers, price_outliers)
+    prices[price_outliers] = rng.uniform(MAX_UNIT_PRICE * 1.1, MAX_UNIT_PRICE * 10, len(price_outliers)).round(2)
+    stock[stock_outliers] = rng.integers(MAX_STOCK_QUANTITY + 1, 10 * MAX_STOCK_QUANTITY, len(stock_outliers))
+    products = pd.DataFrame({
+        "ProductID": np.arange(FIRST_PRODUCT_ID, FIRST_PRODUCT_ID + n_total),
+        "ProductName": names,
+        "Category": categories,
+        "UnitPrice": prices,
+        "StockQuantity": stock,
+        "StoreSection": sections,
+    })
+    products["Category"] = _lowercase_some(products["Category"], dirt.inconsistent_labels, rng)
+    products = _inject_nulls(products, ["StockQuantity"], dirt.nulls, rng)
+    return _inject_duplicates(products, dirt.duplicates, rng)
+
+
+def generate_sales_chunk(
+    first_transaction_id: int,
+    n_rows: int,
+    customer_ids: np.ndarray,
+    product_ids: np.ndarray,
+    unit_prices: np.ndarray,
+    rng: np.random.Generator,
+    dirt: DirtRates = DirtRates(),
+) -> pd.DataFrame:
+    """One chunk of sales with consecutive TransactionIDs (plus duplicated rows).
+
+    customer_ids and product_ids (with unit_prices) are in popularity order, most
+    popular first. Pass the same order to every chunk of a dataset, so the same
+    items stay popular throughout.
+    """
+    products = _zipf_indices(rng, len(product_ids), n_rows)
+    customers = _zipf_indices(rng, len(customer_ids), n_rows, exponent=0.8)
+    days = np.datetime64(SALES_START).astype(int) + rng.integers(0, SALES_DAYS, n_rows)
+    discounts = _choice(rng, DISCOUNTS, n_rows).astype(np.int64)
+    quantity = rng.geometric(0.6, n_rows)
+    amounts = (unit_prices[products] * quantity * (1 - discounts / 100)).round(2)
+    outliers = rng.random(n_rows) < dirt.outliers
+    amounts[outliers] = rng.uniform(MAX_SALE_AMOUNT * 1.1, MAX_SALE_AMOUNT * 5, int(outliers.sum())).round(2)
+    sales = pd.DataFrame({
+        "TransactionID": np.arange(first_transaction_id, first_transaction_id + n_rows),
+        "SaleDate": _format_dates(days, short_year=False),
+        "CustomerID": customer_ids[customers],
+        "ProductID": product_ids[products],
+        "StoreID": np.array(STORE_IDS)[rng.integers(0, len(STORE_IDS), n_rows)],
+        "CampaignID": _choice(rng, CAMPAIGNS, n_rows).astype(np.int64),
+        "SaleAmount": amounts,
+        "DiscountPercent": discounts,
+        "PaymentType": _choice(rng, PAYMENT_TYPES, n_rows),
+    })
+    sales["PaymentType"] = _lowercase_some(sales["PaymentType"], dirt.inconsistent_labels, rng)
+    sales = _inject_nulls(sales, ["SaleAmount", "DiscountPercent"], dirt.nulls, rng)
+    return _inject_duplicates(sales, dirt.duplicates, rng)
+
+
+def write_synthetic_dataset(
+    output_dir: pathlib.Path = OUTPUT_DIR,
+    sales_rows: int = DEFAULT_SALES_ROWS,
+    n_customers: Optional[int] = None,
+    n_products: Optional[int] = None,
+    seed: int = 0,
+    dirt: DirtRates = DirtRates(),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, pathlib.Path]:
+    """Write customers, products and sales CSV files shaped like data/raw.
+
+    Args:
+        output_dir (Path): Directory for the three raw files.
+        sales_rows (int): Distinct sales; duplicates come on top.
+        n_customers (int): Clean customers; defaults to one per SALES_PER_CUSTOMER sales.
+        n_products (int): Clean products; defaults to one per SALES_PER_PRODUCT sales.
+        seed (int): Seed of the random generator; the same seed writes the same files.
+        dirt (DirtRates): Rates of nulls, duplicates, outliers and inconsistent labels.
+        chunk_size (int): Sales rows generated and written at a time.
+
+    Returns:
+        dict: Path of each file, by table name.
+    """
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(MIN_CUSTOMERS, sales_rows // SALES_PER_CUSTOMER)
+    n_products = n_products or max(MIN_PRODUCTS, sales_rows // SALES_PER_PRODUCT)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {table: output_dir.joinpath(f"{table}_data.csv") for table in ("customers", "products", "sales")}
+
+    customers = generate_customers(n_customers, rng, dirt)
+    customers.to_csv(paths["customers"], index=False)
+    products = generate_products(n_products, rng, dirt)
+    products.to_csv(paths["products"], index=False)
+
+    # Sales reference only the rows the prepare scripts keep
+    clean_products = products.drop_duplicates("ProductID")
+    clean_products = clean_products[
+        (clean_products["UnitPrice"] <= MAX_UNIT_PRICE) & (clean_products["StockQuantity"].fillna(0) <= MAX_STOCK_QUANTITY)
+    ]
+    # Popularity order, drawn once so every chunk favors the same customers and products
+    customer_ids = rng.permutation(np.arange(FIRST_CUSTOMER_ID, FIRST_CUSTOMER_ID + n_customers))
+    popularity = rng.permutation(len(clean_products))
+    product_ids = clean_products["ProductID"].to_numpy()[popularity]
+    unit_prices = clean_products["UnitPrice"].to_numpy()[popularity]
+
+    written = 0
+    with open(paths["sales"], "w", newline="") as file:
+        for start in range(0, sales_rows, chunk_size):
+            n_rows = min(chunk_size, sales_rows - start)
+            chunk = generate_sales_chunk(
+                FIRST_TRANSACTION_ID + start, n_rows, customer_ids, product_ids, unit_prices, rng, dirt
+            )
+            chunk.to_csv(file, index=False, header=start == 0)
+            written += len(chunk)
+    logger.info(
+        f"Wrote {len(customers)} customers, {len(products)} products and {written} sales "
+        f"(seed {seed}) to {output_dir}."
+    )
+    return paths
+
+
+def main() -> None:
+    """Write a synthetic raw dataset."""
+    parser = argparse.ArgumentParser(description="Generate synthetic raw customers, products and sales files.")
+    parser.add_argument("--sales-rows", type=float, default=DEFAULT_SALES_ROWS, help="Distinct sales rows, e.g. 1e6.")
+    parser.add_argument("--output-dir", type=pathlib.Path, default=OUTPUT_DIR, help="Directory for the raw files.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--null-rate", type=float, default=DirtRates.nulls)
+    parser.add_argument("--duplicate-rate", type=float, default=DirtRates.duplicates)
+    parser.add_argument("--outlier-rate", type=float, default=DirtRates.outliers)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Sales rows generated at a time.")
+    args = parser.parse_args()
+
+    dirt = DirtRates(nulls=args.null_rate, duplicates=args.duplicate_rate, outliers=args.outlier_rate)
+    write_synthetic_dataset(args.output_dir, int(args.sales_rows), seed=args.seed, dirt=dirt, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+r"""
+tests/test_backends.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_backends.py
+    python3 tests\test_backends.py
+
+This test suite verifies that the transforms shared by the execution backends
+give the same results as the pandas code they replace, and that a backend is
+picked from the frames passed in or from the input size.
+"""
+
+import unittest
+import pathlib
+import sys
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the backends and the pandas implementations they are checked against
+from scripts import backends  # noqa: E402
+from scripts.olap.product_performance_by_day import create_product_performance_cube_from_chunks  # noqa: E402
+
+GIB = 1024 ** 3
+
+rng = np.random.default_rng(5)
+sales_df = pd.DataFrame({
+    "SaleDate": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 400, 500), unit="D"),
+    "ProductID": rng.integers(101, 106, 500),
+    "StoreID": rng.integers(401, 404, 500),
+    "SaleAmount": rng.uniform(5, 500, 500).round(2),
+})
+sales_df.loc[[3, 9], "SaleDate"] = pd.NaT
+sales_df.loc[[4, 12], "SaleAmount"] = np.nan
+products_df = pd.DataFrame({"ProductID": np.arange(101, 106), "UnitPrice": [10.0, 20.0, 25.0, 50.0, 5.0]})
+
+
+class TestSharedTransforms(unittest.TestCase):
+
+    def test_product_performance_matches_accumulator(self):
+        """Test that the shared product performance cube equals the dense accumulator's."""
+        pd.testing.assert_frame_equal(
+            backends.create_product_performance_cube(sales_df),
+            create_product_performance_cube_from_chunks([sales_df]),
+            check_dtype=False,
+        )
+
+    def test_sales_count(self):
+        """Test that the sales count per product sums SaleAmount over UnitPrice."""
+        counts = backends.calculate_sales_count(products_df, sales_df).set_index("ProductID")["sum(Count)"]
+        prices = products_df.set_index("ProductID")["UnitPrice"]
+        expected = sales_df.groupby("ProductID")["SaleAmount"].sum() / prices
+        pd.testing.assert_series_equal(counts.sort_index(), expected, check_names=False)
+
+    def test_cubes_by_date(self):
+        """Test that both date cubes keep every sale, with days numbered from Sunday = 1."""
+        by_date = backends.cube_sales_by_date(sales_df)
+        by_store = backends.cube_sales_by_date_and_store(sales_df)
+        self.assertEqual(list(by_store.columns), ["Year", "Month", "DayOfWeek", "StoreID", "TotalSales"])
+        self.assertAlmostEqual(by_date["TotalSales"].sum(), sales_df["SaleAmount"].sum())
+        self.assertAlmostEqual(by_store["TotalSales"].sum(), sales_df["SaleAmount"].sum())
+        dated = by_date.dropna(subset=["Year"])
+        self.assertTrue(dated["DayOfWeek"].between(1, 7).all())
+        first_day = backends.with_date_parts(sales_df.iloc[[0]].assign(SaleDate=pd.Timestamp("2024-01-01")))
+        self.assertEqual(first_day["DayOfWeek"].iloc[0], 2, "2024-01-01 was a Monday.")
+
+    def test_text_dates_parsed_on_every_backend(self):
+        """Test that text SaleDates give the same date parts as parsed ones on each in-memory backend."""
+        columns = ["Year", "Month", "DayOfWeek"]
+        expected = backends.with_date_parts(sales_df)[columns]
+        text_dates = sales_df.assign(SaleDate=sales_df["SaleDate"].dt.strftime("%m/%d/%Y"))
+        for name in (backends.PANDAS, backends.POLARS):
+            if name not in backends.available_backends():
+                continue
+            with self.subTest(backend=name):
+                engine = backends.get_backend(name)
+                dated = engine.to_pandas(backends.with_date_parts(text_dates, name))[columns]
+                pd.testing.assert_frame_equal(dated, expected, check_dtype=False)
+
+
+class TestBackendChoice(unittest.TestCase):
+
+    def test_backend_follows_frame_type(self):
+        """Test that frames run on their own engine and unknown types are rejected."""
+        self.assertEqual(backends.backend_for(sales_df).name, backends.PANDAS)
+        with self.assertRaises(TypeError):
+            backends.backend_for([1, 2, 3])
+
+    def test_unknown_or_missing_backend(self):
+        """Test that an unknown backend name is a ValueError and an uninstalled one an ImportError."""
+        with self.assertRaises(ValueError):
+            backends.get_backend("dask")
+        with mock.patch.object(backends.PolarsBackend, "available", return_value=False):
+            with self.assertRaises(ImportError):
+                backends.cube_sales_by_date(sales_df, backend=backends.POLARS)
+
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing a primitive fails when it is created, not when the primitive is called."""
+        class PartialBackend(backends.Backend):
+            name = "partial"
+
+            def owns(self, df):
+                return False
+
+        with self.assertRaises(TypeError):
+            PartialBackend()
+
+    def test_choose_backend_by_size(self):
+        """Test that small inputs use pandas, larger ones Polars and oversized ones Spark."""
+        memory = 16 * GIB
+        self.assertEqual(backends.choose_backend(1024, cores=4, memory_bytes=memory), backends.PANDAS)
+        with mock.patch.object(backends.PolarsBackend, "available", return_value=True):
+            self.assertEqual(backends.choose_backend(GIB // 2, cores=4, memory_bytes=memory), backends.POLARS)
+        with mock.patch("scripts.runtime_profile.spark_available", return_value=True):
+            self.assertEqual(backends.choose_backend(64 * GIB, cores=4, memory_bytes=memory), backends.SPARK)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
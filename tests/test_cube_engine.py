@@ -0,0 +1,73 @@
+r"""
+tests/test_cube_engine.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_cube_engine.py
+    python3 tests\test_cube_engine.py
+
+This test suite verifies that cube roll-ups, slices and dices match pandas group-bys over the facts.
+"""
+
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the cube engine from the scripts module
+from scripts.olap.cube_engine import OlapCube  # noqa: E402
+
+rng = np.random.default_rng(7)
+sales_df = pd.DataFrame({
+    "DayOfWeek": rng.choice(["0", "1", "2", "3", "4", "5", "6"], 500),
+    "ProductID": rng.integers(101, 109, 500),
+    "CustomerID": rng.integers(1001, 1012, 500),
+    "StoreID": rng.choice([401, 402, 403, 404], 500),
+    "SaleAmount": rng.uniform(5, 500, 500).round(2),
+})
+
+
+def expected(df, dimensions):
+    grouped = df.groupby(list(dimensions))["SaleAmount"]
+    return pd.DataFrame({"TotalSales": grouped.sum(), "SalesCount": grouped.count(), "VarSales": grouped.var()})
+
+
+class TestCubeEngine(unittest.TestCase):
+
+    def assert_matches(self, result, want, dimensions):
+        got = result.set_index(list(dimensions))[["TotalSales", "SalesCount", "VarSales"]]
+        pd.testing.assert_frame_equal(got, want, check_dtype=False, check_names=False)
+
+    def test_full_lattice_is_materialized(self):
+        cube = OlapCube.from_facts(sales_df)
+        self.assertEqual(len(cube.cuboids), 16, "Lattice over 4 dimensions should have 16 cuboids")
+
+    def test_rollups_match_group_by(self):
+        cube = OlapCube.from_facts(sales_df)
+        for dimensions in (["DayOfWeek"], ["ProductID", "StoreID"], ["DayOfWeek", "ProductID", "CustomerID"]):
+            self.assert_matches(cube.rollup(dimensions), expected(sales_df, dimensions), dimensions)
+        total = cube.rollup()
+        self.assertAlmostEqual(total["TotalSales"].iloc[0], sales_df["SaleAmount"].sum(), places=6)
+        self.assertEqual(total["SalesCount"].iloc[0], len(sales_df), "Grand total count incorrect")
+
+    def test_slice_and_dice_match_filters(self):
+        cube = OlapCube.from_facts(sales_df, materialize=[["DayOfWeek", "ProductID"]])
+        sliced = sales_df[sales_df["StoreID"] == 404]
+        self.assert_matches(cube.slice("StoreID", 404, ["ProductID"]), expected(sliced, ["ProductID"]), ["ProductID"])
+        diced = sales_df[sales_df["DayOfWeek"].isin(["0", "6"]) & sales_df["ProductID"].isin([101, 102])]
+        result = cube.dice({"DayOfWeek": ["0", "6"], "ProductID": [101, 102]}, ["DayOfWeek"])
+        self.assert_matches(result, expected(diced, ["DayOfWeek"]), ["DayOfWeek"])
+        drilled = cube.drill_down(["DayOfWeek"], "ProductID")
+        self.assert_matches(drilled, expected(sales_df, ["DayOfWeek", "ProductID"]), ["DayOfWeek", "ProductID"])
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
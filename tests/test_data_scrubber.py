@@ -13,7 +13,9 @@ This test suite verifies that each function in the DataScrubber class works as e
 import unittest
 import pathlib
 import sys
+import tempfile
 from io import StringIO
+import numpy as np
 import pandas as pd
 
 # For local imports, temporarily add project root to Python sys.path
@@ -23,6 +25,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # Import DataScrubber from the scripts module
 from scripts.data_scrubber import DataScrubber  # noqa: E402
+from scripts.dtype_schema import read_csv_with_schema, write_csv_with_schema  # noqa: E402
 
 # Create a fake CSV file using StringIO
 csv_data = StringIO("""
@@ -75,6 +78,25 @@ class TestDataScrubber(unittest.TestCase):
         df_filtered = self.scrubber.filter_column_outliers('Score', 10, 25)
         self.assertLessEqual(df_filtered['Score'].max(), 25, "Outliers not filtered correctly")
 
+    def test_filter_column_outliers_iqr(self):
+        df_filtered = self.scrubber.filter_column_outliers_iqr('Score', 15, 20, multiplier=1)
+        self.assertEqual(df_filtered['Score'].tolist(), [10, 15, 20, 25], "IQR bounds not applied correctly")
+
+    def test_sketch_column_quantiles(self):
+        values = pd.DataFrame({'Score': np.arange(10_000, dtype=float)})
+        chunks = (values.iloc[i:i + 1_000] for i in range(0, len(values), 1_000))
+        stats = DataScrubber.sketch_column_quantiles(chunks, 'Score', epsilon=0.01)
+        self.assertEqual(stats['count'], 10_000, "Sketch did not see every value")
+        self.assertAlmostEqual(stats['q1'], 2_500, delta=100, msg="Q1 outside the error bound")
+        self.assertAlmostEqual(stats['median'], 5_000, delta=100, msg="Median outside the error bound")
+        self.assertAlmostEqual(stats['q3'], 7_500, delta=100, msg="Q3 outside the error bound")
+
+    def test_sketch_column_quantiles_fills_missing_with_median(self):
+        stats = DataScrubber.sketch_column_quantiles([df], 'Score', fill_missing_with_median=True)
+        self.assertEqual(stats['null_count'], 1, "Missing values not counted")
+        self.assertEqual(stats['count'], len(df), "Missing values not filled with the median")
+        self.assertEqual(stats['median'], 20, "Median incorrect")
+
     def test_format_column_strings_to_lower_and_trim(self):
         df_formatted = self.scrubber.format_column_strings_to_lower_and_trim('Name')
         self.assertEqual(df_formatted['Name'].str.contains(' ').sum(), 0, "Strings not formatted to lowercase correctly")
@@ -94,6 +116,50 @@ class TestDataScrubber(unittest.TestCase):
         self.assertIsNotNone(info, "DataFrame info should not be None")
         self.assertIsNotNone(describe, "DataFrame description should not be None")
 
+    def test_profile_data(self):
+        profile = self.scrubber.profile_data()
+        self.assertEqual(profile.row_count, 6, "Row count incorrect")
+        self.assertEqual(profile.duplicate_count, df.duplicated().sum(), "Duplicate count incorrect")
+        self.assertEqual(profile.null_counts.tolist(), df.isnull().sum().tolist(), "Null counts incorrect")
+        score = profile.columns['Score']
+        self.assertEqual((score.min, score.max), (10, 30), "Score range incorrect")
+        self.assertAlmostEqual(score.mean, df['Score'].mean(), msg="Score mean incorrect")
+        self.assertAlmostEqual(score.std, df['Score'].std(), msg="Score std incorrect")
+        self.assertEqual(profile.columns['Name'].distinct_count, 4, "Distinct count incorrect")
+        self.assertGreater(profile.memory_bytes, 0, "Memory usage not reported")
+
+    def test_optimize_dtypes(self):
+        scrubber = DataScrubber(pd.concat([df] * 3, ignore_index=True))
+        df_optimized = scrubber.optimize_dtypes()
+        self.assertEqual(df_optimized['ID'].dtype, 'int64', "Key column downcast from the values seen so far")
+        self.assertEqual(df_optimized['Name'].dtype, 'category', "Low-cardinality text not made categorical")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_optimized['Date']), "Date column not parsed")
+        self.assertEqual(df_optimized['Score'].dtype, 'float32', "Lossless float column not downcast")
+        self.assertEqual(scrubber.dtype_schema['dates'], {'Date': '%Y-%m-%d'}, "Date format not recorded in schema")
+
+    def test_optimized_dtypes_round_trip_through_schema(self):
+        scrubber = DataScrubber(pd.concat([df] * 3, ignore_index=True))
+        df_optimized = scrubber.optimize_dtypes()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir).joinpath('scores.csv')
+            write_csv_with_schema(df_optimized, csv_path, scrubber.dtype_schema)
+            df_read = read_csv_with_schema(csv_path)
+        pd.testing.assert_frame_equal(df_read, df_optimized)
+
+    def test_small_integers_downcast_but_not_keys(self):
+        scrubber = DataScrubber(pd.DataFrame({'StoreID': [1, 2, 3], 'Quantity': [1, 2, 3]}))
+        df_optimized = scrubber.optimize_dtypes()
+        self.assertEqual(df_optimized['Quantity'].dtype, 'int8', "Integer column not downcast")
+        self.assertEqual(df_optimized['StoreID'].dtype, 'int64', "Key column downcast from the values seen so far")
+
+    def test_schema_does_not_wrap_values_that_outgrew_it(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir).joinpath('counts.csv')
+            write_csv_with_schema(pd.DataFrame({'Count': [1, 2, 3]}), csv_path)
+            pd.DataFrame({'Count': [1, 2, 3, 40000]}).to_csv(csv_path, index=False)  # Appended after the schema was saved
+            df_read = read_csv_with_schema(csv_path)
+        self.assertEqual(df_read['Count'].tolist(), [1, 2, 3, 40000], "Value wrapped by a stale integer type")
+
     def test_parse_dates_to_add_standard_datetime(self):
         df_parsed = self.scrubber.parse_dates_to_add_standard_datetime('Date')
         self.assertIn('StandardDateTime', df_parsed.columns, "StandardDateTime column not added correctly")
@@ -112,6 +178,29 @@ class TestDataScrubber(unittest.TestCase):
         df_reordered = self.scrubber.reorder_columns(['Name', 'ID', 'Date'])
         self.assertEqual(df_reordered.columns.tolist(), ['Name', 'ID', 'Date'], "Columns not reordered correctly")
 
+    def test_lazy_plan_matches_eager(self):
+        def chain(scrubber):
+            scrubber.filter_column_outliers('Score', 10, 30)
+            scrubber.rename_columns({'Name': 'FullName'})
+            scrubber.filter_column_outliers('Score', 15, 30)
+            scrubber.drop_columns(['ID', 'Score'])
+            scrubber.remove_duplicate_records()
+            scrubber.reorder_columns(['Date', 'FullName'])
+            return scrubber.execute()
+
+        lazy = DataScrubber(df.copy(), lazy=True)
+        expected = chain(DataScrubber(df.copy()))
+        result = chain(lazy)
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(len(result), 3, "Duplicates not removed in lazy plan")
+        self.assertEqual(lazy.plan, [], "Plan not cleared after execute")
+
+    def test_lazy_plan_is_deferred(self):
+        lazy = DataScrubber(df.copy(), lazy=True)
+        lazy.drop_columns(['Date'])
+        self.assertIn('Date', lazy.df.columns, "Lazy step ran before execute")
+        lazy.format_column_strings_to_upper_and_trim('Name')
+        self.assertNotIn('Date', lazy.df.columns, "Pending plan not executed before an eager step")
 
 # Run the tests with verbosity=2 for detailed output
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+r"""
+tests/test_data_streaming.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_data_streaming.py
+    python3 tests\test_data_streaming.py
+
+This test suite verifies that chunked streaming gives the same result as cleaning in memory.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the streaming helpers from the scripts module
+from scripts.data_streaming import RowFingerprintSet, row_fingerprints, stream_clean_csv  # noqa: E402
+from scripts.dtype_schema import apply_dtype_schema, infer_dtype_schema, load_dtype_schema, write_csv_with_schema  # noqa: E402
+from scripts.prepared_io import CSV, export_parquet_from_csv, parquet_available, read_prepared  # noqa: E402
+
+# Duplicates are spread across chunks, and Score is int in some chunks and float in others
+raw_df = pd.DataFrame({
+    "ID": [1, 2, 3, 1, 4, 2, 5, 5, 6, 3],
+    "Name": ["Alice", "Bob", "Carl", "Alice", "Dee", "Bob", "Eve", "Eve", "Fay", "Carl"],
+    "Score": [10, 15, None, 10, 25, 15, 30, 30, 40, None],
+})
+
+
+class TestDataStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.raw_path = pathlib.Path(self.tmp_dir.name).joinpath("raw.csv")
+        self.prepared_path = pathlib.Path(self.tmp_dir.name).joinpath("prepared.csv")
+        raw_df.to_csv(self.raw_path, index=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_fingerprints_match_across_dtypes(self):
+        as_int = pd.DataFrame({"ID": [1], "Score": [10]})
+        as_float = pd.DataFrame({"ID": [1], "Score": [10.0]})
+        self.assertEqual(row_fingerprints(as_int)[0], row_fingerprints(as_float)[0], "Equal rows should hash equally")
+
+    def test_fingerprints_keep_large_integers_apart(self):
+        ids = pd.DataFrame({"ID": np.array([2 ** 53, 2 ** 53 + 1, 2 ** 62 + 1], dtype=np.int64)})
+        self.assertEqual(len(set(row_fingerprints(ids))), 3, "Distinct IDs above 2**53 hashed equally")
+        fractions = pd.DataFrame({"Score": [10.5, 10.25, np.nan]})
+        self.assertEqual(len(set(row_fingerprints(fractions))), 3, "Distinct fractional values hashed equally")
+
+    def test_fingerprints_match_when_a_chunk_has_no_text(self):
+        empty_names = pd.DataFrame({"ID": [3, 4], "Name": [np.nan, np.nan]})  # read as float64
+        with_names = pd.DataFrame({"ID": [3, 5], "Name": [np.nan, "Eve"]})  # read as text
+        self.assertEqual(row_fingerprints(empty_names)[0], row_fingerprints(with_names)[0],
+                         "Equal rows should hash equally when a text column is all missing in one chunk")
+
+    def test_first_seen_drops_repeats(self):
+        seen = RowFingerprintSet()
+        first = seen.first_seen([1, 2, 2, 3])
+        second = seen.first_seen([3, 4])
+        self.assertEqual(first.tolist(), [True, True, False, True], "Repeats within a batch not dropped")
+        self.assertEqual(second.tolist(), [False, True], "Repeats across batches not dropped")
+        self.assertEqual(len(seen), 4, "Fingerprint count incorrect")
+
+    def test_fingerprint_set_is_bounded(self):
+        seen = RowFingerprintSet(max_fingerprints=4, max_generations=2)
+        for start in range(0, 20, 2):
+            seen.first_seen([start, start + 1])
+        self.assertLessEqual(len(seen), 4, "Fingerprint set grew past its cap")
+        self.assertIn(19, seen, "Most recent fingerprint evicted")
+
+    def test_stream_matches_in_memory_cleaning(self):
+        def clean(df):
+            df = df.assign(Score=df["Score"].fillna(0))
+            return df[df["Score"] <= 30]
+
+        stats = stream_clean_csv(self.raw_path, self.prepared_path, clean, chunk_size=3)
+        streamed = pd.read_csv(self.prepared_path)
+        expected = clean(pd.read_csv(self.raw_path).drop_duplicates()).reset_index(drop=True)
+        pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+        self.assertEqual(stats["duplicates_dropped"], 4, "Cross-chunk duplicates not dropped")
+        self.assertEqual(stats["rows_written"], len(expected), "Written row count incorrect")
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_streamed_parquet_matches_csv_export(self):
+        stream_clean_csv(self.raw_path, self.prepared_path, lambda df: df, chunk_size=3, optimize_dtypes=True)
+        export_parquet_from_csv(self.prepared_path, chunk_size=2)
+        from_parquet = read_prepared(self.prepared_path)
+        pd.testing.assert_frame_equal(from_parquet, read_prepared(self.prepared_path, fmt=CSV))
+        filtered = read_prepared(self.prepared_path, columns=["ID"], filters=[("Score", ">=", 25)])
+        self.assertEqual(filtered["ID"].tolist(), [4, 5, 6], "Parquet filters not applied")
+
+    def test_csv_filters_on_unselected_columns(self):
+        stream_clean_csv(self.raw_path, self.prepared_path, lambda df: df, chunk_size=3, optimize_dtypes=True)
+        filtered = read_prepared(self.prepared_path, columns=["ID"], filters=[("Score", ">=", 20)], fmt=CSV)
+        self.assertEqual(list(filtered.columns), ["ID"], "Filter column not projected away")
+        self.assertEqual(filtered["ID"].tolist(), [4, 5, 6], "CSV filters not applied")
+
+    def test_one_schema_for_every_chunk(self):
+        dated = pd.DataFrame({
+            "ID": range(6),
+            "Joined": ["01/02/2024", "01/03/2024", "01/04/2024", "02/01/2024", "unknown", "02/03/2024"],
+            "Seen": ["03/01/2024", "03/02/2024", "03/03/2024", "04/01/2024", "04/02/2024", "04/03/2024"],
+        })
+        dated.to_csv(self.raw_path, index=False)
+        stream_clean_csv(self.raw_path, self.prepared_path, lambda df: df, chunk_size=3, optimize_dtypes=True)
+        prepared = read_prepared(self.prepared_path, fmt=CSV)
+        self.assertEqual(prepared["Joined"].astype(str).tolist(), dated["Joined"].tolist(),
+                         "A date column that fails to parse in one chunk should stay text in all of them")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(prepared["Seen"]), "Dates parsing in every chunk not read as dates")
+        self.assertEqual(prepared["Seen"].iloc[3], pd.Timestamp("2024-04-01"), "Date parsed with the wrong format")
+
+    def test_stream_writes_the_same_file_as_in_memory(self):
+        sales = pd.DataFrame({
+            "TransactionID": range(1, 8),
+            "SaleDate": ["1/6/2024", "1/7/2024", "", "2/1/2024", "2/2/2024", "12/3/2024", "12/4/2024"],
+            "Region": ["East", "West", "East", "West", "East", "West", "East"],
+            "SaleAmount": [10.5, 20.25, 30.5, 40.75, 50.5, 60.25, 70.5],
+        })
+        sales.to_csv(self.raw_path, index=False)
+        stream_clean_csv(self.raw_path, self.prepared_path, lambda df: df, chunk_size=3, optimize_dtypes=True)
+        in_memory_path = self.prepared_path.with_name("in_memory.csv")
+        df = pd.read_csv(self.raw_path)
+        schema = infer_dtype_schema(df)
+        write_csv_with_schema(apply_dtype_schema(df, schema), in_memory_path, schema)
+        self.assertEqual(self.prepared_path.read_text(), in_memory_path.read_text(),
+                         "Streaming and in-memory preparation wrote different files")
+        self.assertEqual(load_dtype_schema(self.prepared_path)["dates"], load_dtype_schema(in_memory_path)["dates"],
+                         "Streaming and in-memory preparation saved different date formats")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+r"""
+tests/test_drill_through.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_drill_through.py
+    python3 tests\test_drill_through.py
+
+This test suite verifies that the drill-through index returns the TransactionIDs of each cube cell.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the drill-through index from the scripts module
+from scripts.olap.drill_through import DrillThroughIndex  # noqa: E402
+
+rng = np.random.default_rng(11)
+transactions_df = pd.DataFrame({
+    "DayOfWeek": rng.integers(0, 7, 2000),
+    "ProductID": rng.integers(101, 109, 2000),
+    "CustomerID": rng.integers(1001, 1012, 2000),
+    "TransactionID": rng.permutation(np.arange(1, 200000, 100))[:2000],
+})
+
+
+class TestDrillThroughIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DrillThroughIndex.from_frame(transactions_df)
+
+    def assert_matches_groups(self, index):
+        groups = transactions_df.groupby(["DayOfWeek", "ProductID", "CustomerID"])["TransactionID"]
+        self.assertEqual(len(index), groups.ngroups, "Cell count differs from the group count")
+        for (day, product, customer), ids in groups:
+            found = index.lookup(DayOfWeek=day, ProductID=product, CustomerID=customer)
+            np.testing.assert_array_equal(found, np.sort(ids.to_numpy()), err_msg=f"IDs differ for {day, product, customer}")
+
+    def test_lookup_returns_sorted_ids_per_cell(self):
+        self.assert_matches_groups(self.index)
+
+    def test_unknown_values_raise(self):
+        with self.assertRaises(KeyError):
+            self.index.lookup(DayOfWeek=3, ProductID=999, CustomerID=1001)
+        with self.assertRaises(KeyError):
+            self.index.lookup(DayOfWeek="Wednesday", ProductID=101, CustomerID=1001)
+        with self.assertRaises(KeyError):
+            self.index.lookup(DayOfWeek=3, ProductID=101)
+
+    def test_values_are_converted_to_the_dimension_type(self):
+        expected = self.index.lookup(DayOfWeek=3, ProductID=101, CustomerID=1001)
+        found = self.index.lookup(DayOfWeek="3", ProductID=np.int16(101), CustomerID=1001.0)
+        np.testing.assert_array_equal(found, expected, err_msg="Cell values given as text or other types not converted")
+
+    def test_warehouse_index_uses_cube_weekday_names(self):
+        conn = sqlite3.connect(":memory:")
+        sales = pd.DataFrame({
+            "TransactionID": [1, 2, 3],
+            "SaleDate": ["2024-01-06", "2024-01-06", "2024-01-07"],  # Saturday, Saturday, Sunday
+            "ProductID": [101, 101, 102],
+            "CustomerID": [1004, 1004, 1005],
+        })
+        sales.to_sql("sales", conn, index=False)
+        index = DrillThroughIndex.from_warehouse(conn)
+        conn.close()
+        cube_row = {"DayOfWeek": "Saturday", "ProductID": "101", "CustomerID": "1004"}  # As read back from olap_cube.csv
+        np.testing.assert_array_equal(index.lookup(**cube_row), [1, 2], err_msg="Cube row not found in the index")
+        with self.assertRaises(KeyError):
+            index.lookup(DayOfWeek="6", ProductID=101, CustomerID=1004)
+
+    def test_deltas_are_smaller_than_ids(self):
+        self.assertEqual(self.index.deltas.dtype, np.uint32, "Gaps not stored in the smallest unsigned type")
+        self.assertLess(self.index.nbytes, transactions_df["TransactionID"].to_numpy().nbytes * 2, "Index too large")
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.index.save(pathlib.Path(tmp).joinpath("cube_transactions.npz"))
+            self.assert_matches_groups(DrillThroughIndex.load(path))
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+r"""
+tests/test_dw_access.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dw_access.py
+    python3 tests\test_dw_access.py
+
+This test suite verifies the tuned, pooled and read-only warehouse connections.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the connection helpers from the scripts module
+from scripts.dw_access import ConnectionPool, close_pools, read_connection, write_connection  # noqa: E402
+
+
+class TestDwAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp.name).joinpath("smart_sales.db")
+        with write_connection(self.db_path) as conn:
+            conn.execute("CREATE TABLE sales (TransactionID INTEGER PRIMARY KEY, SaleAmount REAL);")
+            conn.execute("INSERT INTO sales VALUES (1, 10.0);")
+
+    def tearDown(self):
+        close_pools()
+        self.tmp.cleanup()
+
+    def test_writer_tunes_and_commits(self):
+        with write_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode;").fetchone()[0], "wal", "WAL not enabled")
+            self.assertEqual(conn.execute("PRAGMA temp_store;").fetchone()[0], 2, "temp_store is not MEMORY")
+        with read_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 1, "Write not committed")
+
+    def test_writer_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with write_connection(self.db_path) as conn:
+                conn.execute("INSERT INTO sales VALUES (2, 20.0);")
+                raise ValueError("load failed")
+        with read_connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 1, "Failed write kept")
+
+    def test_read_connection_is_read_only_and_reused(self):
+        with read_connection(self.db_path) as conn:
+            first = conn
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO sales VALUES (3, 30.0);")
+        with read_connection(self.db_path) as conn:
+            self.assertIs(conn, first, "Pooled connection not reused")
+
+    def test_pool_is_bounded_across_threads(self):
+        pool = ConnectionPool(self.db_path, size=2)
+        seen, errors = set(), []
+
+        def read():
+            try:
+                for _ in range(20):
+                    with pool.connection() as conn:
+                        seen.add(id(conn))
+                        conn.execute("SELECT SUM(SaleAmount) FROM sales;").fetchone()
+            except Exception as e:  # surfaced in the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        pool.close()
+        self.assertEqual(errors, [], "Concurrent reads failed")
+        self.assertLessEqual(len(seen), 2, "Pool opened more connections than its size")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+r"""
+tests/test_dw_loader.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_dw_loader.py
+    python3 tests\test_dw_loader.py
+
+This test suite verifies that the bulk loader keeps the warehouse schema and loads atomically.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the bulk loader from the scripts module
+from scripts.create_dw import INDEX_DEFINITIONS, outdated_tables  # noqa: E402
+from scripts.dw_loader import bulk_load_tables, has_unique_key, read_watermark, table_indexes, upsert_tables  # noqa: E402
+
+customers_df = pd.DataFrame({
+    "CustomerID": [1001, 1002],
+    "Name": ["William White", "Wylie Coyote"],
+    "Region": pd.Categorical(["East", None]),
+    "JoinDate": pd.to_datetime(["2021-11-11", "2023-02-14"]),
+    "LoyaltyPoints": [500, 1200],
+    "CustomerSegment": ["Regular", "VIP"],
+})
+products_df = pd.DataFrame({
+    "ProductID": [101], "ProductName": ["laptop"], "Category": ["Electronics"],
+    "UnitPrice": [793.12], "StockQuantity": [12], "StoreSection": ["Electronics"],
+})
+sales_df = pd.DataFrame({
+    "TransactionID": [550, 551],
+    "SaleDate": pd.to_datetime(["2024-01-06", "2024-01-07"]),
+    "CustomerID": [1001, 1002],
+    "ProductID": [101, 101],
+    "StoreID": [404, 403],
+    "CampaignID": [0, 1],
+    "SaleAmount": [39.1, float("nan")],
+    "DiscountPercent": [0, 5],
+    "PaymentType": ["Credit", "Debit"],
+})
+
+
+class TestDwLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.frames = {"customers": customers_df, "products": products_df, "sales": sales_df.fillna({"SaleAmount": 19.78})}
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_load_keeps_schema_and_values(self):
+        loaded = bulk_load_tables(self.conn, self.frames)
+        self.assertEqual(loaded, {"customers": 2, "products": 1, "sales": 2}, "Loaded row counts incorrect")
+        sales_sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'sales';").fetchone()[0]
+        self.assertIn("PRIMARY KEY", sales_sql, "Primary key dropped by the load")
+        self.assertIn("FOREIGN KEY", sales_sql, "Foreign keys dropped by the load")
+        self.assertEqual(set(table_indexes(self.conn, ["sales"])), set(INDEX_DEFINITIONS), "Indexes not rebuilt")
+        self.assertEqual(
+            self.conn.execute("SELECT Region, JoinDate FROM customers ORDER BY CustomerID;").fetchall(),
+            [("East", "2021-11-11"), (None, "2023-02-14")],
+            "Categorical, missing or date values not converted",
+        )
+
+    def test_reload_replaces_rows(self):
+        bulk_load_tables(self.conn, self.frames)
+        bulk_load_tables(self.conn, self.frames)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 2, "Reload duplicated rows")
+
+    def test_failed_load_is_rolled_back(self):
+        bulk_load_tables(self.conn, self.frames)
+        with self.assertRaises(sqlite3.IntegrityError):
+            bulk_load_tables(self.conn, {**self.frames, "sales": sales_df})  # SaleAmount is NOT NULL
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 2, "Failed load not rolled back")
+        self.assertEqual(set(table_indexes(self.conn, ["sales"])), set(INDEX_DEFINITIONS), "Indexes lost on rollback")
+
+    def test_upsert_applies_only_new_or_changed_rows(self):
+        bulk_load_tables(self.conn, self.frames)
+        sales = self.frames["sales"]
+        new_row = sales.iloc[[0]].assign(TransactionID=552, SaleDate=pd.Timestamp("2024-01-09"))
+        changed = pd.concat([sales.assign(PaymentType=["Credit", "Cash"]), new_row], ignore_index=True)
+        applied = upsert_tables(self.conn, {**self.frames, "sales": changed})
+        self.assertEqual(applied, {"customers": 0, "products": 0, "sales": 2}, "Unchanged rows not skipped")
+        self.assertEqual(
+            self.conn.execute("SELECT TransactionID, PaymentType FROM sales ORDER BY TransactionID;").fetchall(),
+            [(550, "Credit"), (551, "Cash"), (552, "Credit")],
+            "Changed row not updated or new row not inserted",
+        )
+        watermark = read_watermark(self.conn, "sales")
+        self.assertEqual((watermark["max_key"], watermark["max_date"], watermark["row_count"]), (552, "2024-01-09", 3))
+        self.assertEqual(upsert_tables(self.conn, {**self.frames, "sales": changed})["sales"], 0, "Repeat run not a no-op")
+
+    def create_legacy_tables(self, frames):
+        """Create the tables as an older DataFrame.to_sql load left them: no keys or constraints, an extra column."""
+        for table, df in frames.items():
+            df.to_sql(table, self.conn, index=False)
+        self.conn.execute("ALTER TABLE sales ADD COLUMN DayOfWeek TEXT;")
+
+    def test_legacy_tables_are_migrated(self):
+        self.create_legacy_tables(self.frames)
+        self.assertFalse(has_unique_key(self.conn, "sales", "TransactionID"), "to_sql table reported as keyed")
+        self.assertEqual(outdated_tables(self.conn), ["customers", "products", "sales"], "Legacy tables not detected")
+        new_row = self.frames["sales"].iloc[[0]].assign(TransactionID=552)
+        applied = upsert_tables(self.conn, {"sales": pd.concat([self.frames["sales"], new_row], ignore_index=True)})
+        self.assertEqual(outdated_tables(self.conn), [], "Legacy tables not migrated")
+        self.assertTrue(has_unique_key(self.conn, "sales", "TransactionID"), "Migrated sales table has no key")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 3, "Rows lost in the migration")
+        self.assertEqual(applied["sales"], 3, "Rows not upserted after the migration")
+
+    def test_migration_refuses_rows_that_break_the_schema(self):
+        self.create_legacy_tables({**self.frames, "sales": pd.concat([self.frames["sales"]] * 2, ignore_index=True)})
+        with self.assertRaises(sqlite3.IntegrityError):
+            upsert_tables(self.conn, self.frames)
+        self.assertIn("sales", outdated_tables(self.conn), "Failed migration not rolled back")
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0], 4, "Legacy rows lost")
+
+    def summary_matches_facts(self):
+        summary = self.conn.execute(
+            "SELECT SaleDate, ProductID, CustomerID, StoreID, DayOfWeek, TotalSales, SalesCount, SumSquares "
+            "FROM sales_daily_summary ORDER BY 1, 2, 3, 4;"
+        ).fetchall()
+        expected = self.conn.execute(
+            "SELECT SaleDate, ProductID, CustomerID, StoreID, strftime('%w', SaleDate), SUM(SaleAmount), COUNT(*), "
+            "SUM(SaleAmount * SaleAmount) FROM sales GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4;"
+        ).fetchall()
+        self.assertEqual(len(summary), len(expected), "Summary group count differs from the facts")
+        for row, want in zip(summary, expected):
+            self.assertEqual(row[:5], want[:5], "Summary keys differ from the facts")
+            for got, value in zip(row[5:], want[5:]):
+                self.assertAlmostEqual(got, value, places=6, msg="Summary measures differ from the facts")
+
+    def test_summary_follows_bulk_and_incremental_loads(self):
+        bulk_load_tables(self.conn, self.frames)
+        self.summary_matches_facts()
+        sales = self.frames["sales"]
+        moved = sales.assign(StoreID=[404, 404], SaleAmount=[39.1, 25.0])
+        new_row = sales.iloc[[0]].assign(TransactionID=552)
+        upsert_tables(self.conn, {"sales": pd.concat([moved, new_row], ignore_index=True)})
+        self.summary_matches_facts()
+        self.conn.execute("DELETE FROM sales WHERE TransactionID = 551;")
+        self.summary_matches_facts()
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
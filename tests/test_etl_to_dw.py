@@ -0,0 +1,90 @@
+r"""
+tests/test_etl_to_dw.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_etl_to_dw.py
+    python3 tests\test_etl_to_dw.py
+
+This test suite verifies that the ETL loads the prepared data into a warehouse
+left by an older to_sql load, that the OLAP queries use indexes afterwards, and
+that a failed load is reported as a failure.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the ETL from the scripts module
+from scripts import etl_to_dw  # noqa: E402
+from scripts.olap.olap_indexes import check_query_plans  # noqa: E402
+from scripts.prepared_io import CSV, read_prepared  # noqa: E402
+
+PREPARED_FILES = [PROJECT_ROOT.joinpath(path) for path in etl_to_dw.PREPARED_FILES]
+
+
+class TestEtlToDw(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp.name).joinpath("smart_sales.db")
+        self.patches = [
+            mock.patch.object(etl_to_dw, "DB_PATH", self.db_path),
+            mock.patch.object(etl_to_dw, "SNAPSHOT_DIR", pathlib.Path(self.tmp.name).joinpath("sales_columns")),
+            mock.patch.object(etl_to_dw, "PREPARED_FILES", PREPARED_FILES),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp.cleanup()
+
+    def create_legacy_warehouse(self):
+        """Write the prepared tables the way the original to_sql ETL did, with the last sale not loaded yet."""
+        with sqlite3.connect(self.db_path) as conn:
+            for table, csv_path in zip(("customers", "products", "sales"), PREPARED_FILES):
+                df = read_prepared(csv_path, fmt=CSV)
+                (df.iloc[:-1] if table == "sales" else df).to_sql(table, conn, index=False)
+        conn.close()
+
+    def test_incremental_load_of_legacy_warehouse(self):
+        self.create_legacy_warehouse()
+        etl_to_dw.load_data_to_db.uncached(incremental=True)
+        with sqlite3.connect(self.db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM sales;").fetchone()[0]
+        conn.close()
+        expected = len(pd.read_csv(PREPARED_FILES[2]))
+        self.assertEqual(count, expected, "New sale not loaded into the legacy warehouse")
+
+    def test_olap_plans_after_loading_legacy_warehouse(self):
+        self.create_legacy_warehouse()
+        for incremental in (True, False):
+            etl_to_dw.load_data_to_db.uncached(incremental=incremental)
+            with sqlite3.connect(self.db_path) as conn:
+                problems = check_query_plans(conn)
+            conn.close()
+            self.assertEqual(problems, {}, f"OLAP query plan scans the warehouse after an incremental={incremental} load")
+
+    def test_failed_load_exits_non_zero(self):
+        with mock.patch.object(etl_to_dw, "read_prepared", side_effect=FileNotFoundError("missing.csv")), \
+                mock.patch.object(sys, "argv", ["etl_to_dw.py", "--incremental"]):
+            with self.assertRaises(SystemExit) as raised:
+                etl_to_dw.main()
+        self.assertEqual(raised.exception.code, 1, "A failed load should exit with status 1")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,113 @@
+r"""
+tests/test_fact_snapshot.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_fact_snapshot.py
+    python3 tests\test_fact_snapshot.py
+
+This test suite verifies that the columnar sales snapshot round-trips the sales table
+and that analytics give the same results from it as from the rows.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the snapshot writer and reader from the scripts module
+from scripts.dw_loader import bulk_load_tables, upsert_tables  # noqa: E402
+from scripts.fact_snapshot import FactTableReader, write_table_snapshot  # noqa: E402
+from scripts.olap.product_performance_by_day import (  # noqa: E402
+    create_product_performance_cube,
+    create_product_performance_cube_from_snapshot,
+)
+
+rng = np.random.default_rng(9)
+customers_df = pd.DataFrame({"CustomerID": range(1001, 1011), "Name": [f"Customer {i}" for i in range(10)]})
+products_df = pd.DataFrame({"ProductID": range(101, 106), "ProductName": [f"Product {i}" for i in range(5)]})
+sales_df = pd.DataFrame({
+    "TransactionID": np.arange(1, 301),
+    "SaleDate": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, 300), unit="D")).strftime("%Y-%m-%d"),
+    "CustomerID": rng.integers(1001, 1011, 300),
+    "ProductID": rng.integers(101, 106, 300),
+    "StoreID": rng.choice([401, 402], 300),
+    "CampaignID": rng.choice([0.0, 1.0, np.nan], 300),
+    "SaleAmount": rng.uniform(5, 500, 300).round(2),
+    "PaymentType": rng.choice(["Credit", "Debit", None], 300),
+})
+
+
+class TestFactSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot_dir = pathlib.Path(self.tmp.name).joinpath("sales_columns")
+        self.conn = sqlite3.connect(pathlib.Path(self.tmp.name).joinpath("smart_sales.db"))
+        self.frames = {"customers": customers_df, "products": products_df, "sales": sales_df}
+        bulk_load_tables(self.conn, self.frames)
+        write_table_snapshot(self.conn, "sales", self.snapshot_dir, chunk_size=70)
+        self.reader = FactTableReader(self.snapshot_dir)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_columns_are_memory_mapped_with_snapshot_dtypes(self):
+        self.assertEqual(len(self.reader), len(sales_df), "Row count differs")
+        self.assertIsInstance(self.reader["SaleAmount"], np.memmap, "Column is not memory-mapped")
+        self.assertFalse(self.reader["SaleAmount"].flags.writeable, "Column is writable")
+        self.assertEqual(self.reader["SaleDate"].dtype, np.dtype("datetime64[D]"), "SaleDate not stored as dates")
+        self.assertEqual(self.reader["CampaignID"].dtype, np.float64, "Nullable integer not stored as float")
+
+    def test_round_trip(self):
+        frame = self.reader.to_frame(["TransactionID", "SaleAmount", "CampaignID", "PaymentType"])
+        expected = sales_df[["TransactionID", "SaleAmount", "CampaignID", "PaymentType"]]
+        pd.testing.assert_frame_equal(frame, expected, check_dtype=False, obj="Snapshot")
+        np.testing.assert_array_equal(
+            self.reader["SaleDate"], sales_df["SaleDate"].to_numpy(dtype="datetime64[D]"), err_msg="SaleDate differs"
+        )
+
+    def test_product_performance_matches_rows(self):
+        pd.testing.assert_frame_equal(
+            create_product_performance_cube_from_snapshot(self.reader),
+            create_product_performance_cube(sales_df),
+            obj="Product performance cube",
+        )
+
+    def test_snapshot_goes_stale_after_a_load(self):
+        self.assertTrue(self.reader.is_current(self.conn), "Fresh snapshot reported stale")
+        upsert_tables(self.conn, {**self.frames, "sales": sales_df.assign(SaleAmount=sales_df["SaleAmount"] + 1)})
+        self.assertFalse(self.reader.is_current(self.conn), "Snapshot not stale after new data")
+        write_table_snapshot(self.conn, "sales", self.snapshot_dir)
+        self.assertTrue(FactTableReader(self.snapshot_dir).is_current(self.conn), "Rewritten snapshot stale")
+
+    def test_unchanged_load_keeps_snapshot(self):
+        manifest = self.snapshot_dir.joinpath("manifest.json")
+        before = manifest.stat().st_mtime_ns
+        upsert_tables(self.conn, self.frames)  # nothing changed, so the data version stays
+        write_table_snapshot(self.conn, "sales", self.snapshot_dir)
+        self.assertEqual(manifest.stat().st_mtime_ns, before, "Snapshot rewritten though the data version is unchanged")
+
+    def test_snapshot_goes_stale_when_database_is_recreated(self):
+        db_path = pathlib.Path(self.tmp.name).joinpath("smart_sales.db")
+        self.conn.close()
+        db_path.unlink()
+        self.conn = sqlite3.connect(db_path)
+        bulk_load_tables(self.conn, self.frames)
+        self.assertEqual(self.reader.data_version, 1, "Both databases should be at data version 1")
+        self.assertFalse(self.reader.is_current(self.conn), "Snapshot of the replaced database reported current")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+r"""
+tests/test_olap_indexes.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_olap_indexes.py
+    python3 tests\test_olap_indexes.py
+
+This test suite verifies that every shipped OLAP query is served by an index,
+without a full table scan or a temp B-tree.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the index helpers from the scripts module
+from scripts.create_dw import create_tables  # noqa: E402
+from scripts.dw_summary import create_summary_tables  # noqa: E402
+from scripts.olap.olap_indexes import check_query_plans, ensure_olap_indexes, plan_problems  # noqa: E402
+
+
+class TestOlapIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        create_tables(self.conn)
+        create_summary_tables(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_shipped_queries_use_indexes(self):
+        self.assertTrue(ensure_olap_indexes(self.conn), "No OLAP index created")
+        self.assertEqual(check_query_plans(self.conn), {}, "OLAP query plan falls back to a scan or temp B-tree")
+        self.assertEqual(ensure_olap_indexes(self.conn), [], "Existing OLAP index created again")
+
+    def test_legacy_sales_table_uses_indexes(self):
+        legacy = sqlite3.connect(":memory:")
+        legacy.execute("CREATE TABLE sales (TransactionID INTEGER, SaleDate TEXT, CustomerID INTEGER, "
+                       "ProductID INTEGER, SaleAmount REAL, DayOfWeek TEXT);")  # No rowid alias, as to_sql wrote it
+        create_summary_tables(legacy)
+        ensure_olap_indexes(legacy)
+        self.assertEqual(check_query_plans(legacy), {}, "OLAP query plan scans a sales table without a rowid key")
+        legacy.close()
+
+    def test_outdated_index_is_replaced(self):
+        self.conn.execute("CREATE INDEX idx_sales_weekday_product_customer ON sales (strftime('%w', SaleDate));")
+        self.assertEqual(ensure_olap_indexes(self.conn), ["idx_sales_weekday_product_customer"],
+                         "Outdated OLAP index not rebuilt")
+        self.assertEqual(check_query_plans(self.conn), {}, "OLAP query plan uses the outdated index")
+
+    def test_check_fails_without_indexes(self):
+        problems = check_query_plans(self.conn)
+        self.assertIn("drill_through", problems, "Missing index not reported")
+        self.assertIn("SCAN sales", problems["drill_through"], "Full table scan not reported")
+
+    def test_covering_index_scan_is_not_a_problem(self):
+        plan = ["SCAN sales USING COVERING INDEX idx_sales_weekday_product_customer"]
+        self.assertEqual(plan_problems(plan), [], "Covering index scan reported as a problem")
+        self.assertEqual(plan_problems(["SCAN sales"]), ["SCAN sales"], "Full table scan not reported")
+        index_scan = ["SCAN sales USING INDEX idx_sales_product_id"]
+        self.assertEqual(plan_problems(index_scan), index_scan, "Full scan of a non-covering index not reported")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+r"""
+tests/test_orchestrator.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_orchestrator.py
+    python3 tests\test_orchestrator.py
+
+This test suite verifies that the pipeline orchestrator orders, parallelizes and skips stages.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import time
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the orchestrator from the scripts module
+from scripts.orchestrator import (  # noqa: E402
+    BLOCKED, FAILED, PIPELINE_STAGES, RAN, SKIPPED,
+    PipelineRunner, Stage, critical_path, stage_dependencies, stage_fingerprint,
+)
+
+
+def upper_copy(source, target, delay=0.0):
+    time.sleep(delay)
+    pathlib.Path(target).write_text(pathlib.Path(source).read_text().upper())
+
+
+def concatenate(first, second, target):
+    pathlib.Path(target).write_text(pathlib.Path(first).read_text() + pathlib.Path(second).read_text())
+
+
+def fail():
+    raise RuntimeError("stage failed")
+
+
+def leave_current_outputs(*args):
+    pass  # outputs already current, as when a script's own stage cache skips the work
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmp.name)
+        for name in ("a.txt", "b.txt"):
+            self.root.joinpath(name).write_text(name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def stages(self, delay=0.0):
+        path = lambda name: str(self.root.joinpath(name))  # noqa: E731
+        return [
+            Stage("join", inputs=["a_up.txt", "b_up.txt"], outputs=["ab.txt"],
+                  func=concatenate, args=[path("a_up.txt"), path("b_up.txt"), path("ab.txt")]),
+            Stage("upper_a", inputs=["a.txt"], outputs=["a_up.txt"],
+                  func=upper_copy, args=[path("a.txt"), path("a_up.txt"), delay]),
+            Stage("upper_b", inputs=["b.txt"], outputs=["b_up.txt"],
+                  func=upper_copy, args=[path("b.txt"), path("b_up.txt"), delay]),
+        ]
+
+    def run_pipeline(self, stages=None, **kwargs):
+        runner = PipelineRunner(stages or self.stages(), workers=2, state_file=self.root.joinpath("state.json"),
+                                root=self.root, **kwargs)
+        return {name: result.status for name, result in runner.run().items()}
+
+    def test_runs_in_dependency_order(self):
+        self.assertEqual(self.run_pipeline(), {"upper_a": RAN, "upper_b": RAN, "join": RAN}, "Not every stage ran")
+        self.assertEqual(self.root.joinpath("ab.txt").read_text(), "A.TXTB.TXT", "Stages ran out of order")
+
+    def test_unchanged_inputs_are_skipped(self):
+        self.run_pipeline()
+        self.assertEqual(set(self.run_pipeline().values()), {SKIPPED}, "Unchanged stages ran again")
+        self.root.joinpath("b.txt").write_text("changed")
+        statuses = self.run_pipeline()
+        self.assertEqual(statuses, {"upper_a": SKIPPED, "upper_b": RAN, "join": RAN}, "Wrong stages re-ran")
+        self.assertEqual(set(self.run_pipeline(force=True).values()), {RAN}, "--force did not run every stage")
+
+    def test_independent_stages_run_concurrently(self):
+        started = time.perf_counter()
+        self.run_pipeline(self.stages(delay=0.5))
+        self.assertLess(time.perf_counter() - started, 0.95, "Independent stages ran one after the other")
+
+    def test_failure_blocks_downstream_stages(self):
+        stages = self.stages()
+        stages[1] = Stage("upper_a", inputs=["a.txt"], outputs=["a_up.txt"], func=fail)
+        statuses = self.run_pipeline(stages)
+        self.assertEqual(statuses, {"upper_a": FAILED, "upper_b": RAN, "join": BLOCKED}, "Failure not contained")
+
+    def test_stage_that_leaves_current_outputs_is_recorded(self):
+        self.root.joinpath("a_up.txt").write_text("A.TXT")
+        stages = [Stage("upper_a", inputs=["a.txt"], outputs=["a_up.txt"], func=leave_current_outputs)]
+        self.assertEqual(self.run_pipeline(stages), {"upper_a": RAN})
+        self.assertEqual(self.run_pipeline(stages), {"upper_a": SKIPPED}, "Successful run without new outputs not recorded")
+
+    def test_failing_script_is_not_recorded(self):
+        self.root.joinpath("fail.py").write_text("import sys\nsys.exit(1)\n")
+        self.root.joinpath("out.txt").write_text("stale")
+        stages = [Stage("fail", script="fail.py", inputs=["a.txt"], outputs=["out.txt"])]
+        self.assertEqual(self.run_pipeline(stages), {"fail": FAILED}, "Non-zero exit not reported as a failure")
+        self.assertEqual(self.run_pipeline(stages), {"fail": FAILED}, "Failed run recorded as done")
+
+    def test_fingerprint_covers_imported_modules(self):
+        package = self.root.joinpath("helpers")
+        package.mkdir()
+        package.joinpath("__init__.py").write_text("")
+        package.joinpath("loader.py").write_text("from helpers.cleaning import clean\n")
+        package.joinpath("cleaning.py").write_text("def clean(df):\n    return df\n")
+        self.root.joinpath("etl.py").write_text("import json\nfrom helpers import loader\n")
+        stage = Stage("etl", script="etl.py", inputs=["a.txt"], outputs=["out.txt"])
+        before = stage_fingerprint(stage, self.root)
+        package.joinpath("cleaning.py").write_text("def clean(df):\n    return df.dropna()\n")
+        self.assertNotEqual(stage_fingerprint(stage, self.root), before,
+                            "Editing a module imported through another module did not change the fingerprint")
+
+    def test_cycles_are_rejected(self):
+        stages = [Stage("x", inputs=["y.txt"], outputs=["x.txt"]), Stage("y", inputs=["x.txt"], outputs=["y.txt"])]
+        with self.assertRaises(ValueError):
+            stage_dependencies(stages)
+
+    def test_critical_path_ends_with_last_stage(self):
+        runner = PipelineRunner(self.stages(), workers=2, state_file=self.root.joinpath("state.json"), root=self.root)
+        path = [result.name for result in critical_path(runner.run())]
+        self.assertEqual(path[-1], "join", "Critical path does not end with the last stage")
+        self.assertIn(path[0], ("upper_a", "upper_b"), "Critical path does not start at a source stage")
+
+    def test_shipped_pipeline_is_a_dag(self):
+        dependencies = stage_dependencies(PIPELINE_STAGES)
+        self.assertEqual(
+            dependencies["etl_to_dw"],
+            ["create_dw", "prepare_customers", "prepare_products", "prepare_sales"],
+            "ETL does not wait for the prepare stages and the schema",
+        )
+        self.assertEqual(dependencies["prepare_sales"], [], "Prepare stages are not independent")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+r"""
+tests/test_pandas_engine.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_pandas_engine.py
+    python3 tests\test_pandas_engine.py
+
+This test suite verifies that the runtime profile picks the engine and Spark
+settings from the input size, and that the pandas engine computes the same
+outputs as the Spark pipeline steps.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the engine and the runtime profile from the scripts module
+from scripts import pandas_engine  # noqa: E402
+from scripts.grouping_sets import SALES_CUBE_VIEWS, grouping_id_for  # noqa: E402
+from scripts.runtime_profile import ENGINE_FUNCTIONS, PANDAS, SPARK, choose_profile, load_engine  # noqa: E402
+
+GIB = 1024 ** 3
+
+
+class TestRuntimeProfile(unittest.TestCase):
+
+    def test_small_input_runs_on_pandas(self):
+        """Test that data fitting in memory picks the pandas engine."""
+        profile = choose_profile(10 * 1024 ** 2, cores=4, memory_bytes=16 * GIB, engine=None)
+        self.assertEqual(profile.engine, PANDAS)
+        self.assertEqual(profile.shuffle_partitions, 4, "Tiny inputs should use one partition per core, not 200.")
+
+    def test_large_input_sizes_spark(self):
+        """Test that data larger than memory picks Spark with partitions and driver memory sized to it."""
+        with mock.patch("scripts.runtime_profile.spark_available", return_value=True):
+            profile = choose_profile(64 * GIB, cores=8, memory_bytes=16 * GIB)
+        self.assertEqual(profile.engine, SPARK)
+        self.assertEqual(profile.shuffle_partitions, 512, "Partitions should be about 128 MiB of input each.")
+        self.assertEqual(profile.driver_memory, f"{12 * 1024}m", "Driver memory should be capped below the machine's.")
+        self.assertTrue(profile.adaptive)
+
+    def test_engine_override(self):
+        """Test that an explicit engine wins and an unknown one is rejected."""
+        self.assertEqual(choose_profile(1, engine=SPARK).engine, SPARK)
+        with self.assertRaises(ValueError):
+            choose_profile(1, engine="dask")
+
+    def test_pandas_engine_has_every_function(self):
+        """Test that the pandas engine provides the full step1-step3 interface."""
+        engine = load_engine(PANDAS)
+        for name in ENGINE_FUNCTIONS:
+            self.assertTrue(hasattr(engine, name), f"The pandas engine is missing {name}.")
+
+    def test_pandas_engine_runs_transforms_on_the_chosen_backend(self):
+        """Test that the backend chosen for step0 reaches the pandas engine's transforms."""
+        engine = load_engine(PANDAS, "polars")
+        result = pd.DataFrame({"ProductID": [1], "sum(Count)": [2.0]})
+        with mock.patch.object(pandas_engine.backends, "calculate_sales_count", return_value=result) as transform:
+            engine.calculate_sales_count("products", "sales")
+        transform.assert_called_once_with("products", "sales", "polars")
+
+
+class TestPandasEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.products = pd.DataFrame({"ProductID": [1, 2], "UnitPrice": [10.0, 5.0]})
+        self.sales = pd.DataFrame({
+            # Sunday, Monday and Saturday in January, and a Monday in February
+            "SaleDate": pd.to_datetime(["2024-01-07", "2024-01-08", "2024-01-13", "2024-02-05"]),
+            "ProductID": [1, 2, 1, 2],
+            "StoreID": [401, 402, 401, 401],
+            "SaleAmount": [20.0, 15.0, 10.0, 5.0],
+        })
+
+    def test_day_of_week_numbered_like_spark(self):
+        """Test that DayOfWeek runs from 1 (Sunday) to 7 (Saturday), as Spark's dayofweek does."""
+        dated = pandas_engine.with_date_parts(self.sales)
+        self.assertEqual(dated["DayOfWeek"].tolist(), [1, 2, 7, 2])
+
+    def test_sales_count(self):
+        """Test that the sales count per product sums amount over unit price."""
+        counts = pandas_engine.calculate_sales_count(self.products, self.sales)
+        self.assertEqual(dict(zip(counts["ProductID"], counts["sum(Count)"])), {1: 3.0, 2: 4.0})
+
+    def test_grouping_sets_split_into_views(self):
+        """Test that each view of the grouping sets result matches its own groupBy."""
+        cubed = pandas_engine.cube_sales_grouping_sets(self.sales)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = pathlib.Path(temp_dir)
+            pandas_engine.save_grouping_sets(cubed, output_dir, SALES_CUBE_VIEWS)
+            by_date = pd.read_csv(output_dir.joinpath("cubed_sales_by_date.csv"))
+            by_store = pd.read_csv(output_dir.joinpath("cubed_sales_by_date_and_store.csv"))
+        self.assertEqual(list(by_date.columns), ["Year", "Month", "DayOfWeek", "TotalSales"])
+        self.assertEqual(len(by_date), 4)
+        self.assertEqual(len(by_store), 4)
+        self.assertAlmostEqual(by_date["TotalSales"].sum(), self.sales["SaleAmount"].sum())
+
+        expected = pandas_engine.cube_sales_by_date_and_store(self.sales)
+        gid = grouping_id_for(SALES_CUBE_VIEWS["cubed_sales_by_date_and_store"], ["Year", "Month", "DayOfWeek", "StoreID"])
+        self.assertEqual(gid, 0, "The finest view groups by every column, so no grouping bits are set.")
+        self.assertEqual(sorted(by_store["TotalSales"]), sorted(expected["TotalSales"]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+r"""
+tests/test_parallel_cube.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_parallel_cube.py
+    python3 tests\test_parallel_cube.py
+
+This test suite verifies that the parallel cube build gives the same aggregates for
+every partitioning and worker count.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the parallel cube build from the scripts module
+from scripts.create_dw import create_tables  # noqa: E402
+from scripts.olap.parallel_cube import build_cube_parallel, date_partitions, partial_query, product_partitions  # noqa: E402
+
+rng = np.random.default_rng(5)
+sales_df = pd.DataFrame({
+    "TransactionID": np.arange(1, 801),
+    "SaleDate": (pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90, 800), unit="D")).strftime("%Y-%m-%d"),
+    "CustomerID": rng.integers(1001, 1012, 800),
+    "ProductID": rng.integers(101, 109, 800),
+    "StoreID": rng.choice([401, 402, 403], 800),
+    "SaleAmount": rng.uniform(5, 500, 800).round(2),
+})
+
+
+class TestParallelCube(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.db_path = pathlib.Path(cls.tmp.name).joinpath("smart_sales.db")
+        with sqlite3.connect(cls.db_path) as conn:
+            create_tables(conn)
+            sales_df.to_sql("sales", conn, if_exists="append", index=False)
+        conn.close()
+
+        facts = sales_df.assign(DayOfWeek=pd.to_datetime(sales_df["SaleDate"]).dt.strftime("%w"))
+        grouped = facts.groupby(["DayOfWeek", "ProductID", "StoreID"])["SaleAmount"]
+        cls.expected = pd.DataFrame({
+            "TotalSales": grouped.sum(),
+            "SalesCount": grouped.count(),
+            "SumSquares": facts.assign(Square=facts["SaleAmount"] ** 2)
+                .groupby(["DayOfWeek", "ProductID", "StoreID"])["Square"].sum(),
+            "MinSale": grouped.min(),
+            "MaxSale": grouped.max(),
+        }).reset_index()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def assert_matches_facts(self, cube):
+        pd.testing.assert_frame_equal(cube, self.expected, check_dtype=False, obj="Parallel cube")
+
+    def test_date_partitions_in_process(self):
+        cube = build_cube_parallel(self.db_path, ("DayOfWeek", "ProductID", "StoreID"), workers=1, n_partitions=5)
+        self.assert_matches_facts(cube)
+
+    def test_product_partitions_on_process_pool(self):
+        cube = build_cube_parallel(
+            self.db_path, ("DayOfWeek", "ProductID", "StoreID"), workers=2, partition_by="product"
+        )
+        self.assert_matches_facts(cube)
+
+    def test_partitions_cover_every_row_once(self):
+        for split in (date_partitions, product_partitions):
+            with self.subTest(split=split.__name__), sqlite3.connect(self.db_path) as conn:
+                partitions = split(conn, 4)
+                counts = [conn.execute(f"SELECT COUNT(*) FROM sales WHERE {where};", params).fetchone()[0]
+                          for where, params in partitions]
+            conn.close()
+            self.assertEqual(sum(counts), len(sales_df), "Partitions overlap or miss rows")
+            self.assertLess(max(counts) - min(counts), len(sales_df) // 4, "Partitions are unbalanced")
+
+    def test_product_partitions_search_the_index(self):
+        with sqlite3.connect(self.db_path) as conn:
+            partitions = product_partitions(conn, 4)
+            plans = [" ".join(row[3] for row in conn.execute(
+                         f"EXPLAIN QUERY PLAN {partial_query(('ProductID',), where)}", params))
+                     for where, params in partitions]
+        conn.close()
+        for plan in plans:
+            self.assertIn("SEARCH sales USING", plan, f"Partition scans the whole table: {plan}")
+
+    def test_grand_total(self):
+        total = build_cube_parallel(self.db_path, (), workers=1, n_partitions=3)
+        self.assertAlmostEqual(total["TotalSales"].iloc[0], sales_df["SaleAmount"].sum(), places=6)
+        self.assertEqual(total["MaxSale"].iloc[0], sales_df["SaleAmount"].max(), "Maximum not combined")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
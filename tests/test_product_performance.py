@@ -0,0 +1,79 @@
+r"""
+tests/test_product_performance.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_product_performance.py
+    python3 tests\test_product_performance.py
+
+This test suite verifies that the vectorized product performance cube matches a pandas groupby,
+whether the sales rows arrive at once or in chunks.
+"""
+
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the cube builders from the scripts module
+from scripts.olap.product_performance_by_day import (  # noqa: E402
+    create_product_performance_cube,
+    create_product_performance_cube_from_chunks,
+)
+
+rng = np.random.default_rng(3)
+dates = pd.Timestamp("1969-12-01") + pd.to_timedelta(rng.integers(0, 900, 1000), unit="D")
+sales_df = pd.DataFrame({
+    "TransactionID": np.arange(1000),
+    "SaleDate": dates.strftime("%Y-%m-%d"),
+    "ProductID": rng.integers(101, 109, 1000),
+    "SaleAmount": rng.uniform(5, 500, 1000).round(2),
+})
+sales_df.loc[[5, 17], "SaleDate"] = "not a date"
+
+
+def expected_cube(df):
+    df = df.assign(SaleDate=pd.to_datetime(df["SaleDate"], errors="coerce"))
+    df["DayOfWeek"] = df["SaleDate"].dt.day_name()
+    return df.groupby(["DayOfWeek", "ProductID"]).agg(
+        TotalSales=("SaleAmount", "sum"),
+        AvgSales=("SaleAmount", "mean"),
+        SalesCount=("TransactionID", "count"),
+    ).reset_index()
+
+
+class TestProductPerformanceCube(unittest.TestCase):
+
+    def assert_cube_equal(self, cube, expected):
+        pd.testing.assert_frame_equal(cube, expected, check_dtype=False, obj="Product performance cube")
+
+    def test_matches_groupby(self):
+        self.assert_cube_equal(create_product_performance_cube(sales_df.copy()), expected_cube(sales_df))
+
+    def test_chunks_accumulate(self):
+        # Later chunks bring products the first chunk has not seen
+        ordered = sales_df.sort_values("ProductID", ignore_index=True)
+        chunks = [ordered.iloc[start:start + 150] for start in range(0, len(ordered), 150)]
+        self.assert_cube_equal(create_product_performance_cube_from_chunks(chunks), expected_cube(sales_df))
+
+    def test_sales_without_amount_still_counted(self):
+        df = sales_df.copy()
+        df.loc[[2, 40, 41], "SaleAmount"] = np.nan
+        self.assert_cube_equal(create_product_performance_cube(df), expected_cube(df))
+
+    def test_input_is_not_modified(self):
+        df = sales_df.copy()
+        create_product_performance_cube(df)
+        pd.testing.assert_frame_equal(df, sales_df, obj="Sales input")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
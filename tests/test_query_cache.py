@@ -0,0 +1,114 @@
+r"""
+tests/test_query_cache.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_query_cache.py
+    python3 tests\test_query_cache.py
+
+This test suite verifies that cached query results are reused until an ETL load
+bumps the warehouse data version.
+"""
+
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the query cache from the scripts module
+from scripts.dw_loader import bulk_load_tables, read_data_version, upsert_tables  # noqa: E402
+from scripts.prepared_io import parquet_available  # noqa: E402
+from scripts.query_cache import QueryCache, normalize_sql  # noqa: E402
+
+customers_df = pd.DataFrame({"CustomerID": [1001, 1002], "Name": ["William White", "Wylie Coyote"]})
+products_df = pd.DataFrame({"ProductID": [101], "ProductName": ["laptop"]})
+sales_df = pd.DataFrame({
+    "TransactionID": [550, 551],
+    "SaleDate": ["2024-01-06", "2024-01-07"],
+    "CustomerID": [1001, 1002],
+    "ProductID": [101, 101],
+    "StoreID": [404, 403],
+    "SaleAmount": [39.1, 19.78],
+})
+TOTAL_QUERY = "SELECT SUM(SaleAmount) AS TotalSales FROM sales;"
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = pathlib.Path(self.tmp.name).joinpath("cache")
+        self.conn = sqlite3.connect(pathlib.Path(self.tmp.name).joinpath("smart_sales.db"))
+        self.frames = {"customers": customers_df, "products": products_df, "sales": sales_df}
+        bulk_load_tables(self.conn, self.frames)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def test_normalize_sql_keeps_string_literals(self):
+        self.assertEqual(normalize_sql("SELECT  *\n FROM sales ;"), "SELECT * FROM sales", "Whitespace not collapsed")
+        self.assertEqual(normalize_sql("SELECT 'a  b';"), "SELECT 'a  b'", "String literal changed")
+
+    def test_repeated_query_is_served_from_memory(self):
+        cache = QueryCache(self.cache_dir)
+        first = cache.read_sql(TOTAL_QUERY, self.conn)
+        first["TotalSales"] = 0.0  # callers get copies
+        second = cache.read_sql("SELECT SUM(SaleAmount) AS TotalSales\n  FROM sales", self.conn)
+        self.assertEqual((cache.hits, cache.misses), (1, 1), "Normalized query not served from the cache")
+        self.assertAlmostEqual(second["TotalSales"].iloc[0], 58.88, msg="Cached result was modified by a caller")
+
+    def test_load_bumps_version_and_invalidates(self):
+        cache = QueryCache(self.cache_dir)
+        cache.read_sql(TOTAL_QUERY, self.conn)
+        self.assertEqual(read_data_version(self.conn), 1, "Bulk load did not set the data version")
+
+        upsert_tables(self.conn, self.frames)
+        self.assertEqual(read_data_version(self.conn), 1, "Load without changes bumped the data version")
+
+        changed = {**self.frames, "sales": sales_df.assign(SaleAmount=[40.0, 20.0])}
+        upsert_tables(self.conn, changed)
+        self.assertEqual(read_data_version(self.conn), 2, "Upsert with changes did not bump the data version")
+        result = cache.read_sql(TOTAL_QUERY, self.conn)
+        self.assertEqual(cache.misses, 2, "Result from the previous data version reused")
+        self.assertAlmostEqual(result["TotalSales"].iloc[0], 60.0, msg="Stale result returned")
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_disk_tier_survives_a_new_cache(self):
+        QueryCache(self.cache_dir).read_sql(TOTAL_QUERY, self.conn)
+        cache = QueryCache(self.cache_dir)
+        cache.read_sql(TOTAL_QUERY, self.conn)
+        self.assertEqual((cache.hits, cache.misses), (1, 0), "Result not read from the disk tier")
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_recreated_database_is_not_served_old_results(self):
+        QueryCache(self.cache_dir).read_sql(TOTAL_QUERY, self.conn)
+        db_path = pathlib.Path(self.tmp.name).joinpath("smart_sales.db")
+        self.conn.close()
+        db_path.unlink()
+        self.conn = sqlite3.connect(db_path)
+        bulk_load_tables(self.conn, {**self.frames, "sales": sales_df.assign(SaleAmount=[99.0, 1.0])})
+        self.assertEqual(read_data_version(self.conn), 1, "Recreated database should restart at version 1")
+        result = QueryCache(self.cache_dir).read_sql(TOTAL_QUERY, self.conn)
+        self.assertAlmostEqual(result["TotalSales"].iloc[0], 100.0, msg="Result of the replaced database returned")
+
+    @unittest.skipUnless(parquet_available(), "pyarrow is not installed")
+    def test_disk_tier_is_size_bounded(self):
+        cache = QueryCache(self.cache_dir, max_memory_entries=1, max_disk_bytes=1)
+        cache.read_sql(TOTAL_QUERY, self.conn)
+        cache.read_sql("SELECT COUNT(*) AS SalesCount FROM sales;", self.conn)
+        self.assertLessEqual(len(list(self.cache_dir.glob("*.parquet"))), 1, "Disk tier not evicted")
+        self.assertEqual(len(cache.memory), 1, "Memory tier not evicted")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
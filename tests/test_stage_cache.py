@@ -0,0 +1,179 @@
+r"""
+tests/test_stage_cache.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_stage_cache.py
+    python3 tests\test_stage_cache.py
+
+This test suite verifies that cached pipeline stages are skipped while their
+inputs, arguments and code are unchanged, and that their outputs are restored
+from the content-addressed store.
+"""
+
+import unittest
+import os
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the stage cache from the scripts module
+from scripts.stage_cache import DISABLE_ENV, StageCache, cached_stage  # noqa: E402
+
+
+class TestStageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.temp_dir.name)
+        self.cache = StageCache(self.root.joinpath("cache"))
+        self.raw = self.root.joinpath("raw.csv")
+        self.prepared = self.root.joinpath("prepared.csv")
+        self.raw.write_text("a,b\n1,2\n3,4\n")
+        self.calls = []
+
+        @cached_stage(inputs=[self.raw], outputs=[self.prepared], cache=self.cache)
+        def prepare(scale: int = 1) -> int:
+            self.calls.append(scale)
+            rows = self.raw.read_text().splitlines()
+            self.prepared.write_text("\n".join(rows * scale))
+            return len(rows) * scale
+
+        self.prepare = prepare
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_stage_is_skipped(self):
+        """Test that a second call with the same inputs returns the cached value without running."""
+        self.assertEqual(self.prepare(), 3)
+        self.assertEqual(self.prepare(), 3, "The cached return value should be returned.")
+        self.assertEqual(self.calls, [1], "The stage should run only once.")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_changed_input_or_argument_reruns(self):
+        """Test that new input content or a different argument is a cache miss."""
+        self.prepare()
+        self.prepare(scale=2)
+        self.prepare(2)  # same call as above, passed positionally
+        self.raw.write_text("a,b\n5,6\n")
+        self.assertEqual(self.prepare(), 2)
+        self.assertEqual(self.calls, [1, 2, 1], "Only new arguments or inputs should run the stage.")
+
+    def test_outputs_restored_from_store(self):
+        """Test that a hit brings back a deleted or modified output."""
+        self.prepare()
+        expected = self.prepared.read_text()
+        self.prepared.unlink()
+        self.prepare()
+        self.assertEqual(self.prepared.read_text(), expected, "A deleted output should be restored.")
+        self.prepared.write_text("edited")
+        self.prepare()
+        self.assertEqual(self.prepared.read_text(), expected, "A modified output should be restored.")
+        self.assertEqual(self.calls, [1], "Restoring outputs should not run the stage.")
+
+    def test_directory_outputs(self):
+        """Test that directory outputs are stored file by file and restored exactly."""
+        out_dir = self.root.joinpath("columns")
+
+        @cached_stage(inputs=[self.raw], outputs=[out_dir], cache=self.cache)
+        def snapshot() -> None:
+            self.calls.append("snapshot")
+            out_dir.mkdir(exist_ok=True)
+            out_dir.joinpath("a.npy").write_text("a")
+            out_dir.joinpath("nested").mkdir(exist_ok=True)
+            out_dir.joinpath("nested", "b.npy").write_text("b")
+
+        snapshot()
+        out_dir.joinpath("a.npy").unlink()
+        out_dir.joinpath("stray.npy").write_text("stray")
+        snapshot()
+        self.assertEqual(self.calls, ["snapshot"])
+        self.assertEqual(
+            sorted(p.relative_to(out_dir).as_posix() for p in out_dir.rglob("*") if p.is_file()),
+            ["a.npy", "nested/b.npy"],
+            "The directory should be restored to the cached files only.",
+        )
+
+    def test_dataframe_arguments_keyed_by_content(self):
+        """Test that DataFrame arguments are part of the key by content."""
+        chart = self.root.joinpath("chart.txt")
+
+        @cached_stage(outputs=[chart], cache=self.cache)
+        def draw(totals: pd.DataFrame) -> None:
+            self.calls.append(len(totals))
+            chart.write_text(totals.to_csv())
+
+        draw(pd.DataFrame({"TotalSales": [1.0, 2.0]}))
+        draw(pd.DataFrame({"TotalSales": [1.0, 2.0]}))
+        draw(pd.DataFrame({"TotalSales": [1.0, 3.0]}))
+        self.assertEqual(self.calls, [2, 2], "Equal frames should hit, different frames should miss.")
+
+    def test_stage_without_outputs_written_is_not_cached(self):
+        """Test that a call that fails to write its outputs runs again next time."""
+        @cached_stage(inputs=[self.raw], outputs=[self.root.joinpath("never.csv")], cache=self.cache)
+        def failing() -> None:
+            self.calls.append("failing")  # logs an error and returns, like the ETL scripts
+
+        failing()
+        failing()
+        self.assertEqual(self.calls, ["failing", "failing"])
+
+    def test_bypass_and_disable(self):
+        """Test that bypassed calls and SMART_STORE_STAGE_CACHE=0 always run."""
+        @cached_stage(inputs=[self.raw], outputs=[self.prepared], cache=self.cache,
+                      bypass=lambda incremental: incremental)
+        def load(incremental: bool = False) -> None:
+            self.calls.append(incremental)
+            self.prepared.write_text(str(len(self.calls)))
+
+        load(incremental=True)
+        load(incremental=True)
+        load()
+        load()
+        with mock.patch.dict(os.environ, {DISABLE_ENV: "0"}):
+            load()
+        self.assertEqual(self.calls, [True, True, False, False])
+
+    def test_outputs_kept_out_of_store(self):
+        """Test that store_outputs=False skips untouched outputs without copying them, and reruns otherwise."""
+        warehouse = self.root.joinpath("warehouse.db")
+
+        @cached_stage(inputs=[self.raw], outputs=[warehouse], cache=self.cache, store_outputs=False)
+        def load() -> None:
+            self.calls.append("load")
+            warehouse.write_text(self.raw.read_text())
+
+        load()
+        load()
+        self.assertEqual(self.calls, ["load"], "An untouched output should be skipped.")
+        objects = [p for p in self.cache.objects_dir.glob("*/*")] if self.cache.objects_dir.exists() else []
+        self.assertEqual(objects, [], "The output should not be copied into the store.")
+        warehouse.write_text("changed by another writer")
+        load()
+        self.assertEqual(self.calls, ["load", "load"], "A changed output should run the stage, not be restored.")
+        self.assertEqual(warehouse.read_text(), self.raw.read_text())
+
+    def test_eviction_keeps_store_within_bound(self):
+        """Test that least recently used entries and their objects are evicted."""
+        self.cache.max_bytes = 200
+        for scale in (10, 15):  # each prepared file is larger than half the bound
+            self.prepare(scale)
+        entries = list(self.cache.entries_dir.glob("*.json"))
+        objects = [p for p in self.cache.objects_dir.glob("*/*")]
+        self.assertEqual(len(entries), 1, "The older entry should have been evicted.")
+        self.assertLessEqual(sum(p.stat().st_size for p in objects), 200, "Unreferenced objects should be removed.")
+        self.prepare(15)
+        self.assertEqual(self.calls, [10, 15], "The most recent entry should still be cached.")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,113 @@
+r"""
+tests/test_synthetic_data.py
+
+To run, open a terminal in the root project folder.
+Activate your virtual environment if needed, and run one of the following commands:
+
+    py tests\test_synthetic_data.py
+    python3 tests\test_synthetic_data.py
+
+This test suite verifies that the synthetic data generator writes files shaped
+like data/raw, with the requested dirty rows, and that the benchmark comparison
+flags regressions.
+"""
+
+import unittest
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Import the generator and the benchmark comparison from the scripts module
+from scripts.benchmark import compare_results  # noqa: E402
+from scripts.synthetic_data import (  # noqa: E402
+    MAX_LOYALTY_POINTS,
+    MAX_SALE_AMOUNT,
+    DirtRates,
+    write_synthetic_dataset,
+)
+
+RAW_DIR = PROJECT_ROOT.joinpath("data", "raw")
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.output_dir = pathlib.Path(cls.temp_dir.name)
+        cls.dirt = DirtRates(nulls=0.05, duplicates=0.05, outliers=0.05, inconsistent_labels=0.1)
+        cls.paths = write_synthetic_dataset(cls.output_dir, sales_rows=5000, seed=7, dirt=cls.dirt, chunk_size=2000)
+        cls.frames = {table: pd.read_csv(path) for table, path in cls.paths.items()}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def test_columns_match_raw_files(self):
+        """Test that each file has the columns of its data/raw counterpart, in order."""
+        for table, frame in self.frames.items():
+            raw_columns = list(pd.read_csv(RAW_DIR.joinpath(f"{table}_data.csv"), nrows=0).columns)
+            self.assertEqual(list(frame.columns), raw_columns, f"{table} columns should match data/raw.")
+
+    def test_dirty_rows_injected(self):
+        """Test that nulls, duplicates, outliers and lowercase labels are present."""
+        sales = self.frames["sales"]
+        self.assertEqual(sales["TransactionID"].nunique(), 5000, "Every distinct sale should be written.")
+        self.assertGreater(sales.duplicated().sum(), 0, "Exact duplicate sales should be injected.")
+        self.assertGreater(sales["SaleAmount"].isna().sum(), 0, "Missing SaleAmount values should be injected.")
+        self.assertGreater((sales["SaleAmount"] > MAX_SALE_AMOUNT).sum(), 0, "SaleAmount outliers should be injected.")
+        self.assertTrue(sales["PaymentType"].str.islower().any(), "Some PaymentType values should be lowercase.")
+        customers = self.frames["customers"]
+        self.assertGreater((customers["LoyaltyPoints"] > MAX_LOYALTY_POINTS).sum(), 0)
+
+    def test_sales_reference_clean_dimensions(self):
+        """Test that sales never reference customers or products the prepare scripts remove."""
+        customers = self.frames["customers"]
+        kept = customers[customers["LoyaltyPoints"].fillna(0) <= MAX_LOYALTY_POINTS]["CustomerID"]
+        self.assertTrue(self.frames["sales"]["CustomerID"].isin(kept).all())
+        self.assertTrue(self.frames["sales"]["ProductID"].isin(self.frames["products"]["ProductID"]).all())
+
+    def test_popular_items_are_the_same_in_every_chunk(self):
+        sales = self.frames["sales"].drop_duplicates("TransactionID")
+        chunks = (sales["TransactionID"] - sales["TransactionID"].min()) // 2000
+        top_products = sales.groupby(chunks)["ProductID"].agg(lambda ids: ids.value_counts().idxmax())
+        top_customers = sales.groupby(chunks)["CustomerID"].agg(lambda ids: ids.value_counts().idxmax())
+        self.assertEqual(top_products.nunique(), 1, "Each chunk has a different most popular product")
+        self.assertEqual(top_customers.nunique(), 1, "Each chunk has a different most popular customer")
+
+    def test_same_seed_same_files(self):
+        """Test that the generator is deterministic for a seed."""
+        with tempfile.TemporaryDirectory() as other_dir:
+            paths = write_synthetic_dataset(pathlib.Path(other_dir), sales_rows=5000, seed=7, dirt=self.dirt,
+                                            chunk_size=2000)
+            for table, path in paths.items():
+                self.assertEqual(path.read_bytes(), self.paths[table].read_bytes(), f"{table} should be reproducible.")
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+
+    def test_regressions_flagged(self):
+        """Test that stages slower than the threshold are flagged and missing stages ignored."""
+        baseline = {"results": [
+            {"group": "etl", "stage": "load_data_to_db", "rows": 10000, "best_seconds": 1.0},
+            {"group": "cube", "stage": "parallel_cube", "rows": 10000, "best_seconds": 1.0},
+        ]}
+        current = {"results": [
+            {"group": "etl", "stage": "load_data_to_db", "rows": 10000, "best_seconds": 1.5},
+            {"group": "cube", "stage": "parallel_cube", "rows": 10000, "best_seconds": 1.05},
+            {"group": "spark", "stage": "read_prepared", "rows": 10000, "status": "skipped"},
+        ]}
+        changes = {change["stage"]: change for change in compare_results(baseline, current, threshold=0.1)}
+        self.assertEqual(set(changes), {"load_data_to_db", "parallel_cube"})
+        self.assertTrue(changes["load_data_to_db"]["regression"])
+        self.assertFalse(changes["parallel_cube"]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)